@@ -14,6 +14,7 @@ from scipy import sparse
 from sknetwork.classification.base import BaseClassifier
 from sknetwork.linalg.normalization import normalize
 from sknetwork.ranking.base import BaseRanking
+from sknetwork.ranking.pagerank import PageRank
 from sknetwork.utils.check import check_labels, check_n_jobs
 from sknetwork.utils.format import get_adjacency_seeds
 from sknetwork.utils.verbose import VerboseMixin
@@ -29,6 +30,7 @@ class RankClassifier(BaseClassifier, VerboseMixin):
     n_jobs :
         If positive, number of parallel jobs allowed (-1 means maximum number).
         If ``None``, no parallel computations are made.
+        Not used for :class:`PageRank`, which processes all labels in a single run.
     verbose :
         Verbose mode.
 
@@ -122,10 +124,14 @@ class RankClassifier(BaseClassifier, VerboseMixin):
         seeds_labels = seeds_labels.astype(int)
         classes, n_classes = check_labels(seeds_labels)
         seeds_all = self._process_seeds(seeds_labels)
-        local_function = partial(self.algorithm.fit_transform, adjacency)
-        with Pool(self.n_jobs) as pool:
-            scores = np.array(pool.map(local_function, seeds_all))
-        scores = scores.T
+        if isinstance(self.algorithm, PageRank):
+            # all seed vectors in a single run
+            scores = self.algorithm.fit_transform(adjacency, np.array(seeds_all, dtype=float).T)
+        else:
+            local_function = partial(self.algorithm.fit_transform, adjacency)
+            with Pool(self.n_jobs) as pool:
+                scores = np.array(pool.map(local_function, seeds_all))
+            scores = scores.T
 
         scores = self._process_scores(scores)
         scores = normalize(scores)
@@ -5,14 +5,15 @@ Created on April 2020
 @author: Thomas Bonald <tbonald@enst.fr>
 """
 
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 from scipy import sparse
 
 from sknetwork.classification.base import BaseClassifier
-from sknetwork.classification.vote import vote_update
+from sknetwork.classification.vote import vote_propagation
 from sknetwork.linalg.normalization import normalize
+from sknetwork.utils.check import check_n_threads
 from sknetwork.utils.format import get_adjacency_seeds
 from sknetwork.utils.membership import get_membership
 
@@ -32,6 +33,15 @@ class Propagation(BaseClassifier):
     weighted : bool
         If ``True``, the vote of each neighbor is proportional to the edge weight.
         Otherwise, all votes have weight 1.
+        Ties are broken in favor of the smallest label.
+    synchronous : bool
+        If ``True``, all node labels are updated at the same time, from the labels of the previous iteration
+        (the node order is then irrelevant and the result does not depend on the number of threads).
+        Otherwise (default), node labels are updated one after the other.
+    n_jobs : int
+        Number of threads used to update node labels (-1 means the maximum number).
+        If ``None`` (default), a single thread is used.
+        In asynchronous mode, the result may then depend on the number of threads.
 
     Attributes
     ----------
@@ -68,7 +78,8 @@ class Propagation(BaseClassifier):
     <https://arxiv.org/pdf/0709.2938.pdf>`_
     Physical review E, 76(3), 036106.
     """
-    def __init__(self, n_iter: float = -1, node_order: str = None, weighted: bool = True):
+    def __init__(self, n_iter: float = -1, node_order: str = None, weighted: bool = True, synchronous: bool = False,
+                 n_jobs: Optional[int] = None):
         super(Propagation, self).__init__()
 
         if n_iter < 0:
@@ -77,6 +88,8 @@ class Propagation(BaseClassifier):
             self.n_iter = n_iter
         self.node_order = node_order
         self.weighted = weighted
+        self.synchronous = synchronous
+        self.n_jobs = n_jobs
         self.bipartite = None
 
     @staticmethod
@@ -125,20 +138,18 @@ class Propagation(BaseClassifier):
 
         labels = -np.ones(n, dtype=np.int32)
         labels[index_seed] = labels_seed
-        labels_remain = np.zeros_like(index_remain, dtype=np.int32)
 
-        indptr = adjacency.indptr.astype(np.int32)
-        indices = adjacency.indices.astype(np.int32)
+        indptr = adjacency.indptr
+        indices = adjacency.indices.astype(indptr.dtype)
         if self.weighted:
             data = adjacency.data.astype(np.float32)
         else:
-            data = np.ones(n, dtype=np.float32)
+            data = np.ones(len(indices), dtype=np.float32)
 
-        t = 0
-        while t < self.n_iter and not np.array_equal(labels_remain, labels[index_remain]):
-            t += 1
-            labels_remain = labels[index_remain].copy()
-            labels = np.asarray(vote_update(indptr, indices, data, labels, index_remain))
+        n_labels = labels.max() + 1
+        n_iter = -1 if self.n_iter == np.inf else int(self.n_iter)
+        labels, _ = vote_propagation(indptr, indices, data, labels, index_remain.astype(indptr.dtype), n_labels,
+                                     n_iter, self.synchronous, check_n_threads(self.n_jobs))
 
         membership = get_membership(labels)
         membership = normalize(adjacency.dot(membership))
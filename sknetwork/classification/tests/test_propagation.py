@@ -22,3 +22,37 @@ class TestLabelPropagation(unittest.TestCase):
                 propagation = Propagation(node_order=order)
                 labels = propagation.fit_predict(adjacency, seeds)
                 self.assertEqual(labels.shape, (n,))
+
+    def test_parallel(self):
+        for adjacency in [test_graph(), test_digraph()]:
+            seeds = {0: 0, 1: 1}
+            labels = Propagation(synchronous=True).fit_predict(adjacency, seeds)
+            labels_parallel = Propagation(synchronous=True, n_jobs=2).fit_predict(adjacency, seeds)
+            self.assertTrue((labels == labels_parallel).all())
+            labels = Propagation(n_jobs=-1).fit_predict(adjacency, seeds)
+            self.assertTrue(set(labels) <= {-1, 0, 1})
+        # 64-bit indices
+        adjacency = test_graph()
+        adjacency.indices = adjacency.indices.astype(np.int64)
+        adjacency.indptr = adjacency.indptr.astype(np.int64)
+        labels = Propagation().fit_predict(adjacency, {0: 0, 1: 1})
+        self.assertEqual(len(labels), adjacency.shape[0])
+
+    def test_oscillation(self):
+        # synchronous updates oscillate between two labelings of nodes 0, 1, 2, 3
+        row = np.array([0, 0, 1, 1, 4, 4, 5, 5])
+        col = np.array([2, 3, 2, 3, 0, 1, 2, 3])
+        data = np.array([1, 1, 1, 1, 0.1, 0.1, 0.1, 0.1])
+        adjacency = sparse.csr_matrix((data, (row, col)), shape=(6, 6))
+        adjacency = adjacency + adjacency.T
+        labels = Propagation(synchronous=True).fit_predict(adjacency, {4: 0, 5: 1})
+        self.assertEqual(list(labels), [0, 0, 1, 1, 0, 1])
+
+    def test_votes(self):
+        # vote weighted by the edge
+        adjacency = sparse.csr_matrix(np.array([[0, 1, 3], [1, 0, 0], [3, 0, 0]]))
+        labels = Propagation().fit_predict(adjacency, {1: 0, 2: 1})
+        self.assertEqual(labels[0], 1)
+        # tie broken in favor of the smallest label
+        labels = Propagation(weighted=False).fit_predict(adjacency, {1: 1, 2: 0})
+        self.assertEqual(labels[0], 0)
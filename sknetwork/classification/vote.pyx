@@ -6,53 +6,108 @@
 Created on April, 2020
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 """
-from libcpp.set cimport set
-from libcpp.vector cimport vector
+from cython.parallel import prange, threadid
 
+import numpy as np
 cimport cython
 
+ctypedef fused int_or_long:
+    int
+    long
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def vote_update(int[:] indptr, int[:] indices, float[:] data, int[:] labels, int[:] index):
-    """One pass of label updates over the graph by majority vote among neighbors."""
-    cdef int i
-    cdef int ii
-    cdef int j
-    cdef int jj
-    cdef int n_indices = index.shape[0]
+def vote_propagation(int_or_long[:] indptr, int_or_long[:] indices, float[:] data, int[:] labels,
+                     int_or_long[:] index, int n_labels, long n_iter, bint synchronous, int n_threads):
+    """Label propagation by majority vote among neighbors, until convergence.
+
+    Votes are counted in dense arrays (one per thread). Ties are broken in favor of the smallest label.
+
+    Parameters
+    ----------
+    indptr :
+        CSR format index pointer array of the adjacency matrix.
+    indices :
+        CSR format index array of the adjacency matrix.
+    data :
+        Weights of the votes (one per edge).
+    labels :
+        Initial labels of nodes (negative value for no label). Modified in place.
+    index :
+        Nodes to update, in order of update.
+    n_labels :
+        Number of labels (labels are between 0 and n_labels - 1).
+    n_iter :
+        Maximum number of iterations (negative value for no limit).
+    synchronous :
+        If ``True``, all nodes are updated from the labels of the previous iteration
+        (the result does not depend on the number of threads).
+        The labels may then oscillate between two states; iterations stop when the labels are those of two
+        iterations back.
+        Otherwise, nodes are updated in place, in order of the index (if a single thread is used).
+    n_threads :
+        Number of threads.
+
+    Returns
+    -------
+    labels :
+        Labels of nodes.
+    n_iter :
+        Number of iterations done.
+    """
+    cdef int_or_long n_index = index.shape[0]
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long k
     cdef int label
-    cdef int label_neigh_size
-    cdef float best_score
-
-    cdef vector[int] labels_neigh
-    cdef vector[float] votes_neigh, votes
-    cdef set[int] labels_unique = ()
-
-    cdef int n = labels.shape[0]
-    for i in range(n):
-        votes.push_back(0)
-
-    for ii in range(n_indices):
-        i = index[ii]
-        labels_neigh.clear()
-        for j in range(indptr[i], indptr[i + 1]):
-            jj = indices[j]
-            labels_neigh.push_back(labels[jj])
-            votes_neigh.push_back(data[jj])
-
-        labels_unique.clear()
-        label_neigh_size = labels_neigh.size()
-        for jj in range(label_neigh_size):
-            label = labels_neigh[jj]
-            if label >= 0:
-                labels_unique.insert(label)
-                votes[label] += votes_neigh[jj]
-
-        best_score = -1
-        for label in labels_unique:
-            if votes[label] > best_score:
-                labels[i] = label
-                best_score = votes[label]
-            votes[label] = 0
-    return labels
+    cdef int label_best
+    cdef int t
+    cdef long count = 0
+    cdef long n_changes = 1
+    cdef long n_changes_2
+    cdef float score_best
+
+    # thread-local votes
+    cdef float[:, :] votes = np.zeros((n_threads, max(n_labels, 1)), dtype=np.float32)
+    cdef int[:] labels_prev = labels
+    cdef int[:] labels_prev_2 = labels
+    if synchronous:
+        labels_prev = np.array(labels)
+        labels_prev_2 = np.array(labels)
+
+    while n_changes > 0 and (n_iter < 0 or count < n_iter):
+        count += 1
+        n_changes = 0
+        for k in prange(n_index, nogil=True, num_threads=n_threads, schedule='guided'):
+            i = index[k]
+            t = threadid()
+            for j in range(indptr[i], indptr[i + 1]):
+                label = labels_prev[indices[j]]
+                if label >= 0:
+                    votes[t, label] += data[j]
+            label_best = labels_prev[i]
+            score_best = -1
+            for j in range(indptr[i], indptr[i + 1]):
+                label = labels_prev[indices[j]]
+                if label >= 0:
+                    if votes[t, label] > score_best or (votes[t, label] == score_best and label < label_best):
+                        label_best = label
+                        score_best = votes[t, label]
+                    votes[t, label] = 0
+            if label_best != labels[i]:
+                labels[i] = label_best
+                n_changes += 1
+        if synchronous:
+            # changes with respect to the labels of two iterations back
+            n_changes_2 = 0
+            for k in prange(n_index, nogil=True, num_threads=n_threads):
+                i = index[k]
+                if labels[i] != labels_prev_2[i]:
+                    n_changes_2 += 1
+                labels_prev_2[i] = labels_prev[i]
+                labels_prev[i] = labels[i]
+            if n_changes_2 == 0:
+                # oscillation
+                break
+    return np.asarray(labels), count
@@ -1,7 +1,9 @@
 """clustering module"""
 from sknetwork.clustering.base import BaseClustering
 from sknetwork.clustering.kmeans import KMeans
+from sknetwork.clustering.leiden import Leiden
 from sknetwork.clustering.louvain import Louvain
-from sknetwork.clustering.metrics import get_modularity
+from sknetwork.clustering.louvain_consensus import LouvainConsensus
+from sknetwork.clustering.metrics import get_modularity, get_modularity_batch
 from sknetwork.clustering.postprocess import reindex_labels
 from sknetwork.clustering.propagation_clustering import PropagationClustering
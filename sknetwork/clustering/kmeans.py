@@ -5,7 +5,7 @@ Created on October 2019
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 @author: Thomas Bonald <bonald@enst.fr>
 """
-from typing import Union, Tuple
+from typing import Optional, Union, Tuple
 
 import numpy as np
 from scipy import sparse
@@ -16,7 +16,7 @@ from sknetwork.embedding.base import BaseEmbedding
 from sknetwork.embedding.spectral import Spectral
 from sknetwork.utils.format import is_square
 from sknetwork.utils.check import check_n_clusters, check_format
-from sknetwork.utils.kmeans import KMeansDense
+from sknetwork.utils.kmeans import KMeansDense, MiniBatchKMeansDense
 
 
 def get_embedding(input_matrix: Union[sparse.csr_matrix, np.ndarray], method: BaseEmbedding,
@@ -56,6 +56,16 @@ class KMeans(BaseClustering):
         Embedding method (default = Spectral embedding in dimension 10).
     co_cluster :
         If ``True``, co-cluster rows and columns, considered as different nodes (default = ``False``).
+    solver :
+        K-means algorithm applied to the embedding:
+
+        * ``'lloyd'`` (default), standard K-means (see :class:`sknetwork.utils.KMeansDense`),
+        * ``'minibatch'``, mini-batch K-means, for large graphs (see :class:`sknetwork.utils.MiniBatchKMeansDense`).
+    random_state :
+        Random number generator or random seed (mini-batch K-means only). If None, numpy.random is used.
+    n_jobs :
+        Number of threads for the runs of mini-batch K-means (-1 means the maximum number).
+        If ``None`` (default), runs are sequential.
     sort_clusters :
             If ``True``, sort labels in decreasing order of cluster size.
     return_membership :
@@ -90,12 +100,17 @@ class KMeans(BaseClustering):
     3
     """
     def __init__(self, n_clusters: int = 2, embedding_method: BaseEmbedding = Spectral(10), co_cluster: bool = False,
-                 sort_clusters: bool = True, return_membership: bool = True, return_aggregate: bool = True):
+                 sort_clusters: bool = True, return_membership: bool = True, return_aggregate: bool = True,
+                 solver: str = 'lloyd', random_state: Optional[Union[np.random.RandomState, int]] = None,
+                 n_jobs: Optional[int] = None):
         super(KMeans, self).__init__(sort_clusters=sort_clusters, return_membership=return_membership,
                                      return_aggregate=return_aggregate)
         self.n_clusters = n_clusters
         self.embedding_method = embedding_method
         self.co_cluster = co_cluster
+        self.solver = solver
+        self.random_state = random_state
+        self.n_jobs = n_jobs
         self.bipartite = None
 
     def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray]) -> 'KMeans':
@@ -123,7 +138,12 @@ class KMeans(BaseClustering):
         embedding, self.bipartite = get_embedding(input_matrix, self.embedding_method, self.co_cluster)
 
         # clustering
-        kmeans = KMeansDense(self.n_clusters)
+        if self.solver == 'lloyd':
+            kmeans = KMeansDense(self.n_clusters)
+        elif self.solver == 'minibatch':
+            kmeans = MiniBatchKMeansDense(self.n_clusters, random_state=self.random_state, n_jobs=self.n_jobs)
+        else:
+            raise ValueError("Unknown solver. Use 'lloyd' or 'minibatch'.")
         kmeans.fit(embedding)
 
         # sort
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+import time
+from typing import Union, Optional
+
+import numpy as np
+
+from sknetwork.clustering.louvain import Louvain
+from sknetwork.clustering.louvain_core import fit_core_queue, refine_core
+
+
+class Leiden(Louvain):
+    """Leiden algorithm for clustering graphs by maximization of modularity.
+
+    Compared to Louvain, the clusters are refined into well-connected sub-clusters before aggregation,
+    and nodes are visited from a queue containing only nodes whose neighborhood has changed.
+
+    For bipartite graphs, the algorithm maximizes Barber's modularity by default.
+
+    Parameters
+    ----------
+    resolution :
+        Resolution parameter.
+    modularity : str
+        Which objective function to maximize. Can be ``'Dugue'``, ``'Newman'`` or ``'Potts'`` (default = ``'dugue'``).
+    tol_aggregation :
+        Minimum increase in the objective function to enter a new aggregation pass.
+    n_aggregations :
+        Maximum number of aggregations.
+        A negative value is interpreted as no limit.
+    shuffle_nodes :
+        Enables node shuffling before optimization.
+    sort_clusters :
+        If ``True``, sort labels in decreasing order of cluster size.
+    return_membership :
+        If ``True``, return the membership matrix of nodes to each cluster (soft clustering).
+    return_aggregate :
+        If ``True``, return the adjacency matrix of the graph between clusters.
+    return_levels :
+        If ``True``, return the labels of the nodes after each aggregation.
+    random_state :
+        Random number generator or random seed. If None, numpy.random is used.
+    max_time :
+        Maximum running time (in seconds), checked between aggregations.
+        When exceeded, the best clustering found so far is returned (this is reported in the log).
+        If ``None`` (default), no limit.
+    verbose :
+        Verbose mode.
+
+    Attributes
+    ----------
+    labels_ : np.ndarray
+        Labels of the nodes.
+    labels_row_ : np.ndarray
+        Labels of the rows (for bipartite graphs).
+    labels_col_ : np.ndarray
+        Labels of the columns (for bipartite graphs).
+    membership_ : sparse.csr_matrix
+        Membership matrix of the nodes, shape (n_nodes, n_clusters).
+    membership_row_ : sparse.csr_matrix
+        Membership matrix of the rows (for bipartite graphs).
+    membership_col_ : sparse.csr_matrix
+        Membership matrix of the columns (for bipartite graphs).
+    aggregate_ : sparse.csr_matrix
+        Aggregate adjacency matrix or biadjacency matrix between clusters.
+    labels_levels_ : np.ndarray
+        Labels of the nodes after each aggregation, from the first (finest) to the last (the clustering),
+        shape (n_levels, n_nodes). Only if ``return_levels`` is ``True``.
+
+    Example
+    -------
+    >>> from sknetwork.clustering import Leiden
+    >>> from sknetwork.data import karate_club
+    >>> leiden = Leiden()
+    >>> adjacency = karate_club()
+    >>> labels = leiden.fit_transform(adjacency)
+    >>> len(set(labels))
+    4
+
+    References
+    ----------
+    Traag, V. A., Waltman, L., & Van Eck, N. J. (2019).
+    `From Louvain to Leiden: guaranteeing well-connected communities.
+    <https://arxiv.org/abs/1810.08473>`_
+    Scientific reports, 9(1).
+    """
+    def __init__(self, resolution: float = 1, modularity: str = 'dugue', tol_aggregation: float = 1e-3,
+                 n_aggregations: int = -1, shuffle_nodes: bool = False, sort_clusters: bool = True,
+                 return_membership: bool = True, return_aggregate: bool = True, return_levels: bool = False,
+                 random_state: Optional[Union[np.random.RandomState, int]] = None, max_time: Optional[float] = None,
+                 verbose: bool = False):
+        super(Leiden, self).__init__(resolution=resolution, modularity=modularity, tol_aggregation=tol_aggregation,
+                                     n_aggregations=n_aggregations, shuffle_nodes=shuffle_nodes,
+                                     sort_clusters=sort_clusters, return_membership=return_membership,
+                                     return_aggregate=return_aggregate, return_levels=return_levels,
+                                     random_state=random_state, max_time=max_time, verbose=verbose)
+
+    def _optimize_queue(self, resolution, probs_out, probs_in, self_loops, data, indices, indptr, labels: np.ndarray,
+                        nodes: np.ndarray):
+        """Local optimization of the Leiden algorithm, visiting nodes from a queue.
+
+        Parameters
+        ----------
+        resolution :
+            the resolution parameter
+        probs_out :
+            the array of degrees of the adjacency
+        probs_in :
+            the array of degrees of the transpose of the adjacency
+        self_loops :
+            the weights of self-loops
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+        labels :
+            the initial communities of each node
+        nodes :
+            the nodes initially in the queue
+
+        Returns
+        -------
+        labels :
+            the communities of each node after optimization
+        increase :
+            the increase in modularity gained after optimization
+        """
+        labels = labels.astype(indptr.dtype)
+        return fit_core_queue(resolution, probs_out, probs_in, self_loops, data, indices, indptr, labels, nodes)
+
+    def _refine(self, resolution, probs_out, probs_in, data, indices, indptr, labels: np.ndarray) -> np.ndarray:
+        """Refine the communities into well-connected sub-communities.
+
+        Parameters
+        ----------
+        resolution :
+            the resolution parameter
+        probs_out :
+            the array of degrees of the adjacency
+        probs_in :
+            the array of degrees of the transpose of the adjacency
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+        labels :
+            the communities of each node
+
+        Returns
+        -------
+        labels_refined :
+            the sub-communities of each node
+        """
+        labels = labels.astype(indptr.dtype)
+        return refine_core(resolution, probs_out, probs_in, data, indices, indptr, labels)
+
+    def _fit_core(self, resolution, probs_out, probs_in, self_loops, data, indices, indptr,
+                  labels_init: Optional[np.ndarray] = None, nodes_init: Optional[np.ndarray] = None,
+                  n_threads: int = 1, deadline: float = np.inf, labels_levels: Optional[list] = None) -> np.ndarray:
+        """Run the multi-level algorithm. The input arrays are not modified.
+
+        Parameters
+        ----------
+        resolution :
+            the resolution parameter
+        probs_out :
+            the array of degrees of the adjacency
+        probs_in :
+            the array of degrees of the transpose of the adjacency
+        self_loops :
+            the weights of self-loops
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+        labels_init :
+            the initial labels of nodes (between 0 and n - 1); if ``None``, start from singletons
+        nodes_init :
+            the nodes to visit first (with their neighbors) when starting from ``labels_init``
+        n_threads :
+            not used (nodes are moved sequentially)
+        deadline :
+            the time (as given by ``time.perf_counter``) after which the current clustering is returned
+        labels_levels :
+            if specified, the list to which the labels of nodes are appended after each aggregation
+
+        Returns
+        -------
+        labels :
+            the labels of nodes
+        """
+        n = len(indptr) - 1
+        # buffers for the aggregate graphs, used alternately (weights aggregated in double precision)
+        buffers = [None, None]
+
+        labels = np.arange(n, dtype=indptr.dtype)
+        if labels_init is None:
+            labels_cluster = np.arange(n)
+            nodes = np.arange(n, dtype=indptr.dtype)
+        else:
+            labels_cluster = labels_init
+            nodes = self._get_nodes_init(nodes_init, data, indices, indptr)
+        count_aggregations = 0
+        self.log.print("Starting with", n, "nodes.")
+        while True:
+            count_aggregations += 1
+
+            core_inputs = self._get_float32_inputs(probs_out, probs_in, self_loops, data, indices, indptr)
+            labels_cluster, increase = self._optimize_queue(resolution, *core_inputs, labels_cluster, nodes)
+            _, labels_cluster = np.unique(labels_cluster, return_inverse=True)
+
+            if increase <= self.tol_aggregation or len(labels_cluster) == labels_cluster.max() + 1:
+                break
+            if time.perf_counter() > deadline:
+                self.log.print("Time limit reached after", count_aggregations - 1, "aggregations:",
+                               "returning the current clustering with", labels_cluster.max() + 1, "clusters.")
+                break
+
+            probs_out_, probs_in_, _, data_, _, _ = core_inputs
+            labels_refined = self._refine(resolution, probs_out_, probs_in_, data_, indices, indptr, labels_cluster)
+
+            # aggregate the sub-clusters, each starting in its cluster
+            labels_refined, probs_out, probs_in, self_loops, data, indices, indptr = \
+                self._aggregate(labels_refined, probs_out, probs_in, data, indices, indptr, buffers,
+                                count_aggregations % 2)
+            labels = labels_refined[labels]
+            n = len(indptr) - 1
+            labels_aggregate = np.zeros(n, dtype=int)
+            labels_aggregate[labels_refined] = labels_cluster
+            labels_cluster = labels_aggregate
+            nodes = np.arange(n, dtype=indptr.dtype)
+            if labels_levels is not None:
+                labels_levels.append(labels_cluster[labels])
+
+            self.log.print("Aggregation", count_aggregations, "completed with", n, "sub-clusters and",
+                           labels_cluster.max() + 1, "clusters, ", increase, "increment.")
+            if count_aggregations == self.n_aggregations:
+                break
+
+        labels = labels_cluster[labels]
+        if labels_levels is not None and not (labels_levels and np.array_equal(labels_levels[-1], labels)):
+            labels_levels.append(labels)
+        return labels
@@ -6,17 +6,21 @@ Created in November 2018
 @author: Quentin Lutz <qlutz@enst.fr>
 @author: Thomas Bonald <bonald@enst.fr>
 """
-from typing import Union, Optional
+import time
+from copy import copy
+from multiprocessing.pool import ThreadPool
+from typing import Iterable, Optional, Tuple, Union
 
 import numpy as np
 from scipy import sparse
 
 from sknetwork.clustering.base import BaseClustering
-from sknetwork.clustering.louvain_core import fit_core
+from sknetwork.clustering.louvain_core import fit_core, fit_core_parallel, fit_core_queue, aggregate_core
 from sknetwork.clustering.postprocess import reindex_labels
-from sknetwork.utils.check import check_random_state, get_probs
+from sknetwork.utils.check import check_random_state, get_probs, check_n_threads, check_square
 from sknetwork.utils.format import check_format, get_adjacency, directed2undirected
-from sknetwork.utils.membership import get_membership
+from sknetwork.utils.membership import get_blocks
+from sknetwork.utils.timeout import get_deadline
 from sknetwork.utils.verbose import VerboseMixin
 
 
@@ -46,8 +50,23 @@ class Louvain(BaseClustering, VerboseMixin):
         If ``True``, return the membership matrix of nodes to each cluster (soft clustering).
     return_aggregate :
         If ``True``, return the adjacency matrix of the graph between clusters.
+    return_levels :
+        If ``True``, return the labels of the nodes after each aggregation.
     random_state :
         Random number generator or random seed. If None, numpy.random is used.
+    n_jobs :
+        Number of threads used to move nodes in parallel (-1 means the maximum number).
+        If ``None`` (default), nodes are moved sequentially.
+        In parallel mode, nodes are colored so that neighbors get different colors, and nodes of the same color
+        are moved concurrently. The result may differ from the sequential one: its modularity never decreases
+        over an optimization pass and stays within 0.05 of the sequential one on the test graphs.
+        The result does not depend on the number of threads. Memory overhead: one float per node and per thread.
+        For :meth:`fit_resolutions` and :meth:`fit_clusters`, number of threads running the resolutions
+        or the clusters in parallel.
+    max_time :
+        Maximum running time (in seconds), checked between optimization passes and aggregations.
+        When exceeded, the best clustering found so far is returned (this is reported in the log).
+        If ``None`` (default), no limit.
     verbose :
         Verbose mode.
 
@@ -67,6 +86,10 @@ class Louvain(BaseClustering, VerboseMixin):
         Membership matrix of the columns (for bipartite graphs).
     aggregate_ : sparse.csr_matrix
         Aggregate adjacency matrix or biadjacency matrix between clusters.
+    labels_levels_ : np.ndarray
+        Labels of the nodes after each aggregation, from the first (finest) to the last (the clustering),
+        shape (n_levels, n_nodes). For bipartite graphs, labels of rows followed by labels of columns.
+        Only if ``return_levels`` is ``True``.
 
     Example
     -------
@@ -77,6 +100,10 @@ class Louvain(BaseClustering, VerboseMixin):
     >>> labels = louvain.fit_transform(adjacency)
     >>> len(set(labels))
     4
+    >>> louvain = Louvain(return_levels=True)
+    >>> labels = louvain.fit_transform(adjacency)
+    >>> [len(set(labels_)) for labels_ in louvain.labels_levels_]
+    [6, 4]
 
     References
     ----------
@@ -98,12 +125,15 @@ class Louvain(BaseClustering, VerboseMixin):
     def __init__(self, resolution: float = 1, modularity: str = 'dugue', tol_optimization: float = 1e-3,
                  tol_aggregation: float = 1e-3, n_aggregations: int = -1, shuffle_nodes: bool = False,
                  sort_clusters: bool = True, return_membership: bool = True, return_aggregate: bool = True,
-                 random_state: Optional[Union[np.random.RandomState, int]] = None, verbose: bool = False):
+                 return_levels: bool = False, random_state: Optional[Union[np.random.RandomState, int]] = None,
+                 n_jobs: Optional[int] = None, max_time: Optional[float] = None, verbose: bool = False):
         super(Louvain, self).__init__(sort_clusters=sort_clusters, return_membership=return_membership,
                                       return_aggregate=return_aggregate)
         VerboseMixin.__init__(self, verbose)
 
         self.labels_ = None
+        self.labels_levels_ = None
+        self.return_levels = return_levels
         self.resolution = resolution
         self.modularity = modularity.lower()
         self.tol = tol_optimization
@@ -111,66 +141,149 @@ class Louvain(BaseClustering, VerboseMixin):
         self.n_aggregations = n_aggregations
         self.shuffle_nodes = shuffle_nodes
         self.random_state = check_random_state(random_state)
+        self.n_jobs = n_jobs
+        self.max_time = max_time
         self.bipartite = None
 
-    def _optimize(self, adjacency_norm, probs_ou, probs_in):
-        """One local optimization pass of the Louvain algorithm
+    @staticmethod
+    def _get_core_inputs(adjacency_norm, probs_out, probs_in):
+        """Get the inputs of the multi-level algorithm (node weights, self-loops and CSR arrays, in double precision)
 
         Parameters
         ----------
         adjacency_norm :
             the norm of the adjacency
-        probs_ou :
+        probs_out :
             the array of degrees of the adjacency
         probs_in :
             the array of degrees of the transpose of the adjacency
 
         Returns
         -------
-        labels :
-            the communities of each node after optimization
-        pass_increase :
-            the increase in modularity gained after optimization
+        Node out-weights, node in-weights, self-loops, data, indices, indptr of the symmetrized adjacency.
         """
-        node_probs_in = probs_in.astype(np.float32)
-        node_probs_ou = probs_ou.astype(np.float32)
+        node_probs_in = probs_in.astype(float)
+        node_probs_ou = probs_out.astype(float)
 
         adjacency = 0.5 * directed2undirected(adjacency_norm)
 
-        self_loops = adjacency.diagonal().astype(np.float32)
+        self_loops = adjacency.diagonal().astype(float)
 
         indptr: np.ndarray = adjacency.indptr
         indices: np.ndarray = adjacency.indices
-        data: np.ndarray = adjacency.data.astype(np.float32)
+        data: np.ndarray = adjacency.data.astype(float)
+        return node_probs_ou, node_probs_in, self_loops, data, indices, indptr
+
+    @staticmethod
+    def _get_float32_inputs(probs_out, probs_in, self_loops, data, indices, indptr):
+        """Get the inputs of the Cython optimization functions (weights in single precision)
+
+        Parameters
+        ----------
+        probs_out :
+            the array of degrees of the adjacency
+        probs_in :
+            the array of degrees of the transpose of the adjacency
+        self_loops :
+            the weights of self-loops
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+
+        Returns
+        -------
+        Node out-weights, node in-weights, self-loops, data (in single precision), indices, indptr.
+        """
+        return probs_out.astype(np.float32), probs_in.astype(np.float32), self_loops.astype(np.float32), \
+            data.astype(np.float32), indices, indptr
 
-        return fit_core(self.resolution, self.tol, node_probs_ou, node_probs_in, self_loops, data, indices, indptr)
+    def _optimize(self, resolution, probs_out, probs_in, self_loops, data, indices, indptr, n_threads: int = 1,
+                  deadline: float = np.inf, order: Optional[np.ndarray] = None):
+        """One local optimization pass of the Louvain algorithm
+
+        Parameters
+        ----------
+        resolution :
+            the resolution parameter
+        probs_out :
+            the array of degrees of the adjacency
+        probs_in :
+            the array of degrees of the transpose of the adjacency
+        self_loops :
+            the weights of self-loops
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+        n_threads :
+            the number of threads used to move nodes
+        deadline :
+            the time after which no new optimization pass is started
+        order :
+            the order in which nodes are visited (sequential mode only; default = increasing index)
+
+        Returns
+        -------
+        labels :
+            the communities of each node after optimization
+        pass_increase :
+            the increase in modularity gained after optimization
+        """
+        if n_threads > 1:
+            return fit_core_parallel(resolution, self.tol, probs_out, probs_in, self_loops, data, indices, indptr,
+                                     n_threads, deadline)
+        return fit_core(resolution, self.tol, probs_out, probs_in, self_loops, data, indices, indptr, deadline, order)
 
     @staticmethod
-    def _aggregate(adjacency_norm, probs_out, probs_in, membership: Union[sparse.csr_matrix, np.ndarray]):
+    def _aggregate(labels, probs_out, probs_in, data, indices, indptr, buffers, i):
         """Aggregate nodes belonging to the same cluster.
 
         Parameters
         ----------
-        adjacency_norm :
-            the norm of the adjacency
+        labels :
+            the communities of each node
         probs_out :
             the array of degrees of the adjacency
         probs_in :
             the array of degrees of the transpose of the adjacency
-        membership :
-            membership matrix (rows).
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+        buffers :
+            the list of CSR arrays where to write the aggregate graphs (allocated on first use)
+        i :
+            the index of the buffer to use (not sharing memory with the input graph)
 
         Returns
         -------
-        Aggregate graph.
+        Labels of nodes (consecutive), out-weights, in-weights and self-loops of clusters,
+        CSR arrays of the aggregate graph.
         """
-        adjacency_norm = (membership.T.dot(adjacency_norm.dot(membership))).tocsr()
-        probs_in = np.array(membership.T.dot(probs_in).T)
-        probs_out = np.array(membership.T.dot(probs_out).T)
-        return adjacency_norm, probs_out, probs_in
+        if buffers[i] is None:
+            buffers[i] = (np.empty_like(data), np.empty_like(indices), np.empty_like(indptr))
+        data_new, indices_new, indptr_new = buffers[i]
+        labels, probs_out, probs_in, self_loops, n_clusters, nnz = \
+            aggregate_core(labels, probs_out, probs_in, data, indices, indptr, data_new, indices_new, indptr_new)
+        return labels, probs_out, probs_in, self_loops, data_new[:nnz], indices_new[:nnz], indptr_new[:n_clusters + 1]
 
-    def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], force_bipartite: bool = False) -> 'Louvain':
-        """Fit algorithm to data.
+    @staticmethod
+    def _get_nodes_init(nodes, data, indices, indptr) -> np.ndarray:
+        """Get the nodes to visit first in a warm start: the given nodes and their neighbors.
+
+        Parameters
+        ----------
+        nodes :
+            the nodes whose neighborhood has changed
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+
+        Returns
+        -------
+        nodes :
+            the nodes to visit first (sorted)
+        """
+        n = len(indptr) - 1
+        neighbors = sparse.csr_matrix((data, indices, indptr), shape=(n, n))[nodes].indices
+        return np.unique(np.hstack((nodes, neighbors))).astype(indptr.dtype)
+
+    def _pre_processing(self, input_matrix: sparse.csr_matrix, force_bipartite: bool):
+        """Get the adjacency matrix, the node weights and the node index (for shuffling).
 
         Parameters
         ----------
@@ -181,10 +294,13 @@ class Louvain(BaseClustering, VerboseMixin):
 
         Returns
         -------
-        self: :class:`Louvain`
+        adjacency :
+            Adjacency matrix (with shuffled nodes if required).
+        probs_out, probs_in :
+            Out-weights and in-weights of nodes (sum to 1).
+        index :
+            Index of nodes in the input matrix.
         """
-        self._init_vars()
-        input_matrix = check_format(input_matrix)
         if self.modularity == 'dugue':
             adjacency, self.bipartite = get_adjacency(input_matrix, force_directed=True,
                                                       force_bipartite=force_bipartite)
@@ -209,47 +325,420 @@ class Louvain(BaseClustering, VerboseMixin):
             probs_in = get_probs('degree', adjacency.T)
         else:
             raise ValueError('Unknown modularity function.')
+        return adjacency, probs_out, probs_in, index
+
+    def _get_labels(self, labels: np.ndarray, index: np.ndarray) -> np.ndarray:
+        """Get the labels of the nodes of the input matrix from the labels of the (shuffled) nodes.
+
+        Parameters
+        ----------
+        labels :
+            Labels of the (shuffled) nodes.
+        index :
+            Index of nodes in the input matrix.
 
-        adjacency_cluster = adjacency / adjacency.data.sum()
+        Returns
+        -------
+        labels :
+            Labels of the nodes (sorted by cluster size if required).
+        """
+        if self.sort_clusters:
+            labels = reindex_labels(labels)
+        if self.shuffle_nodes:
+            reverse = np.empty(index.size, index.dtype)
+            reverse[index] = np.arange(index.size)
+            labels = labels[reverse]
+        return labels
 
-        membership = sparse.identity(n, format='csr')
+    def _post_processing(self, input_matrix: sparse.csr_matrix, labels: np.ndarray, index: np.ndarray,
+                         labels_levels: Optional[list] = None):
+        """Set the labels from the labels of the (shuffled) nodes and compute secondary outputs.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix or biadjacency matrix of the graph.
+        labels :
+            Labels of the (shuffled) nodes.
+        index :
+            Index of nodes in the input matrix.
+        labels_levels :
+            Labels of the (shuffled) nodes after each aggregation (used only if ``return_levels`` is ``True``).
+        """
+        self.labels_ = self._get_labels(labels, index)
+        self.labels_levels_ = None
+        if self.return_levels:
+            if not labels_levels:
+                labels_levels = [labels]
+            self.labels_levels_ = np.array([self._get_labels(labels_, index) for labels_ in labels_levels])
+        if self.bipartite:
+            self._split_vars(input_matrix.shape)
+        self._secondary_outputs(input_matrix)
+        return self
+
+    def _fit_core(self, resolution, probs_out, probs_in, self_loops, data, indices, indptr,
+                  labels_init: Optional[np.ndarray] = None, nodes_init: Optional[np.ndarray] = None,
+                  n_threads: int = 1, deadline: float = np.inf,
+                  random_state: Optional[np.random.RandomState] = None,
+                  labels_levels: Optional[list] = None) -> np.ndarray:
+        """Run the multi-level algorithm. The input arrays are not modified.
+
+        Parameters
+        ----------
+        resolution :
+            the resolution parameter
+        probs_out :
+            the array of degrees of the adjacency
+        probs_in :
+            the array of degrees of the transpose of the adjacency
+        self_loops :
+            the weights of self-loops
+        data, indices, indptr :
+            the CSR arrays of the symmetrized norm of the adjacency
+        labels_init :
+            the initial labels of nodes (between 0 and n - 1); if ``None``, start from singletons
+        nodes_init :
+            the nodes to visit first (with their neighbors) when starting from ``labels_init``
+        n_threads :
+            the number of threads used to move nodes
+        deadline :
+            the time (as given by ``time.perf_counter``) after which the current clustering is returned
+        random_state :
+            if specified, the random number generator used to visit nodes in random order (at each level)
+        labels_levels :
+            if specified, the list to which the labels of nodes are appended after each aggregation
+
+        Returns
+        -------
+        labels :
+            the labels of nodes
+        """
+        n = len(indptr) - 1
+        # buffers for the aggregate graphs, used alternately (weights aggregated in double precision)
+        buffers = [None, None]
+
+        labels = np.arange(n, dtype=indptr.dtype)
         increase = True
         count_aggregations = 0
         self.log.print("Starting with", n, "nodes.")
+        if labels_init is not None:
+            # warm start: only visit nodes whose neighborhood has changed, then aggregate
+            count_aggregations += 1
+            nodes_init = self._get_nodes_init(nodes_init, data, indices, indptr)
+            core_inputs = self._get_float32_inputs(probs_out, probs_in, self_loops, data, indices, indptr)
+            labels_cluster, pass_increase = fit_core_queue(resolution, *core_inputs, labels_init.astype(indptr.dtype),
+                                                           nodes_init)
+            labels, probs_out, probs_in, self_loops, data, indices, indptr = \
+                self._aggregate(labels_cluster, probs_out, probs_in, data, indices, indptr, buffers, 1)
+            if labels_levels is not None:
+                labels_levels.append(labels)
+            n = len(indptr) - 1
+            increase = n > 1
+            self.log.print("Warm start completed with", n, "clusters and ", pass_increase, "increment.")
+            if time.perf_counter() > deadline:
+                self.log.print("Time limit reached: returning the current clustering.")
+                increase = False
+            if count_aggregations == self.n_aggregations:
+                increase = False
         while increase:
             count_aggregations += 1
 
-            labels_cluster, pass_increase = self._optimize(adjacency_cluster, probs_out, probs_in)
-            _, labels_cluster = np.unique(labels_cluster, return_inverse=True)
+            order = None
+            if random_state is not None:
+                order = random_state.permutation(n).astype(indptr.dtype)
+            core_inputs = self._get_float32_inputs(probs_out, probs_in, self_loops, data, indices, indptr)
+            labels_cluster, pass_increase = self._optimize(resolution, *core_inputs, n_threads, deadline, order)
+            if time.perf_counter() > deadline:
+                _, labels_cluster = np.unique(labels_cluster, return_inverse=True)
+                labels = labels_cluster[labels]
+                if labels_levels is not None:
+                    labels_levels.append(labels)
+                self.log.print("Time limit reached after", count_aggregations - 1, "aggregations:",
+                               "returning the current clustering with", labels_cluster.max() + 1, "clusters.")
+                break
 
             if pass_increase <= self.tol_aggregation:
                 increase = False
             else:
-                membership_cluster = get_membership(labels_cluster)
-                membership = membership.dot(membership_cluster)
-                adjacency_cluster, probs_out, probs_in = self._aggregate(adjacency_cluster, probs_out, probs_in,
-                                                                         membership_cluster)
-
-                n = adjacency_cluster.shape[0]
+                labels_cluster, probs_out, probs_in, self_loops, data, indices, indptr = \
+                    self._aggregate(labels_cluster, probs_out, probs_in, data, indices, indptr, buffers,
+                                    count_aggregations % 2)
+                labels = labels_cluster[labels]
+                if labels_levels is not None:
+                    labels_levels.append(labels)
+
+                n = len(indptr) - 1
                 if n == 1:
                     break
             self.log.print("Aggregation", count_aggregations, "completed with", n, "clusters and ",
                            pass_increase, "increment.")
             if count_aggregations == self.n_aggregations:
                 break
+        return labels
 
-        if self.sort_clusters:
-            labels = reindex_labels(membership.indices)
-        else:
-            labels = membership.indices
-        if self.shuffle_nodes:
-            reverse = np.empty(index.size, index.dtype)
-            reverse[index] = np.arange(index.size)
-            labels = labels[reverse]
+    def _fit(self, adjacency: sparse.csr_matrix, probs_out: np.ndarray, probs_in: np.ndarray,
+             labels_init: Optional[np.ndarray] = None, nodes_init: Optional[np.ndarray] = None,
+             deadline: float = np.inf, labels_levels: Optional[list] = None) -> np.ndarray:
+        """Run the multi-level algorithm on the (shuffled) adjacency.
 
-        self.labels_ = labels
-        if self.bipartite:
-            self._split_vars(input_matrix.shape)
-        self._secondary_outputs(input_matrix)
+        Parameters
+        ----------
+        adjacency :
+            Adjacency matrix of the graph.
+        probs_out, probs_in :
+            Out-weights and in-weights of nodes (sum to 1).
+        labels_init :
+            Initial labels of nodes (between 0 and n - 1). If ``None``, start from singletons.
+        nodes_init :
+            Nodes to visit first (with their neighbors) when starting from ``labels_init``.
+        deadline :
+            Time (as given by ``time.perf_counter``) after which the current clustering is returned.
+        labels_levels :
+            If specified, list to which the labels of nodes are appended after each aggregation.
+
+        Returns
+        -------
+        labels :
+            Labels of nodes.
+        """
+        adjacency_norm = adjacency / adjacency.data.sum()
+        core_inputs = self._get_core_inputs(adjacency_norm, probs_out, probs_in)
+        return self._fit_core(self.resolution, *core_inputs, labels_init=labels_init, nodes_init=nodes_init,
+                              n_threads=check_n_threads(self.n_jobs), deadline=deadline,
+                              labels_levels=labels_levels)
+
+    def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], force_bipartite: bool = False) -> 'Louvain':
+        """Fit algorithm to data.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix or biadjacency matrix of the graph.
+        force_bipartite :
+            If ``True``, force the input matrix to be considered as a biadjacency matrix even if square.
+
+        Returns
+        -------
+        self: :class:`Louvain`
+        """
+        deadline = get_deadline(self.max_time)
+        self._init_vars()
+        input_matrix = check_format(input_matrix)
+        adjacency, probs_out, probs_in, index = self._pre_processing(input_matrix, force_bipartite)
+        labels_levels = [] if self.return_levels else None
+        labels = self._fit(adjacency, probs_out, probs_in, deadline=deadline, labels_levels=labels_levels)
+        self._post_processing(input_matrix, labels, index, labels_levels)
+        return self
+
+    def partial_fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], labels: Optional[np.ndarray] = None,
+                    input_matrix_prev: Optional[Union[sparse.csr_matrix, np.ndarray]] = None,
+                    force_bipartite: bool = False) -> 'Louvain':
+        """Update the clustering after a change in the graph, starting from a previous clustering.
+
+        Only nodes incident to changed edges and their neighbors are visited first; other nodes are visited only if
+        some of their neighbors move. The clusters are then aggregated and the algorithm proceeds as usual.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix or biadjacency matrix of the (new) graph.
+        labels :
+            Previous labels of nodes (for bipartite graphs, labels of rows followed by labels of columns).
+            If ``None``, use the labels of the last fit.
+        input_matrix_prev :
+            Adjacency matrix or biadjacency matrix of the previous graph (same shape).
+            If ``None``, all nodes are visited first.
+        force_bipartite :
+            If ``True``, force the input matrix to be considered as a biadjacency matrix even if square.
+
+        Returns
+        -------
+        self: :class:`Louvain`
+
+        Example
+        -------
+        >>> from sknetwork.clustering import Louvain
+        >>> from sknetwork.data import karate_club
+        >>> louvain = Louvain()
+        >>> adjacency = karate_club()
+        >>> labels = louvain.fit_transform(adjacency)
+        >>> adjacency_new = adjacency.tolil()
+        >>> adjacency_new[0, 33] = adjacency_new[33, 0] = 1
+        >>> labels_new = louvain.partial_fit(adjacency_new.tocsr(), labels, adjacency).labels_
+        >>> len(set(labels_new))
+        4
+        """
+        deadline = get_deadline(self.max_time)
+        if labels is None:
+            if self.labels_ is None:
+                raise ValueError('No previous clustering. Either fit the model or specify the labels.')
+            if self.bipartite:
+                labels = np.hstack((self.labels_row_, self.labels_col_))
+            else:
+                labels = self.labels_
+        self._init_vars()
+        input_matrix = check_format(input_matrix)
+        adjacency, probs_out, probs_in, index = self._pre_processing(input_matrix, force_bipartite)
+        n = adjacency.shape[0]
+        labels = np.array(labels)
+        if labels.shape != (n,):
+            raise ValueError('The labels must be of length ' + str(n) + ' (number of nodes).')
 
+        if input_matrix_prev is None:
+            nodes = np.arange(n)
+        else:
+            input_matrix_prev = check_format(input_matrix_prev)
+            if input_matrix_prev.shape != input_matrix.shape:
+                raise ValueError('The previous graph must have the same shape as the new graph.')
+            diff = sparse.coo_matrix(input_matrix - input_matrix_prev)
+            diff.eliminate_zeros()
+            if self.bipartite:
+                nodes = np.hstack((diff.row, input_matrix.shape[0] + diff.col))
+            else:
+                nodes = np.hstack((diff.row, diff.col))
+            nodes = np.unique(nodes)
+        # shuffled nodes
+        reverse = np.empty(n, dtype=int)
+        reverse[index] = np.arange(n)
+        nodes = reverse[nodes]
+        _, labels = np.unique(labels[index], return_inverse=True)
+
+        labels_levels = [] if self.return_levels else None
+        labels = self._fit(adjacency, probs_out, probs_in, labels, nodes, deadline, labels_levels)
+        self._post_processing(input_matrix, labels, index, labels_levels)
         return self
+
+    def fit_resolutions(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], resolutions: Iterable[float],
+                        force_bipartite: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Fit algorithm to data for several values of the resolution.
+
+        The graph is pre-processed once and shared by all runs (read-only).
+        Runs are done in parallel threads if ``n_jobs`` is specified (nodes are then moved sequentially in each run).
+        The fitted attributes (``labels_``, etc.) are not modified.
+        The time limit ``max_time`` applies to the whole sweep.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix or biadjacency matrix of the graph.
+        resolutions :
+            Values of the resolution parameter.
+        force_bipartite :
+            If ``True``, force the input matrix to be considered as a biadjacency matrix even if square.
+
+        Returns
+        -------
+        labels : np.ndarray
+            Labels of nodes for each resolution, shape (n_resolutions, n_nodes).
+            For bipartite graphs, labels of rows followed by labels of columns.
+        modularities : np.ndarray
+            Value of the objective function for each resolution (at this resolution).
+
+        Example
+        -------
+        >>> from sknetwork.clustering import Louvain
+        >>> from sknetwork.data import karate_club
+        >>> louvain = Louvain()
+        >>> adjacency = karate_club()
+        >>> labels, modularities = louvain.fit_resolutions(adjacency, [0.5, 1, 2])
+        >>> labels.shape
+        (3, 34)
+        >>> [len(set(labels_)) for labels_ in labels]
+        [2, 4, 7]
+        """
+        deadline = get_deadline(self.max_time)
+        input_matrix = check_format(input_matrix)
+        adjacency, probs_out, probs_in, index = self._pre_processing(input_matrix, force_bipartite)
+        adjacency_norm = adjacency / adjacency.data.sum()
+        core_inputs = self._get_core_inputs(adjacency_norm, probs_out, probs_in)
+        probs_out, probs_in, _, data, indices, indptr = core_inputs
+        # edges within clusters (for the objective function)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+        def fit_resolution(resolution: float) -> Tuple[np.ndarray, float]:
+            labels = self._fit_core(resolution, *core_inputs, deadline=deadline)
+            fit = data[labels[rows] == labels[indices]].sum(dtype=float)
+            diversity = np.bincount(labels, probs_out).dot(np.bincount(labels, probs_in))
+            return self._get_labels(labels, index), fit - resolution * diversity
+
+        n_threads = check_n_threads(self.n_jobs)
+        resolutions = list(resolutions)
+        if n_threads > 1:
+            with ThreadPool(n_threads) as pool:
+                results = pool.map(fit_resolution, resolutions)
+        else:
+            results = list(map(fit_resolution, resolutions))
+        labels = np.array([labels for labels, _ in results])
+        modularities = np.array([modularity for _, modularity in results])
+        return labels, modularities
+
+    def fit_clusters(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], labels: np.ndarray) -> np.ndarray:
+        """Apply the algorithm to the subgraph induced by each cluster of a clustering.
+
+        The subgraphs are extracted at once, as slices of the same arrays (see :func:`sknetwork.utils.get_blocks`).
+        Clusters are processed in parallel threads if ``n_jobs`` is specified (largest clusters first,
+        nodes being moved sequentially in each cluster).
+        If ``shuffle_nodes`` is ``True``, each cluster gets its own random seed, so that the result does not depend
+        on ``n_jobs``. The fitted attributes (``labels_``, etc.) are not modified.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix of the graph.
+        labels :
+            Labels of nodes (clusters). Negative labels are ignored.
+
+        Returns
+        -------
+        labels_new : np.ndarray
+            Labels of nodes, refining the clustering, in increasing order of cluster then of label within the cluster
+            (-1 for nodes with negative labels).
+
+        Example
+        -------
+        >>> from sknetwork.clustering import Louvain
+        >>> from sknetwork.data import karate_club
+        >>> louvain = Louvain()
+        >>> adjacency = karate_club()
+        >>> labels = louvain.fit_transform(adjacency)
+        >>> labels_new = louvain.fit_clusters(adjacency, labels)
+        >>> len(set(labels)), len(set(labels_new))
+        (4, 9)
+        """
+        input_matrix = check_format(input_matrix)
+        check_square(input_matrix)
+        labels = np.asarray(labels, dtype=int)
+        nodes, blocks = get_blocks(input_matrix, labels)
+        seeds = [None] * len(blocks)
+        if self.shuffle_nodes:
+            seeds = self.random_state.randint(np.iinfo(np.int32).max, size=len(blocks))
+
+        def fit_cluster(index: int) -> np.ndarray:
+            block = blocks[index]
+            if block.shape[0] < 2 or not block.nnz:
+                return np.zeros(block.shape[0], dtype=int)
+            louvain = copy(self)
+            louvain.n_jobs = None
+            louvain.return_membership = False
+            louvain.return_aggregate = False
+            if seeds[index] is not None:
+                louvain.random_state = np.random.RandomState(seeds[index])
+            return louvain.fit_transform(block)
+
+        n_threads = check_n_threads(self.n_jobs)
+        if n_threads > 1:
+            index = np.argsort([-block.shape[0] for block in blocks], kind='stable')
+            with ThreadPool(n_threads) as pool:
+                results = pool.map(fit_cluster, index, chunksize=1)
+            results = [results[i] for i in np.argsort(index)]
+        else:
+            results = list(map(fit_cluster, range(len(blocks))))
+
+        labels_new = -np.ones(len(labels), dtype=int)
+        label = 0
+        for nodes_cluster, labels_cluster in zip(nodes, results):
+            if len(nodes_cluster):
+                labels_cluster = np.unique(labels_cluster, return_inverse=True)[1].ravel()
+                labels_new[nodes_cluster] = label + labels_cluster
+                label += labels_cluster.max() + 1
+        return labels_new
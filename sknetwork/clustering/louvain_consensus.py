@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+from multiprocessing.pool import ThreadPool
+from typing import Optional, Union
+
+import numpy as np
+from scipy import sparse
+
+from sknetwork.clustering.base import BaseClustering
+from sknetwork.clustering.louvain import Louvain
+from sknetwork.utils.check import check_format, check_n_threads, check_random_state
+from sknetwork.utils.verbose import VerboseMixin
+
+
+class LouvainConsensus(BaseClustering, VerboseMixin):
+    """Consensus clustering from several runs of the Louvain algorithm, with nodes visited in random order.
+
+    Each edge of the graph is weighted by the fraction of runs in which its endpoints belong to the same cluster
+    (co-assignment), and edges whose weight is below some threshold are removed.
+    The procedure is repeated on this consensus graph until all runs agree; the clusters are then the connected
+    components of the consensus graph. If the runs still disagree after ``n_iter`` iterations,
+    the Louvain algorithm is applied to the final consensus graph.
+
+    Co-assignment is only computed on the edges of the graph (no matrix of size :math:`n \\times n`).
+
+    Parameters
+    ----------
+    n_runs :
+        Number of runs of the Louvain algorithm at each iteration.
+    threshold :
+        Minimum fraction of runs in which the endpoints of an edge must be in the same cluster
+        for this edge to be kept in the consensus graph.
+    n_iter :
+        Maximum number of iterations.
+    resolution :
+        Resolution parameter.
+    modularity : str
+        Which objective function to maximize. Can be ``'Dugue'``, ``'Newman'`` or ``'Potts'`` (default = ``'dugue'``).
+    tol_optimization :
+        Minimum increase in the objective function to enter a new optimization pass.
+    tol_aggregation :
+        Minimum increase in the objective function to enter a new aggregation pass.
+    n_aggregations :
+        Maximum number of aggregations.
+        A negative value is interpreted as no limit.
+    sort_clusters :
+        If ``True``, sort labels in decreasing order of cluster size.
+    return_membership :
+        If ``True``, return the membership matrix of nodes to each cluster (soft clustering).
+    return_aggregate :
+        If ``True``, return the adjacency matrix of the graph between clusters.
+    random_state :
+        Random number generator or random seed. If None, numpy.random is used.
+    n_jobs :
+        Number of threads running the Louvain algorithm in parallel (-1 means the maximum number).
+        If ``None`` (default), runs are sequential. All runs share the same (read-only) graph.
+    verbose :
+        Verbose mode.
+
+    Attributes
+    ----------
+    labels_ : np.ndarray
+        Labels of the nodes.
+    labels_row_ : np.ndarray
+        Labels of the rows (for bipartite graphs).
+    labels_col_ : np.ndarray
+        Labels of the columns (for bipartite graphs).
+    membership_ : sparse.csr_matrix
+        Membership matrix of the nodes, shape (n_nodes, n_clusters).
+    membership_row_ : sparse.csr_matrix
+        Membership matrix of the rows (for bipartite graphs).
+    membership_col_ : sparse.csr_matrix
+        Membership matrix of the columns (for bipartite graphs).
+    aggregate_ : sparse.csr_matrix
+        Aggregate adjacency matrix or biadjacency matrix between clusters.
+
+    Example
+    -------
+    >>> from sknetwork.clustering import LouvainConsensus
+    >>> from sknetwork.data import karate_club
+    >>> louvain_consensus = LouvainConsensus(random_state=0)
+    >>> adjacency = karate_club()
+    >>> labels = louvain_consensus.fit_transform(adjacency)
+    >>> len(set(labels))
+    4
+
+    References
+    ----------
+    Lancichinetti, A., & Fortunato, S. (2012).
+    `Consensus clustering in complex networks.
+    <https://www.nature.com/articles/srep00336>`_
+    Scientific reports, 2(1).
+    """
+    def __init__(self, n_runs: int = 10, threshold: float = 0.5, n_iter: int = 5, resolution: float = 1,
+                 modularity: str = 'dugue', tol_optimization: float = 1e-3, tol_aggregation: float = 1e-3,
+                 n_aggregations: int = -1, sort_clusters: bool = True, return_membership: bool = True,
+                 return_aggregate: bool = True, random_state: Optional[Union[np.random.RandomState, int]] = None,
+                 n_jobs: Optional[int] = None, verbose: bool = False):
+        super(LouvainConsensus, self).__init__(sort_clusters=sort_clusters, return_membership=return_membership,
+                                               return_aggregate=return_aggregate)
+        VerboseMixin.__init__(self, verbose)
+
+        self.n_runs = n_runs
+        self.threshold = threshold
+        self.n_iter = n_iter
+        self.resolution = resolution
+        self.modularity = modularity.lower()
+        self.random_state = check_random_state(random_state)
+        self.n_jobs = n_jobs
+        self._clustering_method = Louvain(resolution=resolution, modularity=modularity,
+                                          tol_optimization=tol_optimization, tol_aggregation=tol_aggregation,
+                                          n_aggregations=n_aggregations, sort_clusters=sort_clusters,
+                                          verbose=verbose)
+
+    def _get_co_assignment(self, core_inputs: tuple, rows: np.ndarray) -> np.ndarray:
+        """Run the Louvain algorithm ``n_runs`` times and count co-assignments on edges.
+
+        Parameters
+        ----------
+        core_inputs :
+            the inputs of the Cython core functions (node weights, self-loops and CSR arrays)
+        rows :
+            the row of each edge of the CSR arrays
+
+        Returns
+        -------
+        counts :
+            the number of runs in which the endpoints of each edge are in the same cluster
+        """
+        indices = core_inputs[4]
+        seeds = self.random_state.randint(np.iinfo(np.int32).max, size=self.n_runs)
+
+        def fit_run(seed: int) -> np.ndarray:
+            labels = self._clustering_method._fit_core(self.resolution, *core_inputs,
+                                                       random_state=np.random.RandomState(seed))
+            return labels[rows] == labels[indices]
+
+        counts = np.zeros(len(indices), dtype=int)
+        n_threads = check_n_threads(self.n_jobs)
+        if n_threads > 1:
+            with ThreadPool(n_threads) as pool:
+                for co_assigned in pool.imap_unordered(fit_run, seeds):
+                    counts += co_assigned
+        else:
+            for seed in seeds:
+                counts += fit_run(seed)
+        return counts
+
+    def _get_consensus_inputs(self, weights: np.ndarray, rows: np.ndarray, indices: np.ndarray, n: int) -> tuple:
+        """Get the inputs of the Cython core functions for the consensus graph.
+
+        Parameters
+        ----------
+        weights :
+            the weights of the edges of the consensus graph
+        rows, indices :
+            the endpoints of the edges of the consensus graph (sorted by row)
+        n :
+            the number of nodes
+
+        Returns
+        -------
+        Node out-weights, node in-weights, self-loops, data, indices, indptr of the consensus graph.
+        """
+        indptr = np.zeros(n + 1, dtype=indices.dtype)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=n))
+        data = weights / weights.sum()
+        if self.modularity == 'potts':
+            probs = np.ones(n) / n
+        else:
+            probs = np.bincount(rows, data, minlength=n)
+        self_loops = np.zeros(n)
+        loops = rows == indices
+        self_loops[rows[loops]] = data[loops]
+        return probs, probs.copy(), self_loops, data, indices, indptr
+
+    def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], force_bipartite: bool = False) \
+            -> 'LouvainConsensus':
+        """Fit algorithm to data.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix or biadjacency matrix of the graph.
+        force_bipartite :
+            If ``True``, force the input matrix to be considered as a biadjacency matrix even if square.
+
+        Returns
+        -------
+        self: :class:`LouvainConsensus`
+        """
+        self._init_vars()
+        louvain = self._clustering_method
+        input_matrix = check_format(input_matrix)
+        adjacency, probs_out, probs_in, index = louvain._pre_processing(input_matrix, force_bipartite)
+        n = adjacency.shape[0]
+
+        adjacency_norm = adjacency / adjacency.data.sum()
+        core_inputs = louvain._get_core_inputs(adjacency_norm, probs_out, probs_in)
+        indices, indptr = core_inputs[4], core_inputs[5]
+        rows = np.repeat(np.arange(n, dtype=indptr.dtype), np.diff(indptr))
+
+        agreement = False
+        for iteration in range(self.n_iter):
+            counts = self._get_co_assignment(core_inputs, rows)
+            mask = counts >= self.threshold * self.n_runs
+            rows, indices, counts = rows[mask], indices[mask], counts[mask]
+            agreement = np.all(counts == self.n_runs)
+            self.log.print("Iteration", iteration + 1, "completed with", mask.sum(), "edges, agreement:", agreement)
+            if agreement:
+                break
+            core_inputs = self._get_consensus_inputs(counts / self.n_runs, rows, indices, n)
+
+        if agreement:
+            consensus = sparse.csr_matrix((np.ones(len(rows)), (rows, indices)), shape=(n, n))
+            labels = sparse.csgraph.connected_components(consensus, directed=False)[1]
+        else:
+            labels = louvain._fit_core(self.resolution, *core_inputs, random_state=self.random_state)
+
+        self.labels_ = louvain._get_labels(labels, index)
+        self.bipartite = louvain.bipartite
+        if self.bipartite:
+            self._split_vars(input_matrix.shape)
+        self._secondary_outputs(input_matrix)
+        return self
@@ -2,8 +2,14 @@
 # cython: language_level=3
 # cython: linetrace=True
 # distutils: define_macros=CYTHON_TRACE_NOGIL=1
+from libcpp.queue cimport queue
 from libcpp.set cimport set
 from libcpp.vector cimport vector
+from cython.parallel import prange, threadid
+from libc.math cimport INFINITY
+from time import perf_counter
+
+import numpy as np
 cimport cython
 
 ctypedef fused int_or_long:
@@ -13,7 +19,8 @@ ctypedef fused int_or_long:
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def fit_core(float resolution, float tol, float[:] ou_node_probs, float[:] in_node_probs, float[:] self_loops,
-             float[:] data, int_or_long[:] indices, int_or_long[:] indptr):  # pragma: no cover
+             float[:] data, int_or_long[:] indices, int_or_long[:] indptr, double deadline=INFINITY,
+             int_or_long[:] order=None):  # pragma: no cover
     """Fit the clusters to the objective function.
 
     Parameters
@@ -34,6 +41,10 @@ def fit_core(float resolution, float tol, float[:] ou_node_probs, float[:] in_no
         CSR format index array of the normalized adjacency matrix.
     indptr :
         CSR format index pointer array of the normalized adjacency matrix.
+    deadline :
+        Time (as given by ``time.perf_counter``) after which no new optimization pass is started.
+    order :
+        Order in which nodes are visited (default = increasing index).
 
     Returns
     -------
@@ -51,7 +62,9 @@ def fit_core(float resolution, float tol, float[:] ou_node_probs, float[:] in_no
     cdef int_or_long j
     cdef int_or_long j1
     cdef int_or_long j2
+    cdef int_or_long k
     cdef int_or_long label
+    cdef bint has_order = order is not None
 
     cdef float increase_total = 0
     cdef float increase_pass
@@ -64,71 +77,657 @@ def fit_core(float resolution, float tol, float[:] ou_node_probs, float[:] in_no
     cdef float ratio_in
     cdef float ratio_ou
 
-    cdef vector[int_or_long] labels
+    labels_ = np.arange(n, dtype=np.asarray(indptr).dtype)
+    cdef int_or_long[:] labels = labels_
     cdef vector[float] neighbor_clusters_weights
     cdef vector[float] ou_clusters_weights
     cdef vector[float] in_clusters_weights
     cdef set[int_or_long] unique_clusters = ()
 
+    with nogil:
+        for i in range(n):
+            neighbor_clusters_weights.push_back(0.)
+            ou_clusters_weights.push_back(ou_node_probs[i])
+            in_clusters_weights.push_back(in_node_probs[i])
+
+        while increase == 1:
+            increase = 0
+            increase_pass = 0
+
+            for k in range(n):
+                if has_order:
+                    i = order[k]
+                else:
+                    i = k
+                unique_clusters.clear()
+                cluster_node = labels[i]
+                j1 = indptr[i]
+                j2 = indptr[i + 1]
+
+                for j in range(j1, j2):
+                    label = labels[indices[j]]
+                    neighbor_clusters_weights[label] += data[j]
+                    unique_clusters.insert(label)
+
+                unique_clusters.erase(cluster_node)
+
+                if not unique_clusters.empty():
+                    node_prob_ou = ou_node_probs[i]
+                    node_prob_in = in_node_probs[i]
+                    ratio_ou = resolution * node_prob_ou
+                    ratio_in = resolution * node_prob_in
+
+                    delta_exit = 2 * (neighbor_clusters_weights[cluster_node] - self_loops[i])
+                    delta_exit -= ratio_ou * (in_clusters_weights[cluster_node] - node_prob_in)
+                    delta_exit -= ratio_in * (ou_clusters_weights[cluster_node] - node_prob_ou)
+
+                    delta_best = 0
+                    cluster_best = cluster_node
+
+                    for cluster in unique_clusters:
+                        delta = 2 * neighbor_clusters_weights[cluster]
+                        delta -= ratio_ou * in_clusters_weights[cluster]
+                        delta -= ratio_in * ou_clusters_weights[cluster]
+
+                        delta_local = delta - delta_exit
+                        if delta_local > delta_best:
+                            delta_best = delta_local
+                            cluster_best = cluster
+
+                        neighbor_clusters_weights[cluster] = 0
+
+                    if delta_best > 0:
+                        increase_pass += delta_best
+                        ou_clusters_weights[cluster_node] -= node_prob_ou
+                        in_clusters_weights[cluster_node] -= node_prob_in
+                        ou_clusters_weights[cluster_best] += node_prob_ou
+                        in_clusters_weights[cluster_best] += node_prob_in
+                        labels[i] = cluster_best
+
+                neighbor_clusters_weights[cluster_node] = 0
+
+            increase_total += increase_pass
+            if increase_pass > tol:
+                increase = 1
+            if increase and deadline < INFINITY:
+                with gil:
+                    if perf_counter() > deadline:
+                        increase = 0
+    return labels_, increase_total
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def get_coloring(int_or_long[:] indices, int_or_long[:] indptr):  # pragma: no cover
+    """Greedy coloring of the nodes, so that neighbors get different colors.
+
+    Parameters
+    ----------
+    indices :
+        CSR format index array of the adjacency matrix.
+    indptr :
+        CSR format index pointer array of the adjacency matrix.
+
+    Returns
+    -------
+    nodes :
+        Nodes sorted by color.
+    color_ptr :
+        Index pointer of each color in ``nodes`` (nodes of color ``c`` are ``nodes[color_ptr[c]:color_ptr[c + 1]]``).
+    """
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long n_colors = 0
+    cdef int_or_long color
+    cdef int_or_long i
+    cdef int_or_long j
+
+    dtype = np.asarray(indptr).dtype
+    colors_ = -np.ones(n, dtype=dtype)
+    forbidden_ = -np.ones(n + 1, dtype=dtype)
+    cdef int_or_long[:] colors = colors_
+    cdef int_or_long[:] forbidden = forbidden_
+
     for i in range(n):
-        labels.push_back(i)
-        neighbor_clusters_weights.push_back(0.)
-        ou_clusters_weights.push_back(ou_node_probs[i])
-        in_clusters_weights.push_back(in_node_probs[i])
+        for j in range(indptr[i], indptr[i + 1]):
+            if colors[indices[j]] >= 0:
+                forbidden[colors[indices[j]]] = i
+        color = 0
+        while forbidden[color] == i:
+            color += 1
+        colors[i] = color
+        if color == n_colors:
+            n_colors += 1
 
-    while increase == 1:
-        increase = 0
-        increase_pass = 0
+    nodes = np.argsort(colors_, kind='stable').astype(dtype)
+    color_ptr = np.zeros(n_colors + 1, dtype=dtype)
+    color_ptr[1:] = np.cumsum(np.bincount(colors_, minlength=n_colors))
+    return nodes, color_ptr
 
-        for i in range(n):
-            unique_clusters.clear()
-            cluster_node = labels[i]
-            j1 = indptr[i]
-            j2 = indptr[i + 1]
 
-            for j in range(j1, j2):
-                label = labels[indices[j]]
-                neighbor_clusters_weights[label] += data[j]
-                unique_clusters.insert(label)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def fit_core_parallel(float resolution, float tol, float[:] ou_node_probs, float[:] in_node_probs,
+                      float[:] self_loops, float[:] data, int_or_long[:] indices, int_or_long[:] indptr,
+                      int n_threads, double deadline=INFINITY):  # pragma: no cover
+    """Fit the clusters to the objective function, moving nodes in parallel.
 
-            unique_clusters.erase(cluster_node)
+    Nodes are colored so that neighbors get different colors. Nodes of the same color are moved concurrently,
+    each node choosing its best cluster given the clusters of the previous colors. The modularity is computed
+    exactly after each pass, and a pass that decreases modularity is reverted.
+
+    Parameters
+    ----------
+    resolution :
+        Resolution parameter (positive).
+    tol :
+        Minimum increase in modularity to enter a new optimization pass.
+    ou_node_probs :
+        Distribution of node weights based on their out-edges (sums to 1).
+    in_node_probs :
+        Distribution of node weights based on their in-edges (sums to 1).
+    self_loops :
+        Weights of self loops.
+    data :
+        CSR format data array of the normalized adjacency matrix.
+    indices :
+        CSR format index array of the normalized adjacency matrix.
+    indptr :
+        CSR format index pointer array of the normalized adjacency matrix.
+    n_threads :
+        Number of threads.
+    deadline :
+        Time (as given by ``time.perf_counter``) after which no new optimization pass is started.
+
+    Returns
+    -------
+    labels :
+        Cluster index of each node.
+    total_increase :
+        Score of the clustering (total increase in modularity).
+    """
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long n_colors
+    cdef int_or_long color
+    cdef int_or_long cluster
+    cdef int_or_long cluster_best
+    cdef int_or_long cluster_node
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long k
+    cdef int_or_long k1
+    cdef int_or_long k2
+    cdef int t
+
+    cdef bint increase = 1
+    cdef double modularity
+    cdef double modularity_new
+    cdef double increase_total = 0
+    cdef float delta
+    cdef float delta_best
+    cdef float delta_exit
+    cdef float delta_local
+    cdef float node_prob_in
+    cdef float node_prob_ou
+    cdef float ratio_in
+    cdef float ratio_ou
+
+    dtype = np.asarray(indptr).dtype
+    nodes_, color_ptr_ = get_coloring(indices, indptr)
+    cdef int_or_long[:] nodes = nodes_
+    cdef int_or_long[:] color_ptr = color_ptr_
+    n_colors = color_ptr.shape[0] - 1
+
+    labels_ = np.arange(n, dtype=dtype)
+    cdef int_or_long[:] labels = labels_
+    cdef int_or_long[:] moves = np.arange(n, dtype=dtype)
+    cdef float[:] ou_clusters_weights = np.array(ou_node_probs, dtype=np.float32)
+    cdef float[:] in_clusters_weights = np.array(in_node_probs, dtype=np.float32)
+    # thread-local weights of neighbor clusters
+    cdef float[:, :] neighbor_clusters_weights = np.zeros((n_threads, n), dtype=np.float32)
+
+    modularity = get_modularity_core(resolution, labels, ou_clusters_weights, in_clusters_weights, data, indices,
+                                     indptr, n_threads)
+    while increase:
+        labels_prev = labels_.copy()
+        ou_clusters_weights_prev = np.array(ou_clusters_weights)
+        in_clusters_weights_prev = np.array(in_clusters_weights)
+
+        for color in range(n_colors):
+            k1 = color_ptr[color]
+            k2 = color_ptr[color + 1]
+            for k in prange(k1, k2, nogil=True, num_threads=n_threads, schedule='guided'):
+                i = nodes[k]
+                t = threadid()
+                cluster_node = labels[i]
+                cluster_best = cluster_node
+                for j in range(indptr[i], indptr[i + 1]):
+                    neighbor_clusters_weights[t, labels[indices[j]]] += data[j]
 
-            if not unique_clusters.empty():
                 node_prob_ou = ou_node_probs[i]
                 node_prob_in = in_node_probs[i]
                 ratio_ou = resolution * node_prob_ou
                 ratio_in = resolution * node_prob_in
 
-                delta_exit = 2 * (neighbor_clusters_weights[cluster_node] - self_loops[i])
-                delta_exit -= ratio_ou * (in_clusters_weights[cluster_node] - node_prob_in)
-                delta_exit -= ratio_in * (ou_clusters_weights[cluster_node] - node_prob_ou)
+                delta_exit = 2 * (neighbor_clusters_weights[t, cluster_node] - self_loops[i])
+                delta_exit = delta_exit - ratio_ou * (in_clusters_weights[cluster_node] - node_prob_in)
+                delta_exit = delta_exit - ratio_in * (ou_clusters_weights[cluster_node] - node_prob_ou)
+                neighbor_clusters_weights[t, cluster_node] = 0
 
                 delta_best = 0
-                cluster_best = cluster_node
+                for j in range(indptr[i], indptr[i + 1]):
+                    cluster = labels[indices[j]]
+                    if neighbor_clusters_weights[t, cluster] != 0:
+                        delta = 2 * neighbor_clusters_weights[t, cluster]
+                        delta = delta - ratio_ou * in_clusters_weights[cluster]
+                        delta = delta - ratio_in * ou_clusters_weights[cluster]
+                        delta_local = delta - delta_exit
+                        # ties are broken by cluster index for results independent of the number of threads
+                        if delta_local > delta_best or (delta_local == delta_best and delta_best > 0
+                                                         and cluster < cluster_best):
+                            delta_best = delta_local
+                            cluster_best = cluster
+                        neighbor_clusters_weights[t, cluster] = 0
+                moves[i] = cluster_best
+
+            for k in range(k1, k2):
+                i = nodes[k]
+                cluster_node = labels[i]
+                cluster_best = moves[i]
+                if cluster_best != cluster_node:
+                    ou_clusters_weights[cluster_node] -= ou_node_probs[i]
+                    in_clusters_weights[cluster_node] -= in_node_probs[i]
+                    ou_clusters_weights[cluster_best] += ou_node_probs[i]
+                    in_clusters_weights[cluster_best] += in_node_probs[i]
+                    labels[i] = cluster_best
+
+        modularity_new = get_modularity_core(resolution, labels, ou_clusters_weights, in_clusters_weights, data,
+                                             indices, indptr, n_threads)
+        if modularity_new < modularity:
+            # concurrent moves decreased modularity: revert the pass
+            labels_[:] = labels_prev
+            ou_clusters_weights[:] = ou_clusters_weights_prev
+            in_clusters_weights[:] = in_clusters_weights_prev
+            break
+        increase_total += modularity_new - modularity
+        increase = modularity_new - modularity > tol and perf_counter() <= deadline
+        modularity = modularity_new
 
-                for cluster in unique_clusters:
+    return labels_, increase_total
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double get_modularity_core(float resolution, int_or_long[:] labels, float[:] ou_clusters_weights,
+                                float[:] in_clusters_weights, float[:] data, int_or_long[:] indices,
+                                int_or_long[:] indptr, int n_threads):  # pragma: no cover
+    """Modularity of a clustering, given the weights of the clusters."""
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef double fit = 0
+    cdef double diversity = 0
+
+    for i in prange(n, nogil=True, num_threads=n_threads, schedule='guided'):
+        for j in range(indptr[i], indptr[i + 1]):
+            if labels[indices[j]] == labels[i]:
+                fit += data[j]
+        diversity += ou_clusters_weights[i] * in_clusters_weights[i]
+    return fit - resolution * diversity
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def fit_core_queue(float resolution, float[:] ou_node_probs, float[:] in_node_probs, float[:] self_loops,
+                   float[:] data, int_or_long[:] indices, int_or_long[:] indptr, int_or_long[:] labels_init,
+                   int_or_long[:] nodes_init):  # pragma: no cover
+    """Fit the clusters to the objective function, visiting nodes from a queue.
+
+    Nodes are visited from a queue, initialized with some nodes. Each time a node moves, its neighbors outside its
+    new cluster are added to the queue (if not already in the queue). The algorithm stops when the queue is empty.
+
+    Parameters
+    ----------
+    resolution :
+        Resolution parameter (positive).
+    ou_node_probs :
+        Distribution of node weights based on their out-edges (sums to 1).
+    in_node_probs :
+        Distribution of node weights based on their in-edges (sums to 1).
+    self_loops :
+        Weights of self loops.
+    data :
+        CSR format data array of the normalized adjacency matrix.
+    indices :
+        CSR format index array of the normalized adjacency matrix.
+    indptr :
+        CSR format index pointer array of the normalized adjacency matrix.
+    labels_init :
+        Initial cluster index of each node (between 0 and n - 1).
+    nodes_init :
+        Nodes initially in the queue.
+
+    Returns
+    -------
+    labels :
+        Cluster index of each node.
+    total_increase :
+        Score of the clustering (total increase in modularity).
+    """
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long cluster
+    cdef int_or_long cluster_best
+    cdef int_or_long cluster_node
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long k
+
+    cdef float increase_total = 0
+    cdef float delta
+    cdef float delta_best
+    cdef float delta_exit
+    cdef float delta_local
+    cdef float node_prob_in
+    cdef float node_prob_ou
+    cdef float ratio_in
+    cdef float ratio_ou
+
+    labels_ = np.array(labels_init)
+    cdef int_or_long[:] labels = labels_
+    cdef vector[float] neighbor_clusters_weights = vector[float](n, 0)
+    cdef vector[float] ou_clusters_weights = vector[float](n, 0)
+    cdef vector[float] in_clusters_weights = vector[float](n, 0)
+    cdef vector[char] in_queue = vector[char](n, 0)
+    cdef queue[int_or_long] nodes
+
+    with nogil:
+        for i in range(n):
+            ou_clusters_weights[labels[i]] += ou_node_probs[i]
+            in_clusters_weights[labels[i]] += in_node_probs[i]
+        for k in range(nodes_init.shape[0]):
+            i = nodes_init[k]
+            if not in_queue[i]:
+                nodes.push(i)
+                in_queue[i] = 1
+
+        while not nodes.empty():
+            i = nodes.front()
+            nodes.pop()
+            in_queue[i] = 0
+            cluster_node = labels[i]
+            for j in range(indptr[i], indptr[i + 1]):
+                neighbor_clusters_weights[labels[indices[j]]] += data[j]
+
+            node_prob_ou = ou_node_probs[i]
+            node_prob_in = in_node_probs[i]
+            ratio_ou = resolution * node_prob_ou
+            ratio_in = resolution * node_prob_in
+
+            delta_exit = 2 * (neighbor_clusters_weights[cluster_node] - self_loops[i])
+            delta_exit -= ratio_ou * (in_clusters_weights[cluster_node] - node_prob_in)
+            delta_exit -= ratio_in * (ou_clusters_weights[cluster_node] - node_prob_ou)
+            neighbor_clusters_weights[cluster_node] = 0
+
+            delta_best = 0
+            cluster_best = cluster_node
+            for j in range(indptr[i], indptr[i + 1]):
+                cluster = labels[indices[j]]
+                if neighbor_clusters_weights[cluster] != 0:
                     delta = 2 * neighbor_clusters_weights[cluster]
                     delta -= ratio_ou * in_clusters_weights[cluster]
                     delta -= ratio_in * ou_clusters_weights[cluster]
-
                     delta_local = delta - delta_exit
-                    if delta_local > delta_best:
+                    if delta_local > delta_best or (delta_local == delta_best and delta_best > 0
+                                                    and cluster < cluster_best):
                         delta_best = delta_local
                         cluster_best = cluster
+                    neighbor_clusters_weights[cluster] = 0
+
+            if delta_best > 0:
+                increase_total += delta_best
+                ou_clusters_weights[cluster_node] -= node_prob_ou
+                in_clusters_weights[cluster_node] -= node_prob_in
+                ou_clusters_weights[cluster_best] += node_prob_ou
+                in_clusters_weights[cluster_best] += node_prob_in
+                labels[i] = cluster_best
+                for j in range(indptr[i], indptr[i + 1]):
+                    k = indices[j]
+                    if not in_queue[k] and labels[k] != cluster_best:
+                        nodes.push(k)
+                        in_queue[k] = 1
+
+    return labels_, increase_total
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def refine_core(float resolution, float[:] ou_node_probs, float[:] in_node_probs, float[:] data,
+                int_or_long[:] indices, int_or_long[:] indptr, int_or_long[:] labels):  # pragma: no cover
+    """Refine the clusters into well-connected sub-clusters.
+
+    Each cluster is first split into singletons. Then each singleton that is well-connected to its cluster is merged
+    with the well-connected sub-cluster of the same cluster that maximizes the increase in modularity (if positive).
+
+    Parameters
+    ----------
+    resolution :
+        Resolution parameter (positive).
+    ou_node_probs :
+        Distribution of node weights based on their out-edges (sums to 1).
+    in_node_probs :
+        Distribution of node weights based on their in-edges (sums to 1).
+    data :
+        CSR format data array of the normalized adjacency matrix.
+    indices :
+        CSR format index array of the normalized adjacency matrix.
+    indptr :
+        CSR format index pointer array of the normalized adjacency matrix.
+    labels :
+        Cluster index of each node (between 0 and n - 1).
 
+    Returns
+    -------
+    labels_refined :
+        Sub-cluster index of each node.
+    """
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long cluster
+    cdef int_or_long cluster_best
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long k
+    cdef int_or_long label
+
+    cdef float delta
+    cdef float delta_best
+    cdef float weight_best
+    cdef float node_prob_in
+    cdef float node_prob_ou
+
+    labels_refined_ = np.arange(n, dtype=np.asarray(indptr).dtype)
+    cdef int_or_long[:] labels_refined = labels_refined_
+    cdef vector[float] neighbor_clusters_weights = vector[float](n, 0)
+    cdef vector[float] ou_clusters_weights = vector[float](n, 0)
+    cdef vector[float] in_clusters_weights = vector[float](n, 0)
+    cdef vector[float] ou_refined_weights = vector[float](n, 0)
+    cdef vector[float] in_refined_weights = vector[float](n, 0)
+    # weights of edges from each sub-cluster to the rest of its cluster
+    cdef vector[float] external_weights = vector[float](n, 0)
+    cdef vector[int_or_long] sizes = vector[int_or_long](n, 1)
+
+    with nogil:
+        for i in range(n):
+            label = labels[i]
+            ou_clusters_weights[label] += ou_node_probs[i]
+            in_clusters_weights[label] += in_node_probs[i]
+            ou_refined_weights[i] = ou_node_probs[i]
+            in_refined_weights[i] = in_node_probs[i]
+            for j in range(indptr[i], indptr[i + 1]):
+                k = indices[j]
+                if k != i and labels[k] == label:
+                    external_weights[i] += data[j]
+
+        for i in range(n):
+            if sizes[i] != 1:
+                continue
+            label = labels[i]
+            node_prob_ou = ou_node_probs[i]
+            node_prob_in = in_node_probs[i]
+            # the node must be well-connected to its cluster
+            if 2 * external_weights[i] < resolution * (node_prob_ou * (in_clusters_weights[label] - node_prob_in)
+                                                       + node_prob_in * (ou_clusters_weights[label] - node_prob_ou)):
+                continue
+            for j in range(indptr[i], indptr[i + 1]):
+                k = indices[j]
+                if k != i and labels[k] == label:
+                    neighbor_clusters_weights[labels_refined[k]] += data[j]
+
+            delta_best = 0
+            weight_best = 0
+            cluster_best = i
+            for j in range(indptr[i], indptr[i + 1]):
+                k = indices[j]
+                cluster = labels_refined[k]
+                if k != i and labels[k] == label and neighbor_clusters_weights[cluster] != 0:
+                    # the sub-cluster must be well-connected to its cluster
+                    if 2 * external_weights[cluster] >= resolution * (
+                            ou_refined_weights[cluster] * (in_clusters_weights[label] - in_refined_weights[cluster])
+                            + in_refined_weights[cluster] * (ou_clusters_weights[label] - ou_refined_weights[cluster])):
+                        delta = 2 * neighbor_clusters_weights[cluster]
+                        delta -= resolution * (node_prob_ou * in_refined_weights[cluster]
+                                               + node_prob_in * ou_refined_weights[cluster])
+                        if delta > delta_best or (delta == delta_best and delta_best > 0 and cluster < cluster_best):
+                            delta_best = delta
+                            weight_best = neighbor_clusters_weights[cluster]
+                            cluster_best = cluster
                     neighbor_clusters_weights[cluster] = 0
 
-                if delta_best > 0:
-                    increase_pass += delta_best
-                    ou_clusters_weights[cluster_node] -= node_prob_ou
-                    in_clusters_weights[cluster_node] -= node_prob_in
-                    ou_clusters_weights[cluster_best] += node_prob_ou
-                    in_clusters_weights[cluster_best] += node_prob_in
-                    labels[i] = cluster_best
+            if delta_best > 0:
+                external_weights[cluster_best] += external_weights[i] - 2 * weight_best
+                ou_refined_weights[cluster_best] += node_prob_ou
+                in_refined_weights[cluster_best] += node_prob_in
+                sizes[cluster_best] += 1
+                sizes[i] = 0
+                labels_refined[i] = cluster_best
 
-            neighbor_clusters_weights[cluster_node] = 0
+    return labels_refined_
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def aggregate_core(int_or_long[:] labels, double[:] ou_node_probs, double[:] in_node_probs, double[:] data,
+                   int_or_long[:] indices, int_or_long[:] indptr, double[:] data_new, int_or_long[:] indices_new,
+                   int_or_long[:] indptr_new):  # pragma: no cover
+    """Aggregate nodes belonging to the same cluster.
+
+    The aggregate graph is written in the buffers ``data_new``, ``indices_new``, ``indptr_new``
+    (which must not share memory with the input graph). Weights are in double precision.
+
+    Parameters
+    ----------
+    labels :
+        Cluster index of each node (between 0 and n - 1).
+    ou_node_probs :
+        Distribution of node weights based on their out-edges (sums to 1).
+    in_node_probs :
+        Distribution of node weights based on their in-edges (sums to 1).
+    data :
+        CSR format data array of the normalized adjacency matrix.
+    indices :
+        CSR format index array of the normalized adjacency matrix.
+    indptr :
+        CSR format index pointer array of the normalized adjacency matrix.
+    data_new :
+        Buffer for the data array of the aggregate graph (size at least nnz).
+    indices_new :
+        Buffer for the index array of the aggregate graph (size at least nnz).
+    indptr_new :
+        Buffer for the index pointer array of the aggregate graph (size at least n + 1).
+
+    Returns
+    -------
+    labels_new :
+        Cluster index of each node (from 0 to n_clusters - 1, in increasing order of cluster index).
+    ou_clusters_probs :
+        Distribution of cluster weights based on their out-edges.
+    in_clusters_probs :
+        Distribution of cluster weights based on their in-edges.
+    self_loops :
+        Weights of self loops in the aggregate graph.
+    n_clusters :
+        Number of clusters.
+    nnz :
+        Number of edges in the aggregate graph.
+    """
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long n_clusters = 0
+    cdef int_or_long nnz = 0
+    cdef int_or_long cluster
+    cdef int_or_long cluster_neighbor
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long k
+    cdef int_or_long t
+
+    dtype = np.asarray(indptr).dtype
+    cdef vector[int_or_long] index = vector[int_or_long](n, -1)
+    with nogil:
+        for i in range(n):
+            index[labels[i]] = 0
+        for cluster in range(n):
+            if index[cluster] == 0:
+                index[cluster] = n_clusters
+                n_clusters += 1
+
+    labels_new_ = np.empty(n, dtype=dtype)
+    ou_clusters_probs_ = np.zeros(n_clusters)
+    in_clusters_probs_ = np.zeros(n_clusters)
+    self_loops_ = np.zeros(n_clusters)
+    cdef int_or_long[:] labels_new = labels_new_
+    cdef double[:] ou_clusters_probs = ou_clusters_probs_
+    cdef double[:] in_clusters_probs = in_clusters_probs_
+    cdef double[:] self_loops = self_loops_
+
+    cdef vector[int_or_long] cluster_ptr = vector[int_or_long](n_clusters + 1, 0)
+    cdef vector[int_or_long] nodes = vector[int_or_long](n, 0)
+    cdef vector[double] weights = vector[double](n_clusters, 0)
+    cdef vector[int_or_long] last_seen = vector[int_or_long](n_clusters, -1)
+    with nogil:
+        # nodes sorted by cluster
+        for i in range(n):
+            cluster = index[labels[i]]
+            labels_new[i] = cluster
+            cluster_ptr[cluster + 1] += 1
+            ou_clusters_probs[cluster] += ou_node_probs[i]
+            in_clusters_probs[cluster] += in_node_probs[i]
+        for cluster in range(n_clusters):
+            cluster_ptr[cluster + 1] += cluster_ptr[cluster]
+        for i in range(n):
+            cluster = labels_new[i]
+            nodes[cluster_ptr[cluster]] = i
+            cluster_ptr[cluster] += 1
+        for cluster in range(n_clusters, 0, -1):
+            cluster_ptr[cluster] = cluster_ptr[cluster - 1]
+        cluster_ptr[0] = 0
+
+        # contraction
+        indptr_new[0] = 0
+        for cluster in range(n_clusters):
+            t = nnz
+            for k in range(cluster_ptr[cluster], cluster_ptr[cluster + 1]):
+                i = nodes[k]
+                for j in range(indptr[i], indptr[i + 1]):
+                    cluster_neighbor = labels_new[indices[j]]
+                    if last_seen[cluster_neighbor] != cluster:
+                        last_seen[cluster_neighbor] = cluster
+                        indices_new[nnz] = cluster_neighbor
+                        nnz += 1
+                    weights[cluster_neighbor] += data[j]
+            for k in range(t, nnz):
+                cluster_neighbor = indices_new[k]
+                data_new[k] = weights[cluster_neighbor]
+                if cluster_neighbor == cluster:
+                    self_loops[cluster] = data_new[k]
+                weights[cluster_neighbor] = 0
+            indptr_new[cluster + 1] = nnz
 
-        increase_total += increase_pass
-        if increase_pass > tol:
-            increase = 1
-    return labels, increase_total
+    return labels_new_, ou_clusters_probs_, in_clusters_probs_, self_loops_, n_clusters, nnz
@@ -65,7 +65,7 @@ def get_modularity(input_matrix: Union[sparse.csr_matrix, np.ndarray], labels: n
     >>> adjacency = house()
     >>> labels = np.array([0, 0, 1, 1, 0])
     >>> np.round(get_modularity(adjacency, labels), 2)
-    0.44
+    0.11
     """
     adjacency, bipartite = get_adjacency(input_matrix.astype(float))
 
@@ -82,10 +82,102 @@ def get_modularity(input_matrix: Union[sparse.csr_matrix, np.ndarray], labels: n
     probs_col = get_probs(weights, adjacency.T)
     membership = get_membership(labels)
 
-    fit: float = membership.T.dot(adjacency.dot(membership)).data.sum() / adjacency.data.sum()
+    fit: float = membership.T.dot(adjacency.dot(membership)).diagonal().sum() / adjacency.data.sum()
     div: float = membership.T.dot(probs_col).dot(membership.T.dot(probs_row))
     mod: float = fit - resolution * div
     if return_all:
         return mod, fit, div
     else:
         return mod
+
+
+def get_modularity_batch(input_matrix: Union[sparse.csr_matrix, np.ndarray], labels: np.ndarray,
+                         labels_col: Optional[np.ndarray] = None, weights: str = 'degree',
+                         resolution: float = 1, return_all: bool = False, batch_size: int = 10000000) \
+        -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Modularity of several clusterings of the same graph.
+
+    The graph is pre-processed once and all clusterings are scored in a vectorized pass over its edges
+    (see :func:`get_modularity` for the definition of modularity).
+    Nodes with negative labels do not belong to any cluster.
+
+    Parameters
+    ----------
+    input_matrix :
+        Adjacency matrix or biadjacency matrix of the graph.
+    labels :
+        Labels of nodes, shape (n_clusterings, n_nodes), one row per clustering.
+    labels_col :
+        Labels of column nodes (for bipartite graphs), shape (n_clusterings, n_col).
+    weights :
+        Weighting of nodes (``'degree'`` (default) or ``'uniform'``).
+    resolution:
+        Resolution parameter (default = 1).
+    return_all:
+        If ``True``, return modularity, fit, diversity.
+    batch_size:
+        Maximum number of (clustering, edge) pairs processed at once (bounds memory usage).
+
+    Returns
+    -------
+    modularity : np.ndarray
+        Modularity of each clustering.
+    fit: np.ndarray, optional
+    diversity: np.ndarray, optional
+
+    Example
+    -------
+    >>> from sknetwork.clustering import get_modularity_batch
+    >>> from sknetwork.data import house
+    >>> adjacency = house()
+    >>> labels = np.array([[0, 0, 1, 1, 0], [0, 0, 0, 1, 1]])
+    >>> np.round(get_modularity_batch(adjacency, labels), 2)
+    array([ 0.11, -0.01])
+    """
+    adjacency, bipartite = get_adjacency(input_matrix.astype(float))
+    labels = np.atleast_2d(labels)
+
+    if bipartite:
+        if labels_col is None:
+            raise ValueError('For bipartite graphs, you must specify the labels of both rows and columns.')
+        labels_col = np.atleast_2d(labels_col)
+        if labels_col.shape[0] != labels.shape[0]:
+            raise ValueError('The number of clusterings of rows and columns must be the same.')
+        labels = np.hstack((labels, labels_col))
+
+    n_clusterings, n = labels.shape
+    if n != adjacency.shape[0]:
+        raise ValueError('Dimension mismatch between labels and input matrix.')
+    labels = labels.astype(int)
+
+    probs_row = get_probs(weights, adjacency)
+    probs_col = get_probs(weights, adjacency.T)
+    adjacency = sparse.csr_matrix(adjacency)
+    rows = np.repeat(np.arange(n), np.diff(adjacency.indptr))
+    indices = adjacency.indices
+    data = adjacency.data / adjacency.data.sum()
+
+    # fit: weight of edges inside clusters, computed for blocks of clusterings
+    fit = np.zeros(n_clusterings)
+    step = max(1, batch_size // max(1, len(data)))
+    for start in range(0, n_clusterings, step):
+        labels_block = labels[start:start + step]
+        labels_rows = labels_block[:, rows]
+        same_cluster = (labels_rows == labels_block[:, indices]) & (labels_rows >= 0)
+        fit[start:start + step] = same_cluster.dot(data)
+
+    # diversity: weights of clusters, indexed consecutively over all clusterings (at most n per clustering)
+    mask = labels >= 0
+    clusterings = np.nonzero(mask)[0]
+    values, labels_ = np.unique(labels[mask], return_inverse=True)
+    keys, clusters = np.unique(clusterings * len(values) + labels_.ravel(), return_inverse=True)
+    clusters = clusters.ravel()
+    probs_out = np.bincount(clusters, np.broadcast_to(probs_row, labels.shape)[mask], minlength=len(keys))
+    probs_in = np.bincount(clusters, np.broadcast_to(probs_col, labels.shape)[mask], minlength=len(keys))
+    div = np.bincount(keys // max(len(values), 1), probs_out * probs_in, minlength=n_clusterings)
+
+    mod = fit - resolution * div
+    if return_all:
+        return mod, fit, div
+    else:
+        return mod
@@ -4,7 +4,7 @@
 Created on May, 2020
 @author: Thomas Bonald <tbonald@enst.fr>
 """
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 from scipy import sparse
@@ -29,12 +29,21 @@ class PropagationClustering(BaseClustering, Propagation):
     weighted : bool
         If ``True``, the vote of each neighbor is proportional to the edge weight.
         Otherwise, all votes have weight 1.
+        Ties are broken in favor of the smallest label.
     sort_clusters :
         If ``True``, sort labels in decreasing order of cluster size.
     return_membership :
         If ``True``, return the membership matrix of nodes to each cluster (soft clustering).
     return_aggregate :
         If ``True``, return the aggregate adjacency matrix or biadjacency matrix between clusters.
+    synchronous : bool
+        If ``True``, all node labels are updated at the same time, from the labels of the previous iteration
+        (the node order is then irrelevant and the result does not depend on the number of threads).
+        Otherwise (default), node labels are updated one after the other.
+    n_jobs : int
+        Number of threads used to update node labels (-1 means the maximum number).
+        If ``None`` (default), a single thread is used.
+        In asynchronous mode, the result may then depend on the number of threads.
 
     Attributes
     ----------
@@ -72,8 +81,9 @@ class PropagationClustering(BaseClustering, Propagation):
     Physical review E, 76(3), 036106.
     """
     def __init__(self, n_iter: int = 5, node_order: str = 'decreasing', weighted: bool = True,
-                 sort_clusters: bool = True, return_membership: bool = True, return_aggregate: bool = True):
-        Propagation.__init__(self, n_iter, node_order, weighted)
+                 sort_clusters: bool = True, return_membership: bool = True, return_aggregate: bool = True,
+                 synchronous: bool = False, n_jobs: Optional[int] = None):
+        Propagation.__init__(self, n_iter, node_order, weighted, synchronous, n_jobs)
         BaseClustering.__init__(self, sort_clusters, return_membership, return_aggregate)
         self.bipartite = None
 
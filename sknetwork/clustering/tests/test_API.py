@@ -12,7 +12,9 @@ from sknetwork.embedding.svd import GSVD
 class TestClusteringAPI(unittest.TestCase):
 
     def test_regular(self):
-        for algo in [Louvain(return_aggregate=True), KMeans(embedding_method=GSVD(3), return_aggregate=True),
+        for algo in [Louvain(return_aggregate=True), Leiden(return_aggregate=True),
+                     LouvainConsensus(n_runs=3, return_aggregate=True),
+                     KMeans(embedding_method=GSVD(3), return_aggregate=True),
                      PropagationClustering(return_aggregate=True)]:
             for adjacency in [test_graph(), test_digraph(), test_graph_disconnect()]:
                 n = adjacency.shape[0]
@@ -29,7 +31,8 @@ class TestClusteringAPI(unittest.TestCase):
     def test_bipartite(self):
         biadjacency = test_bigraph()
         n_row, n_col = biadjacency.shape
-        for algo in [Louvain(return_aggregate=True),
+        for algo in [Louvain(return_aggregate=True), Leiden(return_aggregate=True),
+                     LouvainConsensus(n_runs=3, return_aggregate=True),
                      KMeans(embedding_method=GSVD(3), co_cluster=True, return_aggregate=True),
                      PropagationClustering(return_aggregate=True)]:
             algo.fit_transform(biadjacency)
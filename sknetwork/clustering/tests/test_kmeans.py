@@ -45,3 +45,12 @@ class TestKMeans(unittest.TestCase):
             self.assertEqual(algo_options.membership_row_.shape, (n_row, 4))
             self.assertEqual(algo_options.membership_col_.shape, (n_col, 4))
             self.assertEqual(algo_options.aggregate_.shape, (4, 4))
+
+    def test_minibatch(self):
+        adjacency = test_graph()
+        algo = KMeans(3, GSVD(2), solver='minibatch', random_state=0)
+        labels = algo.fit_transform(adjacency)
+        self.assertEqual(len(labels), adjacency.shape[0])
+        self.assertEqual(algo.membership_.shape[0], adjacency.shape[0])
+        with self.assertRaises(ValueError):
+            KMeans(3, GSVD(2), solver='elkan').fit(adjacency)
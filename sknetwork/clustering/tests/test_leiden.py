@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for Leiden"""
+import unittest
+
+from sknetwork.clustering import Leiden, Louvain, get_modularity
+from sknetwork.data import karate_club, star_wars, block_model
+from sknetwork.data.test_graphs import *
+from sknetwork.utils import bipartite2undirected
+
+
+class TestLeidenClustering(unittest.TestCase):
+
+    def test_disconnected(self):
+        adjacency = test_graph_disconnect()
+        n = adjacency.shape[0]
+        labels = Leiden().fit_transform(adjacency)
+        self.assertEqual(len(labels), n)
+
+    def test_modularity(self):
+        adjacency = karate_club()
+        labels = Leiden().fit_transform(adjacency)
+        self.assertAlmostEqual(get_modularity(adjacency, labels), 0.42, 2)
+        adjacency = block_model([20] * 5, p_in=.5, p_out=.02, seed=0)
+        labels_louvain = Louvain().fit_transform(adjacency)
+        labels_leiden = Leiden().fit_transform(adjacency)
+        self.assertAlmostEqual(get_modularity(adjacency, labels_leiden), 0.66, 2)
+        self.assertGreaterEqual(get_modularity(adjacency, labels_leiden),
+                                get_modularity(adjacency, labels_louvain) - 0.01)
+
+    def test_connected_clusters(self):
+        adjacency = block_model([50] * 4, p_in=.2, p_out=.05, seed=0)
+        labels = Leiden().fit_transform(adjacency)
+        for label in np.unique(labels):
+            mask = labels == label
+            n_components = sparse.csgraph.connected_components(adjacency[mask][:, mask])[0]
+            self.assertEqual(n_components, 1)
+
+    def test_bipartite(self):
+        biadjacency = star_wars()
+        adjacency = bipartite2undirected(biadjacency)
+        leiden = Leiden(modularity='newman')
+        labels1 = leiden.fit_transform(adjacency)
+        leiden.fit(biadjacency)
+        labels2 = np.concatenate((leiden.labels_row_, leiden.labels_col_))
+        self.assertTrue((labels1 == labels2).all())
+
+    def test_options(self):
+        adjacency = karate_club()
+        for modularity in ['dugue', 'newman', 'potts']:
+            labels = Leiden(modularity=modularity).fit_transform(adjacency)
+            self.assertEqual(len(labels), adjacency.shape[0])
+        leiden = Leiden(resolution=2, shuffle_nodes=True, random_state=42)
+        labels = leiden.fit_transform(adjacency)
+        n_labels = len(set(labels))
+        self.assertEqual(leiden.aggregate_.shape, (n_labels, n_labels))
+        Leiden(n_aggregations=1, sort_clusters=False).fit(adjacency)
+        # 64-bit index
+        adjacency.indices = adjacency.indices.astype(np.int64)
+        adjacency.indptr = adjacency.indptr.astype(np.int64)
+        labels = Leiden().fit_transform(adjacency)
+        self.assertEqual(len(set(labels)), 4)
+
+    def test_partial_fit(self):
+        adjacency = karate_club()
+        leiden = Leiden()
+        labels = leiden.fit_transform(adjacency)
+        labels_new = leiden.partial_fit(adjacency, labels, adjacency).labels_
+        self.assertTrue((labels_new == labels).all())
+        adjacency_new = adjacency.tolil()
+        adjacency_new[0, 33] = adjacency_new[33, 0] = 1
+        adjacency_new = adjacency_new.tocsr()
+        labels_new = leiden.partial_fit(adjacency_new, labels, adjacency).labels_
+        self.assertGreater(get_modularity(adjacency_new, labels_new), 0.4)
+
+    def test_fit_resolutions(self):
+        adjacency = karate_club()
+        labels, modularities = Leiden().fit_resolutions(adjacency, [1, 2])
+        self.assertTrue((Leiden(resolution=2).fit_transform(adjacency) == labels[1]).all())
+        self.assertEqual(len(modularities), 2)
+
+    def test_max_time(self):
+        adjacency = karate_club()
+        leiden = Leiden(max_time=0)
+        labels = leiden.fit_transform(adjacency)
+        self.assertEqual(len(labels), 34)
+        self.assertIn('Time limit', str(leiden.log))
+
+    def test_invalid(self):
+        adjacency = karate_club()
+        leiden = Leiden(modularity='toto')
+        with self.assertRaises(ValueError):
+            leiden.fit(adjacency)
@@ -3,10 +3,11 @@
 """Tests for Louvain"""
 import unittest
 
-from sknetwork.clustering import Louvain
-from sknetwork.data import karate_club, star_wars
+from sknetwork.clustering import Louvain, Leiden, get_modularity
+from sknetwork.data import albert_barabasi, karate_club, star_wars
 from sknetwork.data.test_graphs import *
 from sknetwork.utils import bipartite2undirected
+from sknetwork.utils.membership import get_membership
 
 
 class TestLouvainClustering(unittest.TestCase):
@@ -97,6 +98,162 @@ class TestLouvainClustering(unittest.TestCase):
         # check if labels are 64-bit
         self.assertEqual(labels.dtype, np.int64)
 
+    def test_parallel(self):
+        for adjacency in [karate_club(), test_digraph(), test_graph_disconnect()]:
+            labels = Louvain().fit_transform(adjacency)
+            modularity = get_modularity(adjacency, labels)
+            labels_parallel = Louvain(n_jobs=2).fit_transform(adjacency)
+            self.assertEqual(len(labels_parallel), adjacency.shape[0])
+            modularity_parallel = get_modularity(adjacency, labels_parallel)
+            self.assertAlmostEqual(modularity_parallel, modularity, delta=0.05)
+            # better than singletons
+            modularity_singletons = get_modularity(adjacency, np.arange(adjacency.shape[0]))
+            self.assertGreater(modularity_parallel, modularity_singletons)
+            # same result for any number of threads
+            self.assertTrue((Louvain(n_jobs=4).fit_transform(adjacency) == labels_parallel).all())
+        # 64-bit index
+        adjacency = karate_club()
+        adjacency.indices = adjacency.indices.astype(np.int64)
+        adjacency.indptr = adjacency.indptr.astype(np.int64)
+        labels = Louvain(n_jobs=-1).fit_transform(adjacency)
+        self.assertEqual(len(labels), adjacency.shape[0])
+
+    def test_aggregate(self):
+        adjacency = karate_club()
+        adjacency = adjacency / adjacency.data.sum()
+        probs = adjacency.dot(np.ones(adjacency.shape[1]))
+        louvain = Louvain()
+        probs_out, probs_in, _, data, indices, indptr = louvain._get_core_inputs(adjacency, probs, probs)
+        labels = np.array([2, 2, 0, 5] * 8 + [0, 5], dtype=indptr.dtype)
+        labels_new, probs_out_new, _, self_loops, data, indices, indptr = \
+            louvain._aggregate(labels, probs_out, probs_in, data, indices, indptr, [None], 0)
+        membership = get_membership(labels_new)
+        aggregate = membership.T.dot(adjacency.dot(membership)).toarray()
+        self.assertTrue((labels_new == np.unique(labels, return_inverse=True)[1]).all())
+        self.assertTrue(np.allclose(sparse.csr_matrix((data, indices, indptr)).toarray(), aggregate))
+        self.assertTrue(np.allclose(self_loops, aggregate.diagonal()))
+        self.assertTrue(np.allclose(probs_out_new, membership.T.dot(probs)))
+        # same clusters as the aggregation of sparse matrices (weights aggregated in double precision)
+        adjacency = albert_barabasi(20000, 3, seed=0)
+        self.assertEqual(len(set(Louvain(n_aggregations=3).fit_transform(adjacency))), 154)
+        self.assertEqual(len(set(Louvain().fit_transform(adjacency))), 49)
+
+    def test_partial_fit(self):
+        adjacency = karate_club()
+        louvain = Louvain()
+        labels = louvain.fit_transform(adjacency)
+        # no change
+        labels_new = louvain.partial_fit(adjacency, labels, adjacency).labels_
+        self.assertEqual(get_modularity(adjacency, labels_new), get_modularity(adjacency, labels))
+        # new edges
+        adjacency_new = adjacency.tolil()
+        adjacency_new[0, 33] = adjacency_new[33, 0] = 1
+        adjacency_new = adjacency_new.tocsr()
+        labels_new = louvain.partial_fit(adjacency_new).labels_
+        self.assertEqual(len(labels_new), adjacency.shape[0])
+        labels_new = louvain.partial_fit(adjacency_new, labels, adjacency).labels_
+        self.assertGreater(get_modularity(adjacency_new, labels_new), 0.4)
+        # number of aggregations (including the warm start)
+        adjacency_ab = albert_barabasi(1000, 3, seed=0)
+        labels_ab = np.arange(1000)
+        for n_aggregations in [1, 2]:
+            louvain_ab = Louvain(n_aggregations=n_aggregations, return_levels=True)
+            louvain_ab.partial_fit(adjacency_ab, labels_ab, adjacency_ab)
+            self.assertEqual(len(louvain_ab.labels_levels_), n_aggregations)
+        # shuffled nodes
+        louvain = Louvain(shuffle_nodes=True, random_state=0)
+        labels_new = louvain.partial_fit(adjacency, labels, adjacency).labels_
+        self.assertEqual(get_modularity(adjacency, labels_new), get_modularity(adjacency, labels))
+        # bipartite
+        biadjacency = star_wars()
+        louvain = Louvain()
+        louvain.fit(biadjacency)
+        labels = np.hstack((louvain.labels_row_, louvain.labels_col_))
+        louvain.partial_fit(biadjacency)
+        self.assertTrue((np.hstack((louvain.labels_row_, louvain.labels_col_)) == labels).all())
+        # errors
+        with self.assertRaises(ValueError):
+            Louvain().partial_fit(adjacency)
+        with self.assertRaises(ValueError):
+            Louvain().partial_fit(adjacency, labels[:10])
+        with self.assertRaises(ValueError):
+            Louvain().partial_fit(adjacency, labels[:34], biadjacency)
+
+    def test_fit_resolutions(self):
+        adjacency = karate_club()
+        resolutions = [0.5, 1, 2]
+        labels, modularities = Louvain().fit_resolutions(adjacency, resolutions)
+        self.assertEqual(labels.shape, (3, 34))
+        self.assertEqual(modularities.shape, (3,))
+        for resolution, labels_ in zip(resolutions, labels):
+            self.assertTrue((Louvain(resolution=resolution).fit_transform(adjacency) == labels_).all())
+        self.assertAlmostEqual(modularities[1], 0.4188, 3)
+        # threads
+        labels_parallel, modularities_parallel = Louvain(n_jobs=2).fit_resolutions(adjacency, resolutions)
+        self.assertTrue((labels_parallel == labels).all())
+        self.assertTrue(np.allclose(modularities_parallel, modularities))
+        # bipartite
+        biadjacency = star_wars()
+        labels, _ = Louvain(shuffle_nodes=True).fit_resolutions(biadjacency, resolutions)
+        self.assertEqual(labels.shape, (3, sum(biadjacency.shape)))
+
+    def test_labels_levels(self):
+        adjacency = karate_club()
+        self.assertIsNone(Louvain().fit(adjacency).labels_levels_)
+        for algo in [Louvain(return_levels=True), Louvain(return_levels=True, shuffle_nodes=True, random_state=0),
+                     Leiden(return_levels=True)]:
+            labels = algo.fit_transform(adjacency)
+            labels_levels = algo.labels_levels_
+            self.assertEqual(labels_levels.shape[1], 34)
+            self.assertTrue((labels_levels[-1] == labels).all())
+            # nested clusterings
+            for labels_fine, labels_coarse in zip(labels_levels[:-1], labels_levels[1:]):
+                for label in np.unique(labels_fine):
+                    self.assertEqual(len(np.unique(labels_coarse[labels_fine == label])), 1)
+        labels_levels = Louvain(n_aggregations=1, return_levels=True).fit(adjacency).labels_levels_
+        self.assertEqual(len(labels_levels), 1)
+        labels_levels = Louvain(return_levels=True).fit(star_wars()).labels_levels_
+        self.assertEqual(labels_levels.shape[1], sum(star_wars().shape))
+
+    def test_fit_clusters(self):
+        adjacency = karate_club()
+        labels = Louvain().fit_transform(adjacency)
+        labels_new = Louvain().fit_clusters(adjacency, labels)
+        self.assertEqual(len(labels_new), 34)
+        for label in np.unique(labels_new):
+            self.assertEqual(len(np.unique(labels[labels_new == label])), 1)
+        # same as Louvain on each subgraph
+        mask = labels == 1
+        labels_cluster = Louvain().fit_transform(adjacency[mask][:, mask])
+        self.assertEqual(len(np.unique(labels_new[mask])), len(np.unique(labels_cluster)))
+        # ignored nodes
+        labels[labels == 0] = -1
+        labels_new = Louvain().fit_clusters(adjacency, labels)
+        self.assertTrue((labels_new[labels < 0] == -1).all())
+        self.assertTrue((labels_new[labels >= 0] >= 0).all())
+        # threads, shuffled nodes
+        for shuffle_nodes in [False, True]:
+            labels_new = Louvain(shuffle_nodes=shuffle_nodes, random_state=0).fit_clusters(adjacency, labels)
+            labels_parallel = Louvain(shuffle_nodes=shuffle_nodes, random_state=0, n_jobs=2).fit_clusters(adjacency,
+                                                                                                          labels)
+            self.assertTrue((labels_parallel == labels_new).all())
+
+    def test_max_time(self):
+        adjacency = karate_club()
+        for n_jobs in [None, 2]:
+            louvain = Louvain(max_time=0, n_jobs=n_jobs)
+            labels = louvain.fit_transform(adjacency)
+            self.assertEqual(len(labels), 34)
+            self.assertIn('Time limit', str(louvain.log))
+        louvain = Louvain(max_time=0)
+        louvain.partial_fit(adjacency, labels, adjacency)
+        self.assertIn('Time limit', str(louvain.log))
+        labels, _ = louvain.fit_resolutions(adjacency, [1, 2])
+        self.assertEqual(labels.shape, (2, 34))
+        louvain = Louvain(max_time=100)
+        louvain.fit(adjacency)
+        self.assertNotIn('Time limit', str(louvain.log))
+
     def test_invalid(self):
         adjacency = karate_club()
         louvain = Louvain(modularity='toto')
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for Louvain consensus"""
+import unittest
+
+from sknetwork.clustering import LouvainConsensus
+from sknetwork.data import karate_club, star_wars
+from sknetwork.data.test_graphs import *
+
+
+class TestLouvainConsensus(unittest.TestCase):
+
+    def test_disconnected(self):
+        adjacency = test_graph_disconnect()
+        n = adjacency.shape[0]
+        labels = LouvainConsensus(n_runs=3, random_state=0).fit_transform(adjacency)
+        self.assertEqual(len(labels), n)
+
+    def test_consensus(self):
+        adjacency = karate_club()
+        louvain_consensus = LouvainConsensus(random_state=0)
+        labels = louvain_consensus.fit_transform(adjacency)
+        self.assertEqual(len(set(labels)), 4)
+        # same result with threads
+        labels_parallel = LouvainConsensus(random_state=0, n_jobs=2).fit_transform(adjacency)
+        self.assertTrue((labels_parallel == labels).all())
+        # no agreement
+        louvain_consensus = LouvainConsensus(n_runs=5, n_iter=1, resolution=2, random_state=0)
+        labels = louvain_consensus.fit_transform(adjacency)
+        self.assertEqual(len(labels), 34)
+        self.assertIn('agreement: False', str(louvain_consensus.log))
+        louvain_consensus = LouvainConsensus(n_runs=4, modularity='potts', random_state=1)
+        labels = louvain_consensus.fit_transform(adjacency)
+        self.assertEqual(len(labels), 34)
+
+    def test_bipartite(self):
+        biadjacency = star_wars()
+        louvain_consensus = LouvainConsensus(n_runs=3, random_state=0)
+        louvain_consensus.fit(biadjacency)
+        self.assertEqual(louvain_consensus.labels_row_.shape, (4,))
+        self.assertEqual(louvain_consensus.labels_col_.shape, (3,))
+
+    def test_not_available(self):
+        louvain_consensus = LouvainConsensus()
+        for method in ['partial_fit', 'fit_resolutions', 'fit_clusters']:
+            self.assertFalse(hasattr(louvain_consensus, method))
@@ -5,9 +5,10 @@ import unittest
 
 import numpy as np
 
-from sknetwork.clustering import get_modularity, Louvain
+from sknetwork.clustering import get_modularity, get_modularity_batch, Louvain
 from sknetwork.data import star_wars, karate_club
-from sknetwork.data.test_graphs import test_graph
+from sknetwork.data.test_graphs import test_graph, test_digraph
+from sknetwork.utils.membership import get_membership
 
 
 class TestClusteringMetrics(unittest.TestCase):
@@ -34,13 +35,13 @@ class TestClusteringMetrics(unittest.TestCase):
     def test_modularity(self):
         adjacency = karate_club()
         labels = Louvain().fit_transform(adjacency)
-        self.assertAlmostEqual(get_modularity(adjacency, labels), 0.69, 2)
+        self.assertAlmostEqual(get_modularity(adjacency, labels), 0.42, 2)
 
     def test_bimodularity(self):
         biadjacency = star_wars()
         labels_row = np.array([0, 0, 1, 1])
         labels_col = np.array([0, 1, 0])
-        self.assertAlmostEqual(get_modularity(biadjacency, labels_row, labels_col), 0.49, 2)
+        self.assertAlmostEqual(get_modularity(biadjacency, labels_row, labels_col), 0.12, 2)
 
         with self.assertRaises(ValueError):
             get_modularity(biadjacency, labels_row)
@@ -48,3 +49,50 @@ class TestClusteringMetrics(unittest.TestCase):
             get_modularity(biadjacency, labels_row[:2], labels_col)
         with self.assertRaises(ValueError):
             get_modularity(biadjacency, labels_row, labels_col[:2])
+
+    def test_modularity_batch(self):
+        for adjacency in [karate_club(), test_digraph()]:
+            n = adjacency.shape[0]
+            labels = np.random.randint(-1, 4, size=(5, n))
+            mod, fit, div = get_modularity_batch(adjacency, labels, return_all=True)
+            self.assertEqual(mod.shape, (5,))
+            self.assertTrue(np.allclose(get_modularity_batch(adjacency, labels, batch_size=1), mod))
+            for i in range(5):
+                membership = get_membership(labels[i], dtype=float)
+                fit_ = membership.multiply(adjacency.dot(membership)).sum() / adjacency.data.sum()
+                self.assertAlmostEqual(fit[i], fit_)
+                self.assertAlmostEqual(div[i], get_modularity(adjacency, labels[i], return_all=True)[2])
+        # large labels (clusters indexed per clustering)
+        adjacency = karate_club()
+        labels = np.random.randint(-1, 4, size=(5, adjacency.shape[0]))
+        mod = get_modularity_batch(adjacency, labels * 10 ** 12)
+        self.assertTrue(np.allclose(get_modularity_batch(adjacency, labels), mod))
+        mod = get_modularity_batch(adjacency, -np.ones((2, adjacency.shape[0]), dtype=int))
+        self.assertTrue(np.allclose(mod, 0))
+
+    def test_modularity_batch_consistency(self):
+        for adjacency in [karate_club(), test_digraph(), self.adjacency]:
+            n = adjacency.shape[0]
+            labels = np.random.randint(0, 4, size=(10, n))
+            mod = get_modularity_batch(adjacency, labels)
+            for i in range(10):
+                self.assertAlmostEqual(mod[i], get_modularity(adjacency, labels[i]))
+        biadjacency = star_wars()
+        labels_row = np.random.randint(0, 3, size=(10, biadjacency.shape[0]))
+        labels_col = np.random.randint(0, 3, size=(10, biadjacency.shape[1]))
+        mod = get_modularity_batch(biadjacency, labels_row, labels_col)
+        for i in range(10):
+            self.assertAlmostEqual(mod[i], get_modularity(biadjacency, labels_row[i], labels_col[i]))
+        self.assertAlmostEqual(get_modularity_batch(self.adjacency, self.unique_cluster)[0], 0.)
+        with self.assertRaises(ValueError):
+            get_modularity_batch(self.adjacency, self.labels[:3])
+
+        biadjacency = star_wars()
+        labels_row = np.array([[0, 0, 1, 1], [0, 1, 0, 1]])
+        labels_col = np.array([[0, 1, 0], [0, 1, 1]])
+        mod = get_modularity_batch(biadjacency, labels_row, labels_col)
+        self.assertEqual(mod.shape, (2,))
+        with self.assertRaises(ValueError):
+            get_modularity_batch(biadjacency, labels_row)
+        with self.assertRaises(ValueError):
+            get_modularity_batch(biadjacency, labels_row, labels_col[:1])
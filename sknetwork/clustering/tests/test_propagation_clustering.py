@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for clustering by label propagation"""
+import unittest
+
+from sknetwork.clustering import PropagationClustering
+from sknetwork.data import karate_club
+
+
+class TestPropagationClustering(unittest.TestCase):
+
+    def test_parallel(self):
+        adjacency = karate_club()
+        labels = PropagationClustering(synchronous=True).fit_transform(adjacency)
+        for n_jobs in [2, -1]:
+            propagation = PropagationClustering(synchronous=True, n_jobs=n_jobs)
+            self.assertTrue((propagation.fit_transform(adjacency) == labels).all())
+        labels = PropagationClustering(n_jobs=2).fit_transform(adjacency)
+        self.assertEqual(len(labels), 34)
+
+    def test_positional(self):
+        propagation = PropagationClustering(5, 'decreasing', True, False)
+        self.assertFalse(propagation.sort_clusters)
+        self.assertFalse(propagation.synchronous)
@@ -37,6 +37,11 @@ class LouvainNE(BaseEmbedding):
         Enables node shuffling before optimization.
     random_state :
         Random number generator or random seed. If None, numpy.random is used.
+    n_jobs :
+        Number of threads splitting the clusters of the same level in parallel (-1 means the maximum number).
+        If ``None`` (default), clusters are split sequentially.
+    verbose :
+        Verbose mode.
 
     Attributes
     ----------
@@ -65,55 +70,53 @@ class LouvainNE(BaseEmbedding):
     """
     def __init__(self, n_components: int = 2, scale: float = .1, resolution: float = 1, tol_optimization: float = 1e-3,
                  tol_aggregation: float = 1e-3, n_aggregations: int = -1, shuffle_nodes: bool = False,
-                 random_state: Optional[Union[np.random.RandomState, int]] = None, verbose: bool = False):
+                 random_state: Optional[Union[np.random.RandomState, int]] = None, n_jobs: Optional[int] = None,
+                 verbose: bool = False):
         super(LouvainNE, self).__init__()
 
         self.n_components = n_components
         self.scale = scale
+        self.n_jobs = n_jobs
         self._clustering_method = Louvain(resolution=resolution, tol_optimization=tol_optimization,
                                           tol_aggregation=tol_aggregation, n_aggregations=n_aggregations,
-                                          shuffle_nodes=shuffle_nodes, random_state=random_state, verbose=verbose)
+                                          shuffle_nodes=shuffle_nodes, random_state=random_state, n_jobs=n_jobs,
+                                          verbose=verbose)
         self.random_state = check_random_state(random_state)
         self.bipartite = None
 
-    def _recursive_louvain(self, adjacency: Union[sparse.csr_matrix, np.ndarray], depth: int,
-                           nodes: Optional[np.ndarray] = None):
-        """Recursive function for fit, modifies the embedding in place.
+    def _get_embedding(self, adjacency: Union[sparse.csr_matrix, np.ndarray]) -> np.ndarray:
+        """Get the embedding, by successive splits of the clusters, level by level (top-down).
 
         Parameters
         ----------
         adjacency :
             Adjacency matrix of the graph.
-        depth :
-            Depth of the recursion.
-        nodes :
-            The indices of the current nodes in the original graph.
+
+        Returns
+        -------
+        embedding : np.ndarray
+            Embedding of the nodes.
         """
         n = adjacency.shape[0]
-        if nodes is None:
-            nodes = np.arange(n)
-
-        if adjacency.nnz:
-            labels = self._clustering_method.fit_transform(adjacency)
-        else:
-            labels = np.zeros(n)
-
-        clusters = np.unique(labels)
-
-        if len(clusters) != 1:
-            random_vectors = (self.scale ** depth) * self.random_state.rand(self.n_components, len(clusters))
-            for index, cluster in enumerate(clusters):
-                mask = (labels == cluster)
-                nodes_cluster = nodes[mask]
-                self.embedding_[nodes_cluster, :] += random_vectors[:, index]
-                n_row = len(mask)
-                indptr = np.zeros(n_row + 1, dtype=int)
-                indptr[1:] = np.cumsum(mask)
-                n_col = indptr[-1]
-                combiner = sparse.csr_matrix((np.ones(n_col), np.arange(n_col, dtype=int), indptr),
-                                             shape=(n_row, n_col))
-                adjacency_cluster = adjacency[mask, :].dot(combiner)
-                self._recursive_louvain(adjacency_cluster, depth + 1, nodes_cluster)
+        embedding = np.zeros((n, self.n_components))
+        labels = np.zeros(n, dtype=int)
+        # clusters to split (those resulting from a split at the previous level)
+        active = np.ones(1, dtype=bool)
+        depth = 0
+        while np.any(active):
+            labels_cluster = self._clustering_method.fit_clusters(adjacency, np.where(active[labels], labels, -1))
+            _, index, labels_new = np.unique(np.vstack((labels, labels_cluster)), axis=1, return_index=True,
+                                             return_inverse=True)
+            labels_new = labels_new.ravel()
+            n_children = np.bincount(labels[index])
+            active = n_children[labels[index]] > 1
+            # random vector for each cluster resulting from a split
+            random_vectors = (self.scale ** depth) * self.random_state.rand(len(index), self.n_components)
+            random_vectors[~active] = 0
+            embedding += random_vectors[labels_new]
+            labels = labels_new
+            depth += 1
+        return embedding
 
     def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray], force_bipartite: bool = False):
         """Embedding of graphs from a clustering obtained with Louvain.
@@ -134,8 +137,7 @@ class LouvainNE(BaseEmbedding):
         n = adjacency.shape[0]
 
         # embedding
-        self.embedding_ = np.zeros((n, self.n_components))
-        self._recursive_louvain(adjacency, 0)
+        self.embedding_ = self._get_embedding(adjacency)
 
         if self.bipartite:
             self._split_vars(input_matrix.shape)
@@ -3,6 +3,8 @@
 """tests for LouvainNE"""
 import unittest
 
+import numpy as np
+
 from sknetwork.data.test_graphs import test_graph, test_graph_disconnect, test_digraph, test_bigraph
 from sknetwork.embedding import LouvainNE
 
@@ -17,3 +19,9 @@ class TestLouvainNE(unittest.TestCase):
         self.assertTupleEqual(louvain.embedding_.shape, (6, 2))
         louvain.fit(test_graph(), force_bipartite=True)
         self.assertTupleEqual(louvain.embedding_.shape, (10, 2))
+
+    def test_n_jobs(self):
+        adjacency = test_graph()
+        embedding = LouvainNE(random_state=0).fit_transform(adjacency)
+        embedding_parallel = LouvainNE(random_state=0, n_jobs=2).fit_transform(adjacency)
+        self.assertTrue(np.allclose(embedding, embedding_parallel))
@@ -1,7 +1,9 @@
 """hierarchy module"""
 from sknetwork.hierarchy.paris import Paris
+from sknetwork.hierarchy.paris_coarsened import CoarsenedParis
 from sknetwork.hierarchy.base import BaseHierarchy
+from sknetwork.hierarchy.dendrogram_index import DendrogramIndex
 from sknetwork.hierarchy.louvain_hierarchy import LouvainIteration, LouvainHierarchy
 from sknetwork.hierarchy.metrics import dasgupta_cost, dasgupta_score, tree_sampling_divergence
-from sknetwork.hierarchy.postprocess import cut_straight, cut_balanced, aggregate_dendrogram
+from sknetwork.hierarchy.postprocess import cut_straight, cut_straight_batch, cut_balanced, aggregate_dendrogram
 from sknetwork.hierarchy.ward import Ward
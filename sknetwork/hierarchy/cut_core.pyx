@@ -0,0 +1,84 @@
+# distutils: language = c++
+# cython: language_level=3
+# cython: linetrace=True
+# distutils: define_macros=CYTHON_TRACE_NOGIL=1
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+import numpy as np
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def get_cut_labels(int[:] children, int[:] levels, int n_cuts):
+    """Labels of nodes for a sequence of nested cuts of a dendrogram.
+
+    Parameters
+    ----------
+    children :
+        Children of each internal node of the tree, as a flat array (first column, second column of the dendrogram).
+    levels :
+        For each merge, index of the first cut (in increasing order) for which the merge is done
+        (in the absence of other constraints).
+    n_cuts :
+        Number of cuts.
+
+    Returns
+    -------
+    labels : np.ndarray
+        Labels of nodes for each cut, shape (n_cuts, n_nodes), clusters being indexed in increasing order of
+        their root (leaves first, then merges in order).
+    """
+    cdef int n = children.shape[0] // 2 + 1
+    cdef int t
+    cdef int i
+    cdef int j
+    cdef int c
+    cdef int node
+    cdef int parent
+    cdef int label
+    cdef int[:] levels_ = levels.copy()
+    cdef int[:] parents = -np.ones(2 * n - 1, dtype=np.int32)
+    cdef int[:] roots = np.zeros(2 * n - 1, dtype=np.int32)
+    cdef int[:] labels_root = np.zeros(2 * n - 1, dtype=np.int32)
+    cdef int[:, :] labels = np.zeros((n_cuts, n), dtype=np.int32)
+
+    with nogil:
+        # a merge is done only if the merges of its children are done
+        for t in range(n - 1):
+            i = children[2 * t]
+            j = children[2 * t + 1]
+            if i >= n + t or j >= n + t:
+                levels_[t] = n_cuts
+                continue
+            if i >= n and levels_[i - n] > levels_[t]:
+                levels_[t] = levels_[i - n]
+            if j >= n and levels_[j - n] > levels_[t]:
+                levels_[t] = levels_[j - n]
+            parents[i] = n + t
+            parents[j] = n + t
+
+        for c in range(n_cuts):
+            # root of the cluster of each node, from the top of the tree
+            for node in range(2 * n - 2, -1, -1):
+                parent = parents[node]
+                if parent >= 0 and levels_[parent - n] <= c:
+                    roots[node] = roots[parent]
+                else:
+                    roots[node] = node
+            # labels in increasing order of the roots
+            for node in range(2 * n - 1):
+                labels_root[node] = -1
+            for node in range(n):
+                labels_root[roots[node]] = 0
+            label = 0
+            for node in range(2 * n - 1):
+                if labels_root[node] == 0:
+                    labels_root[node] = label
+                    label += 1
+            for node in range(n):
+                labels[c, node] = labels_root[roots[node]]
+
+    return np.asarray(labels)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+from typing import Union
+
+import numpy as np
+
+from sknetwork.hierarchy.index_core import get_in_order
+from sknetwork.utils.check import check_dendrogram, check_n_clusters
+from sknetwork.utils import Bunch
+
+
+class DendrogramIndex:
+    """Index of a dendrogram for fast queries on lowest common ancestors and clusters.
+
+    The leaves are listed in the order of a depth-first traversal of the tree. The lowest common ancestor of two
+    leaves is then the last merge between them in this order, found in constant time with a sparse table
+    (range maximum queries). The cluster of a leaf at some level is found by binary search in the same table.
+
+    Parameters
+    ----------
+    dendrogram :
+        Dendrogram. Each merge must come after the merges forming its children (as for all dendrograms
+        returned by the hierarchical clustering algorithms).
+
+    Attributes
+    ----------
+    dendrogram : np.ndarray
+        Dendrogram.
+    positions_ : np.ndarray
+        Position of each leaf in the traversal.
+    table_ : np.ndarray
+        Sparse table: entry :math:`(k, i)` is the last merge between the leaves in position :math:`i` and
+        :math:`i + 2^k` of the traversal.
+
+    Example
+    -------
+    >>> from sknetwork.hierarchy import DendrogramIndex
+    >>> dendrogram = np.array([[0, 1, 0.5, 2], [2, 3, 1, 3], [4, 5, 2, 5]])
+    >>> index = DendrogramIndex(dendrogram)
+    >>> index.get_lca([0, 0, 2], [1, 2, 3])
+    array([4, 6, 5])
+    >>> index.get_height([0, 0, 2], [1, 2, 3])
+    array([0.5, 2. , 1. ])
+    >>> index.get_clusters([0, 2, 3], n_clusters=3)
+    array([4, 2, 3])
+
+    Notes
+    -----
+    The index takes :math:`O(n \\log n)` space and is built in :math:`O(n \\log n)` time.
+    Queries on lowest common ancestors take constant time, queries on clusters take :math:`O(\\log n)` time.
+    """
+    def __init__(self, dendrogram: np.ndarray):
+        check_dendrogram(dendrogram)
+        n = dendrogram.shape[0] + 1
+        if n < 2:
+            raise ValueError('The dendrogram must have at least one merge.')
+        children = dendrogram[:, :2].astype(np.int32)
+        if np.any(children >= n + np.arange(n - 1)[:, np.newaxis]):
+            raise ValueError('Each merge must come after the merges forming its children.')
+        self.dendrogram = dendrogram
+        self.positions_, gaps = get_in_order(children.ravel())
+        n_levels = int(np.log2(n - 1)) + 1
+        table = np.zeros((n_levels, n - 1), dtype=np.int32)
+        table[0] = gaps
+        for k in range(1, n_levels):
+            step = 2 ** (k - 1)
+            table[k, :n - 2 * step] = np.maximum(table[k - 1, :n - 2 * step], table[k - 1, step:n - step])
+        self.table_ = table
+
+    def _get_max(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Last merge between positions start and end (with start < end)."""
+        level = np.log2(end - start).astype(int)
+        return np.maximum(self.table_[level, start], self.table_[level, end - 2 ** level])
+
+    def get_lca(self, nodes1: Union[np.ndarray, list], nodes2: Union[np.ndarray, list]) -> np.ndarray:
+        """Lowest common ancestors of pairs of nodes.
+
+        Parameters
+        ----------
+        nodes1, nodes2 :
+            Nodes (leaves of the dendrogram), the query being on each pair (nodes1[i], nodes2[i]).
+
+        Returns
+        -------
+        lca : np.ndarray
+            Lowest common ancestor of each pair (node, or :math:`n + t` for the merge :math:`t` of the dendrogram).
+        """
+        n = len(self.positions_)
+        nodes1, nodes2 = np.asarray(nodes1, dtype=int), np.asarray(nodes2, dtype=int)
+        positions1, positions2 = self.positions_[nodes1], self.positions_[nodes2]
+        start, end = np.minimum(positions1, positions2), np.maximum(positions1, positions2)
+        lca = nodes1.copy()
+        mask = start < end
+        lca[mask] = n + self._get_max(start[mask], end[mask])
+        return lca
+
+    def get_height(self, nodes1: Union[np.ndarray, list], nodes2: Union[np.ndarray, list]) -> np.ndarray:
+        """Heights at which pairs of nodes are merged.
+
+        Parameters
+        ----------
+        nodes1, nodes2 :
+            Nodes (leaves of the dendrogram), the query being on each pair (nodes1[i], nodes2[i]).
+
+        Returns
+        -------
+        heights : np.ndarray
+            Height of the lowest common ancestor of each pair (0 if the nodes are the same).
+        """
+        n = len(self.positions_)
+        lca = self.get_lca(nodes1, nodes2)
+        heights = np.zeros(len(lca))
+        mask = lca >= n
+        heights[mask] = self.dendrogram[lca[mask] - n, 2]
+        return heights
+
+    def get_clusters(self, nodes: Union[np.ndarray, list], n_clusters: int) -> np.ndarray:
+        """Clusters of nodes after the first :math:`n - k` merges of the dendrogram, with :math:`k` clusters.
+
+        Parameters
+        ----------
+        nodes :
+            Nodes (leaves of the dendrogram).
+        n_clusters :
+            Number of clusters :math:`k`.
+
+        Returns
+        -------
+        clusters : np.ndarray
+            Cluster of each node (node, or :math:`n + t` for the merge :math:`t` of the dendrogram).
+        """
+        n = len(self.positions_)
+        check_n_clusters(n_clusters, n, n_min=1)
+        n_merges = n - n_clusters
+        nodes = np.asarray(nodes, dtype=int)
+        positions = self.positions_[nodes]
+        # largest interval of positions around each node containing only the first merges (binary search)
+        start, end = positions.copy(), positions.copy()
+        for level in range(self.table_.shape[0] - 1, -1, -1):
+            step = 2 ** level
+            mask = (end + step <= n - 1)
+            mask[mask] = self.table_[level, end[mask]] < n_merges
+            end[mask] += step
+            mask = (start - step >= 0)
+            mask[mask] = self.table_[level, start[mask] - step] < n_merges
+            start[mask] -= step
+        clusters = nodes.copy()
+        mask = start < end
+        clusters[mask] = n + self._get_max(start[mask], end[mask])
+        return clusters
+
+    def to_bunch(self) -> Bunch:
+        """Return the index as a :class:`Bunch` of arrays, to be saved with :func:`sknetwork.data.save`.
+
+        Returns
+        -------
+        bunch : :class:`Bunch`
+            Dendrogram, positions and sparse table.
+        """
+        bunch = Bunch()
+        bunch.dendrogram = self.dendrogram
+        bunch.positions = self.positions_
+        bunch.table = self.table_
+        return bunch
+
+    @classmethod
+    def from_bunch(cls, bunch: Bunch) -> 'DendrogramIndex':
+        """Load the index from a :class:`Bunch` of arrays (inverse function of :meth:`to_bunch`).
+
+        Parameters
+        ----------
+        bunch :
+            Dendrogram, positions and sparse table.
+
+        Returns
+        -------
+        index : :class:`DendrogramIndex`
+            Index.
+        """
+        index = cls.__new__(cls)
+        index.dendrogram = bunch.dendrogram
+        index.positions_ = bunch.positions
+        index.table_ = bunch.table
+        return index
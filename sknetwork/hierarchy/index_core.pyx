@@ -0,0 +1,76 @@
+# distutils: language = c++
+# cython: language_level=3
+# cython: linetrace=True
+# distutils: define_macros=CYTHON_TRACE_NOGIL=1
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+import numpy as np
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def get_in_order(int[:] children):
+    """In-order traversal of a dendrogram.
+
+    Parameters
+    ----------
+    children :
+        Children of each internal node of the tree, as a flat array (first column, second column of the dendrogram).
+        Each internal node must be formed after its children.
+
+    Returns
+    -------
+    positions : np.ndarray
+        Position of each leaf in the traversal.
+    gaps : np.ndarray
+        Internal node (index of the merge) between each pair of consecutive leaves in the traversal.
+    """
+    cdef int n = children.shape[0] // 2 + 1
+    cdef int t
+    cdef int i
+    cdef int j
+    cdef int[:] sizes = np.ones(2 * n - 1, dtype=np.int32)
+    cdef int[:] offsets = np.zeros(2 * n - 1, dtype=np.int32)
+    cdef int[:] gaps = np.zeros(n - 1, dtype=np.int32)
+
+    with nogil:
+        for t in range(n - 1):
+            sizes[n + t] = sizes[children[2 * t]] + sizes[children[2 * t + 1]]
+        # parents before children: the first child comes first, then the second child
+        for t in range(n - 2, -1, -1):
+            i = children[2 * t]
+            j = children[2 * t + 1]
+            offsets[i] = offsets[n + t]
+            offsets[j] = offsets[n + t] + sizes[i]
+            gaps[offsets[j] - 1] = t
+
+    return np.asarray(offsets[:n]), np.asarray(gaps)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def lift_heights(int[:] children, double[:] heights):
+    """Lift the height of each merge to the heights of its children (in place), in case of inversions.
+
+    Parameters
+    ----------
+    children :
+        Children of each internal node of the tree, as a flat array (first column, second column of the dendrogram).
+        Each internal node must be formed after its children.
+    heights :
+        Height of each merge. Modified in place.
+    """
+    cdef int n = children.shape[0] // 2 + 1
+    cdef int t
+    cdef int k
+    cdef int child
+
+    with nogil:
+        for t in range(n - 1):
+            for k in range(2):
+                child = children[2 * t + k] - n
+                if child >= 0 and heights[child] > heights[t]:
+                    heights[t] = heights[child]
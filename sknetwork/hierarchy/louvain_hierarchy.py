@@ -12,7 +12,7 @@ from scipy import sparse
 
 from sknetwork.clustering.louvain import Louvain
 from sknetwork.hierarchy.base import BaseHierarchy
-from sknetwork.hierarchy.postprocess import get_dendrogram, reorder_dendrogram
+from sknetwork.hierarchy.postprocess import get_dendrogram_from_levels, reorder_dendrogram
 from sknetwork.utils.check import check_format
 from sknetwork.utils.format import get_adjacency
 
@@ -38,6 +38,9 @@ class LouvainIteration(BaseHierarchy):
         Enables node shuffling before optimization.
     random_state :
         Random number generator or random seed. If ``None``, numpy.random is used.
+    n_jobs :
+        Number of threads splitting the clusters of the same level in parallel (-1 means the maximum number).
+        If ``None`` (default), clusters are split sequentially.
     verbose :
         Verbose mode.
 
@@ -75,57 +78,51 @@ class LouvainIteration(BaseHierarchy):
 
     def __init__(self, depth: int = 3, resolution: float = 1, tol_optimization: float = 1e-3,
                  tol_aggregation: float = 1e-3, n_aggregations: int = -1, shuffle_nodes: bool = False,
-                 random_state: Optional[Union[np.random.RandomState, int]] = None, verbose: bool = False):
+                 random_state: Optional[Union[np.random.RandomState, int]] = None, n_jobs: Optional[int] = None,
+                 verbose: bool = False):
         super(LouvainIteration, self).__init__()
 
         self.dendrogram_ = None
         self.depth = depth
+        self.n_jobs = n_jobs
         self._clustering_method = Louvain(resolution=resolution, tol_optimization=tol_optimization,
                                           tol_aggregation=tol_aggregation, n_aggregations=n_aggregations,
-                                          shuffle_nodes=shuffle_nodes, random_state=random_state, verbose=verbose)
+                                          shuffle_nodes=shuffle_nodes, random_state=random_state, n_jobs=n_jobs,
+                                          verbose=verbose)
         self.bipartite = None
 
-    def _recursive_louvain(self, adjacency: Union[sparse.csr_matrix, np.ndarray], depth: int,
-                           nodes: Optional[np.ndarray] = None):
-        """Recursive function for fit.
+    def _get_levels(self, adjacency: Union[sparse.csr_matrix, np.ndarray]) -> np.ndarray:
+        """Get the nested clusterings, level by level (top-down).
 
         Parameters
         ----------
         adjacency :
             Adjacency matrix of the graph.
-        depth :
-            Depth of the recursion.
-        nodes :
-            The indices of the current nodes in the original graph.
 
         Returns
         -------
-        tree: recursive list of list of nodes.
+        labels : np.ndarray
+            Labels of nodes, one row per level, from top to bottom.
         """
         n = adjacency.shape[0]
-        if nodes is None:
-            nodes = np.arange(n)
-
-        if adjacency.nnz and depth:
-            labels = self._clustering_method.fit_transform(adjacency)
-        else:
-            labels = np.zeros(n)
-
-        clusters = np.unique(labels)
-
-        tree = []
-        if len(clusters) == 1:
-            if len(nodes) > 1:
-                return [[node] for node in nodes]
-            else:
-                return [nodes[0]]
-        else:
-            for cluster in clusters:
-                mask = (labels == cluster)
-                nodes_cluster = nodes[mask]
-                adjacency_cluster = adjacency[mask, :][:, mask]
-                tree.append(self._recursive_louvain(adjacency_cluster, depth - 1, nodes_cluster))
-            return tree
+        labels = np.zeros(n, dtype=int)
+        labels_levels = []
+        # clusters to split (those resulting from a split at the previous level)
+        active = np.ones(1, dtype=bool)
+        level = 0
+        while self.depth < 0 or level < self.depth:
+            labels_cluster = self._clustering_method.fit_clusters(adjacency, np.where(active[labels], labels, -1))
+            _, index, labels_new = np.unique(np.vstack((labels, labels_cluster)), axis=1, return_index=True,
+                                             return_inverse=True)
+            labels_new = labels_new.ravel()
+            n_children = np.bincount(labels[index])
+            if np.all(n_children == 1):
+                break
+            active = n_children[labels[index]] > 1
+            labels = labels_new
+            labels_levels.append(labels)
+            level += 1
+        return np.array(labels_levels, dtype=int).reshape(-1, n)
 
     def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray]) -> 'LouvainIteration':
         """Fit algorithm to data.
@@ -142,10 +139,8 @@ class LouvainIteration(BaseHierarchy):
         self._init_vars()
         input_matrix = check_format(input_matrix)
         adjacency, self.bipartite = get_adjacency(input_matrix)
-        tree = self._recursive_louvain(adjacency, self.depth)
-        dendrogram, _ = get_dendrogram(tree)
-        dendrogram = np.array(dendrogram)
-        dendrogram[:, 2] -= min(dendrogram[:, 2])
+        labels = self._get_levels(adjacency)
+        dendrogram = get_dendrogram_from_levels(labels)
         self.dendrogram_ = reorder_dendrogram(dendrogram)
         if self.bipartite:
             self._split_vars(input_matrix.shape)
@@ -155,6 +150,8 @@ class LouvainIteration(BaseHierarchy):
 class LouvainHierarchy(BaseHierarchy):
     """Hierarchical clustering by Louvain (bottom-up).
 
+    The levels of the hierarchy are the clusterings obtained after each aggregation, in a single run of Louvain.
+
     Parameters
     ----------
     resolution :
@@ -209,36 +206,11 @@ class LouvainHierarchy(BaseHierarchy):
 
         self.dendrogram_ = None
         self._clustering_method = Louvain(resolution=resolution, tol_optimization=tol_optimization,
-                                          tol_aggregation=tol_aggregation, n_aggregations=1,
-                                          shuffle_nodes=shuffle_nodes, random_state=random_state, verbose=verbose)
+                                          tol_aggregation=tol_aggregation, return_membership=False,
+                                          return_aggregate=False, return_levels=True, shuffle_nodes=shuffle_nodes,
+                                          random_state=random_state, verbose=verbose)
         self.bipartite = None
 
-    def _get_hierarchy(self, adjacency: Union[sparse.csr_matrix, np.ndarray]):
-        """Get the hierarchy from Louvain.
-
-        Parameters
-        ----------
-        adjacency :
-            Adjacency matrix of the graph.
-
-        Returns
-        -------
-        tree: recursive list of list of nodes
-        """
-        tree = [[node] for node in range(adjacency.shape[0])]
-        labels = self._clustering_method.fit_transform(adjacency)
-        labels_unique = np.unique(labels)
-        while 1:
-            tree = [[tree[node] for node in np.flatnonzero(labels == label)] for label in labels_unique]
-            tree = [cluster[0] if len(cluster) == 1 else cluster for cluster in tree]
-            aggregate = self._clustering_method.aggregate_
-            labels = self._clustering_method.fit_transform(aggregate)
-            if len(labels_unique) == len(np.unique(labels)):
-                break
-            else:
-                labels_unique = np.unique(labels)
-        return tree
-
     def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray]) -> 'LouvainHierarchy':
         """Fit algorithm to data.
 
@@ -254,10 +226,8 @@ class LouvainHierarchy(BaseHierarchy):
         self._init_vars()
         input_matrix = check_format(input_matrix)
         adjacency, self.bipartite = get_adjacency(input_matrix)
-        tree = self._get_hierarchy(adjacency)
-        dendrogram, _ = get_dendrogram(tree)
-        dendrogram = np.array(dendrogram)
-        dendrogram[:, 2] -= min(dendrogram[:, 2])
+        self._clustering_method.fit(adjacency)
+        dendrogram = get_dendrogram_from_levels(self._clustering_method.labels_levels_[::-1])
         self.dendrogram_ = reorder_dendrogram(dendrogram)
         if self.bipartite:
             self._split_vars(input_matrix.shape)
@@ -6,23 +6,13 @@ Created on March 2019
 """
 import numpy as np
 from scipy import sparse
-from sknetwork.hierarchy.paris import AggregateGraph
+from sknetwork.hierarchy.metrics_core import get_sampling
 
 from sknetwork.utils.check import check_format, get_probs, check_square
 from sknetwork.utils.check import check_min_size, check_min_nnz
 from sknetwork.utils.format import directed2undirected
 
 
-def _instantiate_vars(adjacency: sparse.csr_matrix, weights: str = 'uniform'):
-    """Initialize standard variables for metrics."""
-    weights_row = get_probs(weights, adjacency)
-    weights_col = get_probs(weights, adjacency.T)
-    sym_adjacency = directed2undirected(adjacency)
-    aggregate_graph = AggregateGraph(weights_row, weights_col, sym_adjacency.data.astype(float),
-                                     sym_adjacency.indices, sym_adjacency.indptr)
-    return aggregate_graph, weights_row, weights_col
-
-
 def get_sampling_distributions(adjacency: sparse.csr_matrix, dendrogram: np.ndarray, weights: str = 'uniform'):
     """Get sampling distributions over each internal node of the tree.
     Parameters
@@ -43,28 +33,15 @@ def get_sampling_distributions(adjacency: sparse.csr_matrix, dendrogram: np.ndar
     cluster_weights: np.ndarray
         Cluster weights.
     """
-    n = adjacency.shape[0]
-    aggregate_graph, weights_row, weights_col = _instantiate_vars(adjacency, weights)
-    cluster_weight = np.zeros(n-1)
-    edge_sampling = np.zeros(n-1)
-    node_sampling = np.zeros(n-1)
-
-    for t in range(n - 1):
-        i = int(dendrogram[t][0])
-        j = int(dendrogram[t][1])
-        if j in aggregate_graph.neighbors[i]:
-            edge_sampling[t] += 2 * aggregate_graph.neighbors[i][j]
-        node_sampling[t] += aggregate_graph.cluster_out_weights[i] * aggregate_graph.cluster_in_weights[j] + \
-            aggregate_graph.cluster_out_weights[j] * aggregate_graph.cluster_in_weights[i]
-        cluster_weight[t] = aggregate_graph.cluster_out_weights[i] + aggregate_graph.cluster_out_weights[j] + \
-            aggregate_graph.cluster_in_weights[i] + aggregate_graph.cluster_in_weights[j]
-        for node in {i, j}:
-            if node < n:
-                # self-loop
-                node_sampling[t] += aggregate_graph.cluster_out_weights[node] * aggregate_graph.cluster_in_weights[node]
-                if node in aggregate_graph.neighbors[node]:
-                    edge_sampling[t] += aggregate_graph.neighbors[node][node]
-        aggregate_graph.merge(i, j)
+    if dendrogram.shape[0] != adjacency.shape[0] - 1:
+        raise ValueError('The dendrogram must have n - 1 merges, with n the number of nodes of the graph.')
+    weights_row = get_probs(weights, adjacency).astype(float)
+    weights_col = get_probs(weights, adjacency.T).astype(float)
+    sym_adjacency = directed2undirected(adjacency).astype(float)
+    data = sym_adjacency.data / sym_adjacency.data.sum()
+    children = dendrogram[:, :2].astype(np.int32).ravel()
+    edge_sampling, node_sampling, cluster_weight = get_sampling(data, sym_adjacency.indices, sym_adjacency.indptr,
+                                                                weights_row, weights_col, children)
     return edge_sampling, node_sampling, cluster_weight / 2
 
 
@@ -0,0 +1,136 @@
+# distutils: language = c++
+# cython: language_level=3
+# cython: linetrace=True
+# distutils: define_macros=CYTHON_TRACE_NOGIL=1
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+from libcpp.vector cimport vector
+
+import numpy as np
+cimport cython
+
+ctypedef fused int_or_long:
+    int
+    long
+
+
+cdef inline int find(int[:] roots, int node) noexcept nogil:
+    """Root of the set of a node in the union-find structure (with path halving)."""
+    while roots[node] != node:
+        roots[node] = roots[roots[node]]
+        node = roots[node]
+    return node
+
+
+cdef inline int union(int[:] roots, int[:] ranks, int node1, int node2) noexcept nogil:
+    """Union of the sets of two nodes (by rank). Return the root of the new set."""
+    node1 = find(roots, node1)
+    node2 = find(roots, node2)
+    if node1 == node2:
+        return node1
+    if ranks[node1] < ranks[node2]:
+        node1, node2 = node2, node1
+    roots[node2] = node1
+    if ranks[node1] == ranks[node2]:
+        ranks[node1] += 1
+    return node1
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def get_sampling(double[:] data, int_or_long[:] indices, int_or_long[:] indptr, double[:] weights_row,
+                 double[:] weights_col, int[:] children):
+    """Sampling distributions of a dendrogram, with one pass over the edges (Tarjan's offline LCA algorithm).
+
+    Each edge is assigned to the lowest common ancestor of its endpoints in the tree (the parent of the node for
+    a self-loop). The tree is traversed in depth-first order, using a union-find structure.
+
+    Parameters
+    ----------
+    data, indices, indptr :
+        CSR arrays of the symmetric adjacency matrix (normalized so that the sum of weights is equal to 1).
+    weights_row, weights_col :
+        Out-weights and in-weights of nodes.
+    children :
+        Children of each internal node of the tree, as a flat array (first column, second column of the dendrogram).
+
+    Returns
+    -------
+    edge_sampling : np.ndarray
+        Edge sampling distribution.
+    node_sampling : np.ndarray
+        Node sampling distribution.
+    cluster_weight : np.ndarray
+        Cluster weights (sum of out-weights and in-weights).
+    """
+    cdef int n = indptr.shape[0] - 1
+    cdef int n_nodes = 2 * n - 1
+    cdef int node
+    cdef int root = n_nodes - 1
+    cdef int t
+    cdef int i
+    cdef int j
+    cdef int neighbor
+    cdef int state
+    cdef int_or_long k
+    cdef vector[int] stack
+    cdef int[:] parents = -np.ones(n_nodes, dtype=np.int32)
+    cdef int[:] roots = np.arange(n_nodes, dtype=np.int32)
+    cdef int[:] ranks = np.zeros(n_nodes, dtype=np.int32)
+    cdef int[:] ancestors = np.arange(n_nodes, dtype=np.int32)
+    cdef int[:] states = np.zeros(n_nodes, dtype=np.int32)
+    cdef double[:] out_weights = np.zeros(n_nodes)
+    cdef double[:] in_weights = np.zeros(n_nodes)
+    cdef double[:] edge_sampling = np.zeros(n - 1)
+    cdef double[:] node_sampling = np.zeros(n - 1)
+    cdef double[:] cluster_weight = np.zeros(n - 1)
+
+    with nogil:
+        for t in range(n - 1):
+            parents[children[2 * t]] = n + t
+            parents[children[2 * t + 1]] = n + t
+        for t in range(n - 1):
+            if parents[n + t] < 0:
+                root = n + t
+
+        # depth-first search from the root; the state of an internal node is the number of visited children
+        stack.push_back(root)
+        while stack.size():
+            node = stack.back()
+            if node < n:
+                stack.pop_back()
+                # leaf: edges to visited leaves, assigned to their lowest common ancestor
+                states[node] = 1
+                out_weights[node] = weights_row[node]
+                in_weights[node] = weights_col[node]
+                for k in range(indptr[node], indptr[node + 1]):
+                    neighbor = indices[k]
+                    if neighbor == node:
+                        edge_sampling[parents[node] - n] += data[k]
+                    elif states[neighbor]:
+                        edge_sampling[ancestors[find(roots, neighbor)] - n] += 2 * data[k]
+                continue
+            t = node - n
+            state = states[node]
+            if state:
+                ancestors[union(roots, ranks, node, children[2 * t + state - 1])] = node
+            if state < 2:
+                states[node] += 1
+                stack.push_back(children[2 * t + state])
+            else:
+                stack.pop_back()
+                # both subtrees visited: cluster weights
+                i = children[2 * t]
+                j = children[2 * t + 1]
+                node_sampling[t] = out_weights[i] * in_weights[j] + out_weights[j] * in_weights[i]
+                if i < n:
+                    node_sampling[t] += out_weights[i] * in_weights[i]
+                if j < n:
+                    node_sampling[t] += out_weights[j] * in_weights[j]
+                out_weights[node] = out_weights[i] + out_weights[j]
+                in_weights[node] = in_weights[i] + in_weights[j]
+                cluster_weight[t] = out_weights[node] + in_weights[node]
+
+    return np.asarray(edge_sampling), np.asarray(node_sampling), np.asarray(cluster_weight)
@@ -8,14 +8,18 @@ Created on March 2019
 @author: Bertrand Charpentier <bertrand.charpentier@live.fr>
 @author: Quentin Lutz <qlutz@enst.fr>
 """
+import time
+
 import numpy as np
 cimport numpy as np
 
 cimport cython
 
+from libc.math cimport INFINITY
+from libcpp.pair cimport pair
 from libcpp.vector cimport vector
 
-from typing import Union
+from typing import Optional, Union
 
 from scipy import sparse
 
@@ -23,11 +27,16 @@ from sknetwork.hierarchy.base import BaseHierarchy
 from sknetwork.hierarchy.postprocess import reorder_dendrogram
 from sknetwork.utils.format import check_format, get_adjacency, directed2undirected
 from sknetwork.utils.check import get_probs, is_symmetric
+from sknetwork.utils.timeout import get_deadline
+from sknetwork.utils.verbose import VerboseMixin
 
 
 cdef class AggregateGraph:
     """A class of graphs suitable for aggregation. Each node represents a cluster.
 
+    The neighbors of each cluster are stored in native arrays of (neighbor, edge weight) pairs (without self-loops),
+    and the cluster weights in arrays indexed by cluster, so that merges allocate no Python objects.
+
     Parameters
     ----------
     out_weights :
@@ -43,75 +52,173 @@ cdef class AggregateGraph:
 
     Attributes
     ----------
-    neighbors : dict[dict]
-        Dictionary of dictionary of edge weights.
     next_cluster : int
         Index of the next cluster (resulting from aggregation).
-    cluster_sizes : dict
-        Dictionary of cluster sizes.
-    cluster_out_weights : dict
-        Dictionary of cluster out-weights (sums to 1).
-    cluster_in_weights : dict
-        Dictionary of cluster in-weights (sums to 1).
+    cluster_sizes : memoryview
+        Cluster sizes (0 for clusters that have been merged).
+    cluster_out_weights : memoryview
+        Cluster out-weights (sums to 1).
+    cluster_in_weights : memoryview
+        Cluster in-weights (sums to 1).
+    self_loops : memoryview
+        Weights of self-loops.
     """
     cdef public int next_cluster
-    cdef public dict neighbors
-    cdef public dict tmp
-    cdef dict cluster_sizes
-    cdef public dict cluster_out_weights
-    cdef public dict cluster_in_weights
+    cdef vector[vector[pair[int, double]]] neighbors
+    cdef public int[:] cluster_sizes
+    cdef public double[:] cluster_out_weights
+    cdef public double[:] cluster_in_weights
+    cdef public double[:] self_loops
+    cdef double[:] weights_tmp
 
     def __init__(self, double[:] out_weights, double[:] in_weights, double[:] data, int[:] indices,
                  int[:] indptr):
         cdef int n = indptr.shape[0] - 1
+        cdef int n_clusters = max(2 * n - 1, n)
         cdef float total_weight = np.sum(data)
         cdef int i
         cdef int j
 
         self.next_cluster = n
-        self.neighbors = {}
+        self.neighbors.resize(n_clusters)
+        self.self_loops = np.zeros(n_clusters)
         for i in range(n):
             # normalize so that the sum of edge weights is equal to 1
-            self.neighbors[i] = {}
             for j in range(indptr[i], indptr[i + 1]):
-                self.neighbors[i][indices[j]] = data[j] / total_weight
+                if indices[j] == i:
+                    self.self_loops[i] = data[j] / total_weight
+                else:
+                    self.neighbors[i].push_back(pair[int, double](indices[j], data[j] / total_weight))
 
-        cluster_sizes = {}
-        cluster_out_weights = {}
-        cluster_in_weights = {}
-        for i in range(n):
-            cluster_sizes[i] = 1
-            cluster_out_weights[i] = out_weights[i]
-            cluster_in_weights[i] = in_weights[i]
-        self.cluster_sizes = cluster_sizes
-        self.cluster_out_weights = cluster_out_weights
-        self.cluster_in_weights = cluster_in_weights
-
-    cdef float similarity(self, int node1, int node2):
+        self.cluster_sizes = np.zeros(n_clusters, dtype=np.int32)
+        self.cluster_sizes[:n] = 1
+        self.cluster_out_weights = np.zeros(n_clusters)
+        self.cluster_out_weights[:n] = out_weights
+        self.cluster_in_weights = np.zeros(n_clusters)
+        self.cluster_in_weights[:n] = in_weights
+        self.weights_tmp = np.zeros(n_clusters)
+
+    def get_weight(self, int node1, int node2) -> float:
+        """Weight of the edge between two nodes (0 if none).
+
+        Parameters
+        ----------
+        node1, node2 :
+            Nodes.
+
+        Returns
+        -------
+        weight: float
+            Edge weight.
+        """
+        cdef pair[int, double] edge
+        if node1 == node2:
+            return self.self_loops[node1]
+        for edge in self.neighbors[node1]:
+            if edge.first == node2:
+                return edge.second
+        return 0.
+
+    def get_neighbors(self, int node) -> np.ndarray:
+        """Neighbors of a node (without self-loop).
+
+        Parameters
+        ----------
+        node :
+            Node.
+
+        Returns
+        -------
+        neighbors: np.ndarray
+            Neighbors.
+        """
+        cdef pair[int, double] edge
+        return np.array([edge.first for edge in self.neighbors[node]], dtype=int)
+
+    cdef float similarity(self, int node1, int node2, double weight) noexcept nogil:
         """Similarity of two nodes.
 
         Parameters
         ----------
         node1, node2 :
             Nodes.
+        weight :
+            Weight of the edge between the two nodes.
 
         Returns
         -------
         sim: float
             Similarity.
         """
-        cdef float sim = -float("inf")
+        cdef float sim = -INFINITY
         cdef float a = self.cluster_out_weights[node1] * self.cluster_in_weights[node2]
         cdef float b = self.cluster_out_weights[node2] * self.cluster_in_weights[node1]
         cdef float den = a + b
 
         if den > 0:
-            sim = 2 * self.neighbors[node1][node2] / den
+            sim = 2 * weight / den
         return sim
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cpdef AggregateGraph merge(self, int node1, int node2):
+    cdef void _merge(self, int node1, int node2) noexcept nogil:
+        """Merges two nodes (see :meth:`merge`)."""
+        cdef int new_node = self.next_cluster
+        cdef int node
+        cdef int neighbor
+        cdef int i
+        cdef int j
+        cdef int k
+        cdef double weight
+        cdef double self_loop = self.self_loops[node1] + self.self_loops[node2]
+        cdef vector[pair[int, double]]* neighbors_new = &self.neighbors[new_node]
+        cdef vector[pair[int, double]]* neighbors
+
+        # weights of the edges from the new node (visited neighbors are marked by a negative size)
+        for k in range(2):
+            node = node1 if k == 0 else node2
+            neighbors = &self.neighbors[node]
+            for i in range(neighbors.size()):
+                neighbor = neighbors[0][i].first
+                if neighbor == node1 or neighbor == node2:
+                    self_loop += neighbors[0][i].second
+                else:
+                    if self.cluster_sizes[neighbor] > 0:
+                        self.cluster_sizes[neighbor] = -self.cluster_sizes[neighbor]
+                        neighbors_new.push_back(pair[int, double](neighbor, 0))
+                    self.weights_tmp[neighbor] += neighbors[0][i].second
+
+        # edges to the new node, replacing those to node1 and node2
+        for i in range(neighbors_new.size()):
+            neighbor = neighbors_new[0][i].first
+            neighbors_new[0][i].second = self.weights_tmp[neighbor]
+            self.weights_tmp[neighbor] = 0
+            self.cluster_sizes[neighbor] = -self.cluster_sizes[neighbor]
+            neighbors = &self.neighbors[neighbor]
+            weight = 0
+            for k in range(2):
+                node = node1 if k == 0 else node2
+                for j in range(neighbors.size()):
+                    if neighbors[0][j].first == node:
+                        weight += neighbors[0][j].second
+                        neighbors[0][j] = neighbors.back()
+                        neighbors.pop_back()
+                        break
+            neighbors.push_back(pair[int, double](new_node, weight))
+
+        # free memory
+        vector[pair[int, double]]().swap(self.neighbors[node1])
+        vector[pair[int, double]]().swap(self.neighbors[node2])
+
+        self.self_loops[new_node] = self_loop
+        self.cluster_sizes[new_node] = self.cluster_sizes[node1] + self.cluster_sizes[node2]
+        self.cluster_sizes[node1] = 0
+        self.cluster_sizes[node2] = 0
+        self.cluster_out_weights[new_node] = self.cluster_out_weights[node1] + self.cluster_out_weights[node2]
+        self.cluster_in_weights[new_node] = self.cluster_in_weights[node1] + self.cluster_in_weights[node2]
+        self.next_cluster += 1
+
+    def merge(self, int node1, int node2) -> 'AggregateGraph':
         """Merges two nodes.
 
         Parameters
@@ -124,29 +231,11 @@ cdef class AggregateGraph:
         self: :class:`AggregateGraph`
             The aggregate grate (without self-loop).
         """
-        cdef int new_node = self.next_cluster
-        self.neighbors[new_node] = {}
-        self.neighbors[new_node][new_node] = 0
-        cdef set common_neighbors = set(self.neighbors[node1].keys()) & set(self.neighbors[node2].keys()) - {node1, node2}
-        for node in common_neighbors:
-            self.neighbors[new_node][node] = self.neighbors[node1].pop(node) + self.neighbors[node2].pop(node)
-            self.neighbors[node][new_node] = self.neighbors[node].pop(node1) + self.neighbors[node].pop(node2)
-        for node in {node1, node2}:
-            for neighbor in set(self.neighbors[node].keys()) - {node1, node2}:
-                self.neighbors[new_node][neighbor] = self.neighbors[node].pop(neighbor)
-                self.neighbors[neighbor][new_node] = self.neighbors[neighbor].pop(node)
-            for other_node in {node1, node2}:
-                if other_node in self.neighbors[node]:
-                    self.neighbors[new_node][new_node] += self.neighbors[node][other_node]
-            del self.neighbors[node]
-        self.cluster_sizes[new_node] = self.cluster_sizes.pop(node1) + self.cluster_sizes.pop(node2)
-        self.cluster_out_weights[new_node] = self.cluster_out_weights.pop(node1) + self.cluster_out_weights.pop(node2)
-        self.cluster_in_weights[new_node] = self.cluster_in_weights.pop(node1) + self.cluster_in_weights.pop(node2)
-        self.next_cluster += 1
+        self._merge(node1, node2)
         return self
 
 
-class Paris(BaseHierarchy):
+class Paris(BaseHierarchy, VerboseMixin):
     """Agglomerative clustering algorithm that performs greedy merge of nodes based on their similarity.
 
     The similarity between nodes :math:`i,j` is :math:`\\dfrac{A_{ij}}{w_i w_j}` where
@@ -161,9 +250,15 @@ class Paris(BaseHierarchy):
     ----------
     weights :
         Weights of nodes.
-        ``'degree'`` (default) or ``'uniform'``.
+        ``'degree'`` (default), ``'uniform'`` or custom weights (array of positive values).
     reorder :
         If ``True`` (default), reorder the dendrogram in non-decreasing order of height.
+    max_time :
+        Maximum running time (in seconds), checked after each merge.
+        When exceeded, the remaining clusters are merged at infinite distance (this is reported in the log).
+        If ``None`` (default), no limit.
+    verbose :
+        Verbose mode.
 
     Attributes
     ----------
@@ -205,11 +300,14 @@ class Paris(BaseHierarchy):
     <https://arxiv.org/abs/1806.01664>`_
     Workshop on Mining and Learning with Graphs.
     """
-    def __init__(self, weights: str = 'degree', reorder: bool = True):
+    def __init__(self, weights: Union[str, np.ndarray] = 'degree', reorder: bool = True,
+                 max_time: Optional[float] = None, verbose: bool = False):
         super(Paris, self).__init__()
+        VerboseMixin.__init__(self, verbose)
         self.dendrogram_ = None
         self.weights = weights
         self.reorder = reorder
+        self.max_time = max_time
         self.bipartite = None
 
     @cython.boundscheck(False)
@@ -226,6 +324,7 @@ class Paris(BaseHierarchy):
         -------
         self: :class:`Paris`
         """
+        cdef double deadline = get_deadline(self.max_time)
         self._init_vars()
 
         # input
@@ -247,66 +346,94 @@ class Paris(BaseHierarchy):
             raise ValueError('The graph must contain at least two nodes.')
 
         # agglomerative clustering
-        aggregate_graph = AggregateGraph(out_weights, in_weights, adjacency.data.astype(float),
-                                         adjacency.indices, adjacency.indptr)
+        cdef AggregateGraph aggregate_graph = AggregateGraph(out_weights, in_weights, adjacency.data.astype(float),
+                                                             adjacency.indices, adjacency.indptr)
 
-        cdef vector[(int, int)] connected_components
-        dendrogram = []
+        cdef vector[pair[int, int]] connected_components
+        cdef vector[double] merges
+        cdef vector[int] chain
+        cdef vector[pair[int, double]]* neighbors
+        cdef int start = 0
         cdef int node
-        cdef int next_node
         cdef int cluster_size
-        cdef int next_cluster_size
         cdef int neighbor
-        cdef int nearest_neighbor
+        cdef int nearest_neighbor = 0
         cdef int nearest_neighbor_last
-        cdef vector[int] chain
+        cdef int i
         cdef float sim
         cdef float max_sim
-
-        while len(aggregate_graph.cluster_sizes):
-            for node in aggregate_graph.cluster_sizes:
-                break
-            chain.clear()
-            chain.push_back(node)
-            while chain.size():
-                node = chain[chain.size() - 1]
-                chain.pop_back()
-                if set(aggregate_graph.neighbors[node].keys()) - {node}:
-                    max_sim = -float("inf")
-                    for neighbor in set(aggregate_graph.neighbors[node].keys()) - {node}:
-                        sim = aggregate_graph.similarity(node, neighbor)
-                        if sim > max_sim:
-                            nearest_neighbor = neighbor
-                            max_sim = sim
-                        elif sim == max_sim:
-                            nearest_neighbor = min(neighbor, nearest_neighbor)
-                    if chain.size():
-                        nearest_neighbor_last = chain[chain.size() - 1]
-                        chain.pop_back()
-                        if nearest_neighbor_last == nearest_neighbor:
-                            size = aggregate_graph.cluster_sizes[node] + aggregate_graph.cluster_sizes[nearest_neighbor]
-                            dendrogram.append([node, nearest_neighbor, 1. / max_sim, size])
-                            aggregate_graph.merge(node, nearest_neighbor)
+        cdef bint timeout = False
+
+        with nogil:
+            while not timeout:
+                # first remaining cluster
+                while start < aggregate_graph.next_cluster and aggregate_graph.cluster_sizes[start] == 0:
+                    start += 1
+                if start == aggregate_graph.next_cluster:
+                    break
+                chain.clear()
+                chain.push_back(start)
+                while chain.size():
+                    node = chain.back()
+                    chain.pop_back()
+                    neighbors = &aggregate_graph.neighbors[node]
+                    if neighbors.size():
+                        max_sim = -INFINITY
+                        for i in range(neighbors.size()):
+                            neighbor = neighbors[0][i].first
+                            sim = aggregate_graph.similarity(node, neighbor, neighbors[0][i].second)
+                            if sim > max_sim:
+                                nearest_neighbor = neighbor
+                                max_sim = sim
+                            elif sim == max_sim:
+                                nearest_neighbor = min(neighbor, nearest_neighbor)
+                        if chain.size():
+                            nearest_neighbor_last = chain.back()
+                            chain.pop_back()
+                            if nearest_neighbor_last == nearest_neighbor:
+                                merges.push_back(node)
+                                merges.push_back(nearest_neighbor)
+                                merges.push_back(1. / max_sim)
+                                merges.push_back(aggregate_graph.cluster_sizes[node]
+                                                     + aggregate_graph.cluster_sizes[nearest_neighbor])
+                                aggregate_graph._merge(node, nearest_neighbor)
+                                if deadline < INFINITY:
+                                    with gil:
+                                        timeout = time.perf_counter() > deadline
+                                    if timeout:
+                                        break
+                            else:
+                                chain.push_back(nearest_neighbor_last)
+                                chain.push_back(node)
+                                chain.push_back(nearest_neighbor)
                         else:
-                            chain.push_back(nearest_neighbor_last)
                             chain.push_back(node)
                             chain.push_back(nearest_neighbor)
                     else:
-                        chain.push_back(node)
-                        chain.push_back(nearest_neighbor)
-                else:
-                    connected_components.push_back((node, aggregate_graph.cluster_sizes[node]))
-                    del aggregate_graph.cluster_sizes[node]
-
-        node, cluster_size = connected_components[connected_components.size() - 1]
+                        connected_components.push_back(pair[int, int](node, aggregate_graph.cluster_sizes[node]))
+                        aggregate_graph.cluster_sizes[node] = 0
+
+        if timeout:
+            self.log.print("Time limit reached after", merges.size() // 4, "merges: the remaining",
+                           np.sum(np.asarray(aggregate_graph.cluster_sizes) > 0),
+                           "clusters are merged at infinite distance.")
+            for node in range(start, aggregate_graph.next_cluster):
+                if aggregate_graph.cluster_sizes[node] > 0:
+                    connected_components.push_back(pair[int, int](node, aggregate_graph.cluster_sizes[node]))
+
+        node = connected_components.back().first
+        cluster_size = connected_components.back().second
         connected_components.pop_back()
-        for next_node, next_cluster_size in connected_components:
-            cluster_size += next_cluster_size
-            dendrogram.append([node, next_node, float("inf"), cluster_size])
+        for i in range(connected_components.size()):
+            cluster_size += connected_components[i].second
+            merges.push_back(node)
+            merges.push_back(connected_components[i].first)
+            merges.push_back(INFINITY)
+            merges.push_back(cluster_size)
             node = aggregate_graph.next_cluster
             aggregate_graph.next_cluster += 1
 
-        dendrogram = np.array(dendrogram)
+        dendrogram = np.array(merges).reshape(-1, 4)
         if self.reorder:
             dendrogram = reorder_dendrogram(dendrogram)
 
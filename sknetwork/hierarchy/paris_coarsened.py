@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+from typing import Optional, Union
+
+import numpy as np
+from scipy import sparse
+from scipy.cluster.hierarchy import leaves_list
+
+from sknetwork.clustering.louvain import Louvain
+from sknetwork.hierarchy.base import BaseHierarchy
+from sknetwork.hierarchy.paris import Paris
+from sknetwork.hierarchy.postprocess import reorder_dendrogram
+from sknetwork.utils.check import check_format
+from sknetwork.utils.format import get_adjacency
+from sknetwork.utils.verbose import VerboseMixin
+
+
+class CoarsenedParis(BaseHierarchy, VerboseMixin):
+    """Paris algorithm applied to a graph coarsened by Louvain, for very large graphs.
+
+    The graph is first contracted into the clusters found by the Louvain algorithm, stopped after
+    ``n_aggregations`` aggregations. The Paris algorithm is then applied to the aggregate graph, whose nodes are
+    these clusters, and the dendrogram is expanded to all nodes: the nodes of each cluster are merged
+    at distance 0, in increasing order of index, before any merge of clusters.
+
+    The number of aggregations and the resolution control the size of the clusters, hence the trade-off
+    between the fidelity of the bottom of the dendrogram (below the clusters) and speed.
+
+    Parameters
+    ----------
+    weights :
+        Weights of nodes.
+        ``'degree'`` (default) or ``'uniform'``.
+    n_aggregations :
+        Number of aggregations of the Louvain algorithm used to coarsen the graph (default = 1).
+        A larger value gives fewer, larger clusters (faster, less detailed bottom of the dendrogram).
+        A negative value is interpreted as no limit.
+    resolution :
+        Resolution parameter of the Louvain algorithm.
+        A larger value gives more, smaller clusters (slower, more detailed bottom of the dendrogram).
+    reorder :
+        If ``True`` (default), reorder the dendrogram in non-decreasing order of height.
+    shuffle_nodes :
+        Enables node shuffling before the Louvain optimization.
+    random_state :
+        Random number generator or random seed, used to shuffle nodes. If ``None``, numpy.random is used.
+    verbose :
+        Verbose mode.
+
+    Attributes
+    ----------
+    dendrogram_ :
+        Dendrogram of the graph.
+    dendrogram_row_ :
+        Dendrogram for the rows, for bipartite graphs.
+    dendrogram_col_ :
+        Dendrogram for the columns, for bipartite graphs.
+    dendrogram_full_ :
+        Dendrogram for both rows and columns, indexed in this order, for bipartite graphs.
+    labels_coarse_ :
+        Labels of the clusters used to coarsen the graph (leaves of the Paris dendrogram).
+
+    Example
+    -------
+    >>> from sknetwork.hierarchy import CoarsenedParis
+    >>> from sknetwork.data import house
+    >>> paris = CoarsenedParis()
+    >>> adjacency = house()
+    >>> dendrogram = paris.fit_predict(adjacency)
+    >>> np.round(dendrogram, 2)
+    array([[0.  , 1.  , 0.  , 2.  ],
+           [2.  , 3.  , 0.  , 2.  ],
+           [5.  , 4.  , 0.  , 3.  ],
+           [6.  , 7.  , 1.33, 5.  ]])
+
+    Notes
+    -----
+    Each row of the dendrogram = :math:`i, j`, distance, size of cluster :math:`i + j`.
+
+    See Also
+    --------
+    sknetwork.hierarchy.Paris, sknetwork.clustering.Louvain
+    """
+    def __init__(self, weights: str = 'degree', n_aggregations: int = 1, resolution: float = 1,
+                 reorder: bool = True, shuffle_nodes: bool = False,
+                 random_state: Optional[Union[np.random.RandomState, int]] = None, verbose: bool = False):
+        super(CoarsenedParis, self).__init__()
+        VerboseMixin.__init__(self, verbose)
+        self.dendrogram_ = None
+        self.weights = weights
+        self.n_aggregations = n_aggregations
+        self.resolution = resolution
+        self.reorder = reorder
+        self.shuffle_nodes = shuffle_nodes
+        self.random_state = random_state
+        self.labels_coarse_ = None
+        self.bipartite = None
+
+    @staticmethod
+    def _expand_dendrogram(labels: np.ndarray, dendrogram_aggregate: np.ndarray) -> np.ndarray:
+        """Expand the dendrogram of the aggregate graph to all nodes.
+
+        Parameters
+        ----------
+        labels :
+            Cluster of each node (between 0 and n_clusters - 1).
+        dendrogram_aggregate :
+            Dendrogram of the aggregate graph (between clusters).
+
+        Returns
+        -------
+        dendrogram :
+            Dendrogram of the graph.
+        """
+        n = len(labels)
+        cluster_sizes = np.bincount(labels)
+        n_clusters = len(cluster_sizes)
+        n_merges = n - n_clusters
+
+        # merges inside clusters, in increasing order of node index
+        nodes = np.argsort(labels, kind='stable')
+        starts = np.cumsum(cluster_sizes) - cluster_sizes
+        positions = np.arange(n)
+        labels_sorted = labels[nodes]
+        mask = positions != starts[labels_sorted]
+        positions = positions[mask]
+        merges = positions - labels_sorted[mask] - 1
+        first = positions == starts[labels_sorted[mask]] + 1
+        dendrogram = np.zeros((n - 1, 4))
+        dendrogram[merges, 0] = np.where(first, nodes[positions - 1], n + merges - 1)
+        dendrogram[merges, 1] = nodes[positions]
+        dendrogram[merges, 3] = positions - starts[labels_sorted[mask]] + 1
+
+        # merges of clusters, identified by their roots
+        roots = np.where(cluster_sizes > 1, n + starts + cluster_sizes - np.arange(n_clusters) - 2, nodes[starts])
+        index = np.concatenate((roots, n + n_merges + np.arange(n_clusters - 1)))
+        children = dendrogram_aggregate[:, :2].astype(int)
+        dendrogram[n_merges:, :2] = index[children]
+        dendrogram[n_merges:, 2] = dendrogram_aggregate[:, 2]
+        if n_clusters > 1:
+            # the clusters of each merge are contiguous in the order of leaves, starting from its first leaf
+            order = leaves_list(dendrogram_aggregate)
+            positions = np.empty(n_clusters, dtype=int)
+            positions[order] = np.arange(n_clusters)
+            # first leaf of each node, by pointer jumping along the first children
+            first_leaf = np.concatenate((np.arange(n_clusters), children[:, 0]))
+            while True:
+                first_leaf_ = first_leaf[first_leaf]
+                if np.array_equal(first_leaf_, first_leaf):
+                    break
+                first_leaf = first_leaf_
+            starts = positions[first_leaf[n_clusters:]]
+            counts = np.concatenate(([0], np.cumsum(cluster_sizes[order])))
+            dendrogram[n_merges:, 3] = counts[starts + dendrogram_aggregate[:, 3].astype(int)] - counts[starts]
+        return dendrogram
+
+    def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray]) -> 'CoarsenedParis':
+        """Fit algorithm to data.
+
+        Parameters
+        ----------
+        input_matrix :
+            Adjacency matrix or biadjacency matrix of the graph.
+
+        Returns
+        -------
+        self: :class:`CoarsenedParis`
+        """
+        self._init_vars()
+        input_matrix = check_format(input_matrix)
+        adjacency, self.bipartite = get_adjacency(input_matrix)
+        if adjacency.shape[0] <= 1:
+            raise ValueError('The graph must contain at least two nodes.')
+
+        louvain = Louvain(resolution=self.resolution, n_aggregations=self.n_aggregations,
+                          shuffle_nodes=self.shuffle_nodes, sort_clusters=False, return_membership=False,
+                          return_aggregate=True, random_state=self.random_state)
+        labels = louvain.fit_transform(adjacency)
+        aggregate = louvain.aggregate_
+        n_clusters = aggregate.shape[0]
+        self.log.print("Coarsening completed with", n_clusters, "clusters.")
+
+        if n_clusters > 1:
+            if self.weights == 'uniform':
+                weights = np.bincount(labels).astype(float)
+            else:
+                weights = self.weights
+            paris = Paris(weights=weights, reorder=self.reorder)
+            dendrogram_aggregate = paris.fit_predict(aggregate)
+        else:
+            dendrogram_aggregate = np.zeros((0, 4))
+
+        dendrogram = self._expand_dendrogram(labels, dendrogram_aggregate)
+        if self.reorder:
+            dendrogram = reorder_dendrogram(dendrogram)
+
+        self.dendrogram_ = dendrogram
+        self.labels_coarse_ = labels
+        if self.bipartite:
+            self._split_vars(input_matrix.shape)
+        return self
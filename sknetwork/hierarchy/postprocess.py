@@ -7,21 +7,23 @@ Created on June 2019
 @author: Quentin Lutz <qlutz@enst.fr>
 """
 
-import copy
-from collections import defaultdict
-from typing import Optional, Union, Tuple
+from typing import Iterable, Optional, Union, Tuple
 
 import numpy as np
 
+from sknetwork.hierarchy.cut_core import get_cut_labels
+from sknetwork.hierarchy.index_core import lift_heights
 from sknetwork.utils.check import check_n_clusters, check_dendrogram
 
 
 def reorder_dendrogram(dendrogram: np.ndarray) -> np.ndarray:
-    """Reorder the dendrogram in non-decreasing order of height."""
+    """Reorder the dendrogram in non-decreasing order of height.
+    In case of inversions (merge lower than one of its children), each merge stays after its children."""
     n = dendrogram.shape[0] + 1
     order = np.zeros((2, n - 1), float)
     order[0] = np.max(dendrogram[:, :2], axis=1)
     order[1] = dendrogram[:, 2]
+    lift_heights(dendrogram[:, :2].astype(np.int32).ravel(), order[1])
     index = np.lexsort(order)
     dendrogram_new = dendrogram[index]
     index_new = np.arange(2 * n - 1)
@@ -129,6 +131,77 @@ def cut_straight(dendrogram: np.ndarray, n_clusters: Optional[int] = None, thres
     return get_labels(dendrogram, cluster, sort_clusters, return_dendrogram)
 
 
+def cut_straight_batch(dendrogram: np.ndarray, n_clusters: Optional[Iterable] = None,
+                       thresholds: Optional[Iterable] = None, sort_clusters: bool = True) -> np.ndarray:
+    """Cut a dendrogram at several levels and return the corresponding clusterings.
+
+    Same as :func:`cut_straight` applied to each number of clusters, then to each threshold,
+    with a single pass over the dendrogram.
+
+    Parameters
+    ----------
+    dendrogram:
+        Dendrogram.
+    n_clusters :
+        Numbers of clusters (optional).
+        The number of clusters can be larger than n_clusters in case of equal heights in the dendrogram.
+    thresholds :
+        Thresholds on height (optional).
+    sort_clusters :
+        If ``True``,  sorts clusters in decreasing order of size.
+
+    Returns
+    -------
+    labels : np.ndarray
+        Cluster of each node for each cut, shape (number of cuts, number of nodes),
+        for the numbers of clusters first, then the thresholds.
+
+    Example
+    -------
+    >>> from sknetwork.hierarchy import cut_straight_batch
+    >>> dendrogram = np.array([[0, 1, 0, 2], [2, 3, 1, 3]])
+    >>> cut_straight_batch(dendrogram, n_clusters=[3, 2, 1])
+    array([[0, 1, 2],
+           [0, 0, 1],
+           [0, 0, 0]])
+    >>> cut_straight_batch(dendrogram, thresholds=[0.5])
+    array([[0, 0, 1]])
+    """
+    check_dendrogram(dendrogram)
+    n = dendrogram.shape[0] + 1
+    heights = dendrogram[:, 2]
+    heights_sorted = np.sort(heights)
+
+    cuts = []
+    if n_clusters is not None:
+        for n_clusters_ in n_clusters:
+            check_n_clusters(n_clusters_, n, n_min=1)
+            if n_clusters_ == 1:
+                cuts.append(np.inf)
+            else:
+                cuts.append(heights_sorted[n - n_clusters_])
+    if thresholds is not None:
+        cut_min = heights_sorted[0] if n > 1 else -np.inf
+        cuts += [max(cut_min, threshold) for threshold in thresholds]
+    if not cuts:
+        raise ValueError('Specify the numbers of clusters or the thresholds.')
+
+    # nested cuts, in increasing order of height
+    cuts, index = np.unique(np.array(cuts, dtype=float), return_inverse=True)
+    levels = np.searchsorted(cuts, heights, side='right').astype(np.int32)
+    children = dendrogram[:, :2].astype(np.int32).ravel()
+    labels = get_cut_labels(children, levels, len(cuts))[index]
+
+    if sort_clusters:
+        for labels_ in labels:
+            sizes = np.bincount(labels_)
+            order = np.argsort(-sizes)
+            labels_new = np.zeros(len(sizes), dtype=np.int32)
+            labels_new[order] = np.arange(len(sizes))
+            labels_[:] = labels_new[labels_]
+    return labels.astype(int)
+
+
 def cut_balanced(dendrogram: np.ndarray, max_cluster_size: int = 20, sort_clusters: bool = True,
                  return_dendrogram: bool = False) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
     """Cuts a dendrogram with a constraint on the cluster size and returns the corresponding clustering.
@@ -215,82 +288,102 @@ def aggregate_dendrogram(dendrogram: np.ndarray, n_clusters: int = 2, return_cou
         return new_dendrogram
 
 
-def get_index(tree):
-    """Reindex a dendrogram from the leaves
+def get_dendrogram_from_levels(labels: np.ndarray) -> np.ndarray:
+    """Get the dendrogram of a tree given by nested clusterings.
+
+    Each level refines the previous one. The root contains all nodes and the leaves are the nodes.
+    The children of each cluster are ordered by label at the next level and merged in reverse order,
+    at a height given by the depth of the cluster in the tree (clusters with a single child being contracted).
+    The clusters are processed in post-order (depth-first search).
 
     Parameters
     ----------
-    tree:
-        The tree to be indexed
+    labels :
+        Labels of nodes, one row per level, from top to bottom.
 
     Returns
     -------
-    index:
-        The index of the root of the given tree
-    """
-    if type(tree) != list:
-        return tree
-    else:
-        return np.max([get_index(t) for t in tree])
-
-
-def get_dendrogram(tree, dendrogram=None, index=None, depth=0, size=None, copy_tree=False):
-    """Get dendrogram from tree.
-
-    Parameters
-    ----------
-    tree :
-        The initial tree
     dendrogram :
-        Intermediary dendrogram for recursive use
-    index :
-        Intermediary index for recursive use
-    depth :
-        Current depth for recursive use
-    size :
-        Current leaf count for recursive use
-    copy_tree :
-        If ``True``, ensure the passed tree remains unchanged.
+        Dendrogram.
 
-    Returns
+    Example
     -------
-    dendrogram`:
-        The reordered dendrogram
-    index :
-        The indexing array
+    >>> from sknetwork.hierarchy.postprocess import get_dendrogram_from_levels
+    >>> labels = np.array([[0, 0, 0, 1, 1]])
+    >>> get_dendrogram_from_levels(labels)
+    array([[2., 1., 0., 2.],
+           [5., 0., 0., 3.],
+           [4., 3., 0., 2.],
+           [7., 6., 1., 5.]])
     """
-    if copy_tree:
-        return get_dendrogram(copy.deepcopy(tree))
-    else:
-        if dendrogram is None:
-            dendrogram = []
-        if index is None:
-            index = get_index(tree)
-        if size is None:
-            size = defaultdict(lambda: 1)
-        if len(tree) > 1:
-            lengths = np.array([len(t) for t in tree])
-            if np.max(lengths) == 1:
-                # merge all
-                i = tree.pop()[0]
-                j = tree.pop()[0]
-                s = size[i] + size[j]
-                dendrogram.append([i, j, float(-depth), s])
-                index += 1
-                while len(tree):
-                    s += 1
-                    dendrogram.append([index, tree.pop()[0], float(-depth), s])
-                    index += 1
-                size[index] = s
-                tree.append(index)
-                return dendrogram, index
-            else:
-                i = np.argwhere(lengths > 1).ravel()[0]
-                dendrogram_, index_ = get_dendrogram(tree[i], None, index, depth + 1, size)
-                dendrogram += dendrogram_
-                return get_dendrogram(tree, dendrogram, index_, depth, size)
-        else:
-            return dendrogram, index
+    labels = np.array(labels, dtype=int).reshape(-1, np.shape(labels)[-1])
+    n = labels.shape[1]
+    # levels: root, clusters, leaves
+    levels = [np.zeros(n, dtype=int)]
+    levels += [np.unique(labels_, return_inverse=True)[1].ravel() for labels_ in labels]
+    levels.append(np.arange(n))
+    n_levels = len(levels)
+    counts = [labels_.max() + 1 for labels_ in levels]
+    offsets = np.cumsum([0] + counts)
+    n_nodes = offsets[-1]
+
+    # tree (nodes indexed level by level)
+    parents = -np.ones(n_nodes, dtype=int)
+    levels_node = np.repeat(np.arange(n_levels), counts)
+    members = np.zeros(n_nodes, dtype=int)
+    sizes = np.zeros(n_nodes, dtype=int)
+    for level in range(n_levels):
+        nodes = offsets[level] + levels[level]
+        members[nodes] = np.arange(n)
+        sizes[offsets[level]:offsets[level + 1]] = np.bincount(levels[level])
+        if level:
+            parents[nodes] = offsets[level - 1] + levels[level - 1]
+    n_children = np.bincount(parents[1:], minlength=n_nodes)
+
+    # contraction of clusters with a single child
+    parents_ = -np.ones(n_nodes, dtype=int)
+    depths = np.zeros(n_nodes, dtype=int)
+    for level in range(1, n_levels):
+        nodes = np.arange(offsets[level], offsets[level + 1])
+        parent = parents[nodes]
+        mask = n_children[parent] > 1
+        parents_[nodes] = np.where(mask, parent, parents_[parent])
+        depths[nodes] = np.where(mask, depths[parent] + 1, depths[parent])
+    clusters = np.flatnonzero(n_children > 1)
+    children = np.flatnonzero((parents_ >= 0) & ((n_children > 1) | (levels_node == n_levels - 1)))
+
+    # post-order of clusters (depth-first search)
+    keys = np.array([np.where(levels_node[clusters] >= level, levels[level][members[clusters]], n)
+                     for level in range(n_levels - 1, 0, -1)])
+    order = np.zeros(n_nodes, dtype=int)
+    order[clusters[np.lexsort(keys)]] = np.arange(len(clusters))
+
+    # merges of the children of each cluster, in reverse order
+    parent = parents_[children]
+    keys = np.zeros(len(children), dtype=int)
+    for level in range(n_levels - 1):
+        mask = levels_node[parent] == level
+        keys[mask] = levels[level + 1][members[children[mask]]]
+    index = np.lexsort((-keys, order[parent]))
+    children, parent = children[index], parent[index]
+    starts = np.flatnonzero(np.diff(parent, prepend=-1))
+    groups = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(children))))
+    positions = np.arange(len(children)) - starts[groups]
+    merges = np.flatnonzero(positions > 0)
+    rows = np.arange(len(merges))
+
+    # dendrogram (nodes indexed as in the dendrogram)
+    index = np.zeros(n_nodes, dtype=int)
+    index[offsets[-2]:] = np.arange(n)
+    clusters = clusters[np.argsort(order[clusters])]
+    index[clusters] = n + np.cumsum(n_children[clusters] - 1) - 1
+    dendrogram = np.zeros((n - 1, 4))
+    dendrogram[rows, 0] = np.where(positions[merges] == 1, index[children[merges - 1]], n + rows - 1)
+    dendrogram[rows, 1] = index[children[merges]]
+    dendrogram[rows, 2] = np.max(depths[clusters]) - depths[parent[merges]]
+    cumsizes = np.cumsum(sizes[children])
+    dendrogram[rows, 3] = cumsizes[merges] - (cumsizes - sizes[children])[starts[groups[merges]]]
+    return dendrogram
 
 
 def split_dendrogram(dendrogram: np.ndarray, shape: tuple):
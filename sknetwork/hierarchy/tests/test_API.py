@@ -14,12 +14,12 @@ class TestHierarchyAPI(unittest.TestCase):
         adjacency = test_graph()
         n = adjacency.shape[0]
 
-        for algo in [Paris(), Ward(GSVD(3)), LouvainIteration()]:
+        for algo in [Paris(), CoarsenedParis(), Ward(GSVD(3)), LouvainIteration()]:
             dendrogram = algo.fit_predict(adjacency)
             self.assertTupleEqual(dendrogram.shape, (n - 1, 4))
 
     def test_disconnected(self):
         adjacency = test_graph_disconnect()
-        for algo in [Paris(), Ward(GSVD(3)), LouvainIteration()]:
+        for algo in [Paris(), CoarsenedParis(), Ward(GSVD(3)), LouvainIteration()]:
             dendrogram = algo.fit_transform(adjacency)
             self.assertEqual(dendrogram.shape, (9, 4))
@@ -8,12 +8,25 @@ Created in March 2020
 
 import unittest
 
+from sknetwork.data import albert_barabasi
 from sknetwork.data.test_graphs import *
-from sknetwork.hierarchy import LouvainIteration, LouvainHierarchy, Paris
+from sknetwork.hierarchy import LouvainIteration, LouvainHierarchy, Paris, CoarsenedParis, cut_straight
+from sknetwork.hierarchy.paris import AggregateGraph
 
 
 class TestLouvainHierarchy(unittest.TestCase):
 
+    def test_levels_regression(self):
+        # same merges as the recursive conversion, actual cluster sizes
+        adjacency = albert_barabasi(500, 3, seed=0)
+        dendrogram = LouvainIteration().fit_predict(adjacency)
+        self.assertEqual(len(set(cut_straight(dendrogram, threshold=0.5))), 207)
+        n = adjacency.shape[0]
+        sizes = np.ones(2 * n - 1)
+        for t, (i, j, _, size) in enumerate(dendrogram):
+            sizes[n + t] = sizes[int(i)] + sizes[int(j)]
+            self.assertEqual(size, sizes[n + t])
+
     def test(self):
         louvain_iteration = LouvainIteration()
         louvain_iteration_ = LouvainIteration(resolution=2, depth=1)
@@ -21,9 +34,71 @@ class TestLouvainHierarchy(unittest.TestCase):
         louvain_hierarchy_ = LouvainHierarchy(tol_aggregation=0.1)
         paris = Paris()
         paris_ = Paris(weights='uniform', reorder=False)
-        for algo in [louvain_iteration, louvain_iteration_, louvain_hierarchy, louvain_hierarchy_, paris, paris_]:
+        coarsened_paris = CoarsenedParis()
+        coarsened_paris_ = CoarsenedParis(weights='uniform', n_aggregations=-1, reorder=False)
+        for algo in [louvain_iteration, louvain_iteration_, louvain_hierarchy, louvain_hierarchy_, paris, paris_,
+                     coarsened_paris, coarsened_paris_]:
             for input_matrix in [test_graph(), test_digraph(), test_bigraph()]:
                 dendrogram = algo.fit_predict(input_matrix)
                 self.assertEqual(dendrogram.shape, (input_matrix.shape[0] - 1, 4))
                 if algo.bipartite:
                     self.assertEqual(algo.dendrogram_full_.shape, (sum(input_matrix.shape) - 1, 4))
+
+    def test_n_jobs(self):
+        for input_matrix in [test_graph(), test_bigraph()]:
+            dendrogram = LouvainIteration(depth=-1, resolution=2).fit_predict(input_matrix)
+            dendrogram_parallel = LouvainIteration(depth=-1, resolution=2, n_jobs=2).fit_predict(input_matrix)
+            self.assertTrue(np.array_equal(dendrogram, dendrogram_parallel))
+
+    def test_max_time(self):
+        paris = Paris(max_time=0)
+        for input_matrix in [test_graph(), test_digraph(), test_bigraph()]:
+            dendrogram = paris.fit_predict(input_matrix)
+            self.assertEqual(dendrogram.shape, (input_matrix.shape[0] - 1, 4))
+            self.assertTrue(np.isinf(dendrogram[-1, 2]))
+        self.assertIn('Time limit', str(paris.log))
+        dendrogram = Paris(max_time=100).fit_predict(test_graph())
+        self.assertFalse(np.isinf(dendrogram).any())
+
+    def test_aggregate_graph(self):
+        adjacency = test_graph()
+        weights = np.ones(adjacency.shape[0]) / adjacency.shape[0]
+        aggregate_graph = AggregateGraph(weights, weights, adjacency.data.astype(float), adjacency.indices,
+                                         adjacency.indptr)
+        neighbors = (set(aggregate_graph.get_neighbors(0)) | set(aggregate_graph.get_neighbors(1))) - {0, 1}
+        weight = aggregate_graph.get_weight(0, 2) + aggregate_graph.get_weight(1, 2)
+        total_weight = np.sum(aggregate_graph.self_loops) + sum(
+            aggregate_graph.get_weight(i, j) for i in range(10) for j in aggregate_graph.get_neighbors(i))
+        aggregate_graph.merge(0, 1)
+        self.assertEqual(aggregate_graph.next_cluster, 11)
+        self.assertEqual(set(aggregate_graph.get_neighbors(10)), neighbors)
+        self.assertEqual(len(aggregate_graph.get_neighbors(0)), 0)
+        self.assertAlmostEqual(aggregate_graph.get_weight(10, 2), weight)
+        self.assertAlmostEqual(aggregate_graph.get_weight(2, 10), weight)
+        self.assertEqual(aggregate_graph.cluster_sizes[10], 2)
+        self.assertAlmostEqual(aggregate_graph.cluster_out_weights[10], 0.2)
+        alive = [i for i in range(11) if aggregate_graph.cluster_sizes[i]]
+        self.assertAlmostEqual(total_weight, np.sum(np.asarray(aggregate_graph.self_loops)[alive]) + sum(
+            aggregate_graph.get_weight(i, j) for i in alive for j in aggregate_graph.get_neighbors(i)), 5)
+
+    def test_coarsened_paris(self):
+        adjacency = test_graph()
+        n = adjacency.shape[0]
+        for algo in [CoarsenedParis(), CoarsenedParis(weights='uniform', resolution=2, reorder=False)]:
+            dendrogram = algo.fit_predict(adjacency)
+            n_clusters = len(set(algo.labels_coarse_))
+            # nodes of each cluster are merged first, at distance 0
+            self.assertTrue((dendrogram[:n - n_clusters, 2] == 0).all())
+            self.assertEqual(dendrogram[-1, 3], n)
+            self.assertEqual(len(set(dendrogram[:, :2].ravel())), 2 * n - 2)
+            labels = cut_straight(dendrogram, n_clusters)
+            self.assertEqual(len(set(zip(labels, algo.labels_coarse_))), n_clusters)
+        # shuffled nodes
+        dendrogram = CoarsenedParis(shuffle_nodes=True, random_state=0).fit_predict(adjacency)
+        dendrogram_ = CoarsenedParis(shuffle_nodes=True, random_state=0).fit_predict(adjacency)
+        self.assertTrue((dendrogram == dendrogram_).all())
+        self.assertEqual(dendrogram[-1, 3], n)
+        # single cluster
+        dendrogram = CoarsenedParis(resolution=0).fit_predict(np.ones((4, 4)) - np.eye(4))
+        self.assertTrue((dendrogram[:, 2] == 0).all())
+        self.assertEqual(dendrogram[-1, 3], 4)
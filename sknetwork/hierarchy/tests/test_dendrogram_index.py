@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the dendrogram index"""
+import tempfile
+import unittest
+from os.path import join
+
+import numpy as np
+
+from sknetwork.data import karate_club, load, save
+from sknetwork.hierarchy import DendrogramIndex, Paris, cut_straight
+
+
+class TestDendrogramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dendrogram = Paris().fit_predict(karate_club())
+        self.index = DendrogramIndex(self.dendrogram)
+        n = self.dendrogram.shape[0] + 1
+        # ancestors of each node, from the node to the root
+        parents = np.zeros(2 * n - 1, dtype=int)
+        parents[self.dendrogram[:, :2].astype(int)] = n + np.arange(n - 1)[:, np.newaxis]
+        self.ancestors = []
+        for node in range(n):
+            ancestors = [node]
+            while ancestors[-1] != 2 * n - 2:
+                ancestors.append(parents[ancestors[-1]])
+            self.ancestors.append(ancestors)
+
+    def test_lca(self):
+        n = self.dendrogram.shape[0] + 1
+        nodes1, nodes2 = np.repeat(np.arange(n), n), np.tile(np.arange(n), n)
+        lca = self.index.get_lca(nodes1, nodes2)
+        heights = self.index.get_height(nodes1, nodes2)
+        for i, j, ancestor, height in zip(nodes1, nodes2, lca, heights):
+            expected = [node for node in self.ancestors[i] if node in self.ancestors[j]][0]
+            self.assertEqual(ancestor, expected)
+            self.assertEqual(height, self.dendrogram[expected - n, 2] if i != j else 0)
+
+    def test_clusters(self):
+        n = self.dendrogram.shape[0] + 1
+        self.assertTrue((self.index.get_clusters(np.arange(n), 1) == 2 * n - 2).all())
+        for n_clusters in [2, 5, n]:
+            clusters = self.index.get_clusters(np.arange(n), n_clusters)
+            labels = cut_straight(self.dendrogram, n_clusters, sort_clusters=False)
+            self.assertEqual(len(set(clusters)), n_clusters)
+            self.assertEqual(len(set(zip(clusters, labels))), n_clusters)
+            for node, cluster in enumerate(clusters):
+                self.assertIn(cluster, self.ancestors[node])
+                self.assertTrue(cluster < 2 * n - n_clusters)
+        with self.assertRaises(ValueError):
+            self.index.get_clusters([0], 0)
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = join(directory, 'dendrogram_index')
+            save(path, self.index.to_bunch())
+            index = DendrogramIndex.from_bunch(load(path))
+        self.assertTrue((index.get_lca([0, 1], [2, 33]) == self.index.get_lca([0, 1], [2, 33])).all())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            DendrogramIndex(np.zeros((0, 4)))
+        with self.assertRaises(ValueError):
+            DendrogramIndex(np.array([[4, 2, 1, 3], [0, 1, 0, 2]]))
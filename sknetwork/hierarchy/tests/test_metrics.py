@@ -10,6 +10,7 @@ import unittest
 from sknetwork.data.test_graphs import *
 from sknetwork.data import cyclic_graph
 from sknetwork.hierarchy import Paris, LouvainIteration, dasgupta_cost, dasgupta_score, tree_sampling_divergence
+from sknetwork.hierarchy.metrics import get_sampling_distributions
 
 
 # noinspection PyMissingOrEmptyDocstring
@@ -60,3 +61,33 @@ class TestMetrics(unittest.TestCase):
         self.assertAlmostEqual(dasgupta_score(adjacency, dendrogram, weights='degree'), 0.573, 2)
         self.assertAlmostEqual(tree_sampling_divergence(adjacency, dendrogram, weights='uniform'), 0.271, 2)
         self.assertAlmostEqual(tree_sampling_divergence(adjacency, dendrogram, normalized=False), 0.367, 2)
+
+    def test_sampling_distributions(self):
+        adjacency = test_digraph()
+        n = adjacency.shape[0]
+        dendrogram = self.paris.fit_transform(adjacency)
+        edge_sampling, node_sampling, cluster_weight = get_sampling_distributions(adjacency, dendrogram, 'degree')
+        self.assertAlmostEqual(edge_sampling.sum(), 1)
+        self.assertAlmostEqual(node_sampling.sum(), 1)
+        # edges assigned to the lowest common ancestor of their endpoints
+        clusters = {i: {i} for i in range(n)}
+        sym_adjacency = (adjacency + adjacency.T).toarray()
+        for t, (i, j) in enumerate(dendrogram[:, :2].astype(int)):
+            cluster_i, cluster_j = clusters.pop(i), clusters.pop(j)
+            weight = 2 * sym_adjacency[np.ix_(list(cluster_i), list(cluster_j))].sum()
+            weight += sum(sym_adjacency[node, node] for node in {i, j} if node < n)
+            self.assertAlmostEqual(edge_sampling[t], weight / sym_adjacency.sum())
+            clusters[n + t] = cluster_i | cluster_j
+        # rows not sorted by index of children
+        index = np.arange(n - 1)
+        index[-2:] = index[-2:][::-1]
+        dendrogram_shuffled = dendrogram[index]
+        dendrogram_shuffled[:, :2] = np.where(dendrogram_shuffled[:, :2] >= n,
+                                              n + index.argsort()[np.maximum(dendrogram_shuffled[:, :2] - n, 0)
+                                                                  .astype(int)],
+                                              dendrogram_shuffled[:, :2])
+        edge_sampling_, node_sampling_, _ = get_sampling_distributions(adjacency, dendrogram_shuffled, 'degree')
+        self.assertTrue(np.allclose(edge_sampling_, edge_sampling[index]))
+        self.assertTrue(np.allclose(node_sampling_, node_sampling[index]))
+        with self.assertRaises(ValueError):
+            get_sampling_distributions(adjacency, dendrogram[:-1], 'degree')
@@ -8,8 +8,12 @@ Created on March 2019
 
 import unittest
 
+import numpy as np
+
 from sknetwork.data import karate_club
-from sknetwork.hierarchy import Paris, cut_straight, cut_balanced, aggregate_dendrogram
+from sknetwork.hierarchy import Paris, cut_straight, cut_straight_batch, cut_balanced, aggregate_dendrogram
+from sknetwork.hierarchy.postprocess import get_dendrogram_from_levels, reorder_dendrogram
+from sknetwork.utils.check import check_dendrogram
 
 
 # noinspection PyMissingOrEmptyDocstring
@@ -43,6 +47,26 @@ class TestCuts(unittest.TestCase):
         labels = cut_balanced(self.dendrogram, max_cluster_size=10)
         self.assertEqual(len(set(labels)), 5)
 
+    def test_batch(self):
+        n = self.dendrogram.shape[0] + 1
+        n_clusters = [2, 5, 3, n]
+        thresholds = [0.5, 0, 10]
+        for sort_clusters in [True, False]:
+            labels = cut_straight_batch(self.dendrogram, n_clusters, thresholds, sort_clusters)
+            self.assertTupleEqual(labels.shape, (7, n))
+            for labels_, n_clusters_ in zip(labels, n_clusters):
+                labels_ref = cut_straight(self.dendrogram, n_clusters_, sort_clusters=sort_clusters)
+                self.assertTrue(np.array_equal(labels_, labels_ref))
+            for labels_, threshold in zip(labels[4:], thresholds):
+                labels_ref = cut_straight(self.dendrogram, threshold=threshold, sort_clusters=sort_clusters)
+                self.assertTrue(np.array_equal(labels_, labels_ref))
+        labels = cut_straight_batch(self.dendrogram, n_clusters=[1])
+        self.assertEqual(len(set(labels[0])), 1)
+        with self.assertRaises(ValueError):
+            cut_straight_batch(self.dendrogram)
+        with self.assertRaises(ValueError):
+            cut_straight_batch(self.dendrogram, n_clusters=[0])
+
     def test_aggregation(self):
         aggregated = aggregate_dendrogram(self.dendrogram, n_clusters=3)
         self.assertEqual(len(aggregated), 2)
@@ -51,3 +75,37 @@ class TestCuts(unittest.TestCase):
         self.assertEqual(len(aggregated), 2)
         self.assertEqual(len(counts), 3)
 
+    def test_levels(self):
+        # single cluster at the top, cluster of a single node, cluster with a single child
+        labels = np.array([[0, 0, 0, 0, 0, 0], [0, 0, 0, 1, 1, 2], [0, 1, 1, 2, 3, 4]])
+        dendrogram = get_dendrogram_from_levels(labels)
+        check_dendrogram(dendrogram)
+        self.assertTupleEqual(dendrogram.shape, (5, 4))
+        self.assertEqual(dendrogram[-1, 3], 6)
+        self.assertEqual(len(set(cut_straight(dendrogram, threshold=1.5))), 3)
+        self.assertEqual(len(set(cut_straight(dendrogram, threshold=0.5))), 5)
+        sizes = {i: 1 for i in range(6)}
+        for t, (i, j, _, size) in enumerate(dendrogram):
+            sizes[6 + t] = sizes[int(i)] + sizes[int(j)]
+            self.assertEqual(size, sizes[6 + t])
+        dendrogram = get_dendrogram_from_levels(np.zeros((0, 3)))
+        self.assertTrue(np.array_equal(dendrogram, np.array([[2, 1, 0, 2], [3, 0, 0, 3]])))
+
+    def test_levels_sizes(self):
+        # root with 3 children of size 2 (the recursive conversion gave size 5 to the root)
+        labels = np.array([[0, 0, 1, 1, 2, 2]])
+        dendrogram = get_dendrogram_from_levels(labels)
+        check_dendrogram(dendrogram)
+        self.assertListEqual(list(dendrogram[:, 3]), [2, 2, 2, 4, 6])
+
+    def test_reorder_inversion(self):
+        # merge 4 lower than its child 3
+        dendrogram = reorder_dendrogram(np.array([[0, 1, 1, 2], [2, 3, 3, 2], [4, 5, 2, 4]]))
+        self.assertListEqual(list(dendrogram[:, 3]), [2, 2, 4])
+        # chain of merges at decreasing heights, plus an independent merge in between
+        dendrogram = np.array([[0, 1, 5, 2], [6, 2, 4, 3], [7, 3, 3, 4], [4, 5, 3.5, 2], [8, 9, 1, 6]])
+        dendrogram = reorder_dendrogram(dendrogram)
+        self.assertListEqual(list(dendrogram[:, 3]), [2, 2, 3, 4, 6])
+        n = dendrogram.shape[0] + 1
+        for t, (i, j) in enumerate(dendrogram[:, :2].astype(int)):
+            self.assertTrue(i < n + t and j < n + t)
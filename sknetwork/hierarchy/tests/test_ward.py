@@ -17,7 +17,8 @@ class TestWard(unittest.TestCase):
     def test_options(self):
         ward = Ward()
         ward_options = Ward(embedding_method=Spectral(3), co_cluster=True)
-        for algo in [ward, ward_options]:
+        ward_knn = Ward(n_neighbors=3)
+        for algo in [ward, ward_options, ward_knn]:
             for input_matrix in [test_graph(), test_digraph(), test_bigraph()]:
                 dendrogram = algo.fit_predict(input_matrix)
                 self.assertEqual(dendrogram.shape, (input_matrix.shape[0] - 1, 4))
@@ -6,7 +6,7 @@ Created on October 2019
 @author: Thomas Bonald <bonald@enst.fr>
 """
 
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 from scipy import sparse
@@ -27,6 +27,10 @@ class Ward(BaseHierarchy):
         Embedding method (default = Spectral embedding in dimension 10).
     co_cluster :
         If ``True``, co-cluster rows and columns, considered as different nodes (default = ``False``).
+    n_neighbors :
+        If not ``None``, merges are restricted to clusters connected in the graph of the ``n_neighbors`` nearest
+        neighbors of each node in the embedding space (linear memory, for large graphs).
+        See :class:`sknetwork.utils.WardDense`.
 
     Attributes
     ----------
@@ -57,10 +61,12 @@ class Ward(BaseHierarchy):
     * Murtagh, F., & Contreras, P. (2012). Algorithms for hierarchical clustering: an overview.
       Wiley Interdisciplinary Reviews: Data Mining and Knowledge Discovery.
     """
-    def __init__(self, embedding_method: BaseEmbedding = Spectral(10), co_cluster: bool = False):
+    def __init__(self, embedding_method: BaseEmbedding = Spectral(10), co_cluster: bool = False,
+                 n_neighbors: Optional[int] = None):
         super(Ward, self).__init__()
         self.embedding_method = embedding_method
         self.co_cluster = co_cluster
+        self.n_neighbors = n_neighbors
         self.bipartite = None
 
     def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray]) -> 'Ward':
@@ -84,7 +90,7 @@ class Ward(BaseHierarchy):
         embedding, self.bipartite = get_embedding(input_matrix, self.embedding_method, self.co_cluster)
 
         # clustering
-        ward = WardDense()
+        ward = WardDense(n_neighbors=self.n_neighbors)
         self.dendrogram_ = ward.fit_transform(embedding)
 
         # output
@@ -5,5 +5,6 @@ from sknetwork.linalg.laplacian import get_laplacian
 from sknetwork.linalg.normalization import diag_pinv, normalize
 from sknetwork.linalg.operators import Regularizer, Laplacian, Normalizer, CoNeighbor
 from sknetwork.linalg.polynome import Polynome
+from sknetwork.linalg.ppr_solver import TransitionOperator
 from sknetwork.linalg.sparse_lowrank import SparseLR
 from sknetwork.linalg.svd_solver import SVDSolver, LanczosSVD
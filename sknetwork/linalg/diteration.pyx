@@ -8,42 +8,61 @@ Created on Apr 2020
 """
 cimport cython
 from cython.parallel import prange
+from libc.math cimport fabs
+
+ctypedef fused int_or_long:
+    int
+    long
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def diffusion(int[:] indptr, int[:] indices, float[:] data, float[:] scores, float[:] fluid,
-              float damping_factor, int n_iter, float tol):
-    """One loop of fluid diffusion."""
-    cdef int n = fluid.shape[0]
-    cdef int i
-    cdef int j
-    cdef int j1
-    cdef int j2
-    cdef int jj
-    cdef float sent
-    cdef float tmp
-    cdef float removed
-    cdef float restart_prob = 1 - damping_factor
-    cdef float residu = restart_prob
+def diffusion(int_or_long[:] indptr, int_or_long[:] indices, double[:] data, double[:] scores, double[:] restart,
+              double damping_factor, int n_iter, double tol, int n_threads):
+    """Asynchronous diffusion (Gauss-Seidel iterations), in parallel.
+
+    Nodes are split into blocks of consecutive nodes, one per thread. Each node pulls the scores of its in-neighbors
+    and updates its own score in place, so that no lock is needed. The scores of other blocks may be read before or
+    after their update in the same iteration (the result then depends on the number of threads, within tolerance).
+
+    Parameters
+    ----------
+    indptr, indices, data :
+        CSR arrays of the transposed transition matrix (in-neighbors of each node).
+    scores :
+        Initial scores. Modified in place.
+    restart :
+        Scaled restart probabilities.
+    damping_factor :
+        Probability to continue the random walk.
+    n_iter :
+        Maximum number of iterations.
+    tol :
+        Tolerance on the variation of the scores (norm 1) over one iteration.
+    n_threads :
+        Number of threads.
+
+    Returns
+    -------
+    n_iter :
+        Number of iterations done.
+    """
+    cdef int_or_long n = scores.shape[0]
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int k
+    cdef double value
+    cdef double variation = tol
 
     for k in range(n_iter):
-        for i in prange(n, nogil=True, schedule='guided'):
-            sent = fluid[i]
-            if sent > 0:
-                scores[i] += sent
-                fluid[i] = 0
-                j1 = indptr[i]
-                j2 = indptr[i+1]
-                tmp = sent * damping_factor
-                if j2 != j1:
-                    for jj in range(j1, j2):
-                        j = indices[jj]
-                        fluid[j] += tmp * data[jj]
-                    removed = sent * restart_prob
-                else:
-                    removed = sent
-                residu -= removed
-        if residu < tol * restart_prob:
-            return
-    return
+        variation = 0
+        for i in prange(n, nogil=True, num_threads=n_threads, schedule='static'):
+            value = 0
+            for j in range(indptr[i], indptr[i + 1]):
+                value = value + data[j] * scores[indices[j]]
+            value = restart[i] + damping_factor * value
+            variation += fabs(value - scores[i])
+            scores[i] = value
+        if variation < tol:
+            return k + 1
+    return n_iter
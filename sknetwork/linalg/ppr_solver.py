@@ -4,16 +4,68 @@
 Created on Apr 2020
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 """
-from typing import Union
+from typing import Optional, Tuple, Union
 
 import numpy as np
 from scipy import sparse
 from scipy.sparse.linalg import eigs, LinearOperator, bicgstab
 
 from sknetwork.linalg.diteration import diffusion
-from sknetwork.linalg.push import push_pagerank
+from sknetwork.linalg.push import push_pagerank, push_pagerank_local, push_pagerank_update
 from sknetwork.linalg.normalization import normalize
 from sknetwork.linalg.polynome import Polynome
+from sknetwork.utils.check import check_n_threads
+
+
+class TransitionOperator:
+    """Transition matrix of the random walk on a graph, prepared once for several PageRank computations
+    (e.g., with different seeds or damping factors).
+
+    The normalized adjacency and its transpose are computed on first use only, then stored.
+
+    Parameters
+    ----------
+    adjacency :
+        Adjacency matrix of the graph as a CSR or a LinearOperator.
+
+    Attributes
+    ----------
+    adjacency : sparse.csr_matrix or LinearOperator
+        Adjacency matrix of the graph.
+    out_degrees : np.ndarray
+        Out-degrees of nodes (weighted).
+
+    Example
+    -------
+    >>> from sknetwork.data import house
+    >>> operator = TransitionOperator(house())
+    >>> scores = get_pagerank(operator, np.array([1, 0, 0, 0, 0]), damping_factor=0.85, n_iter=10)
+    >>> np.round(scores, 2)
+    array([0.29, 0.24, 0.12, 0.12, 0.24])
+    """
+    def __init__(self, adjacency: Union[sparse.csr_matrix, LinearOperator]):
+        self.adjacency = adjacency
+        self.shape = adjacency.shape
+        self.out_degrees = adjacency.dot(np.ones(adjacency.shape[1]))
+        self._normalized = None
+        self._transition = None
+
+    @property
+    def normalized(self) -> Union[sparse.csr_matrix, LinearOperator]:
+        """Transition matrix (adjacency normalized by out-degrees)."""
+        if self._normalized is None:
+            self._normalized = normalize(self.adjacency)
+        return self._normalized
+
+    @property
+    def transition(self) -> Union[sparse.csr_matrix, LinearOperator]:
+        """Transposed transition matrix."""
+        if self._transition is None:
+            if hasattr(self.adjacency, 'left_sparse_dot'):
+                self._transition = self.normalized.T
+            else:
+                self._transition = self.normalized.T.tocsr()
+        return self._transition
 
 
 class RandomSurferOperator(LinearOperator):
@@ -22,50 +74,68 @@ class RandomSurferOperator(LinearOperator):
     Parameters
     ----------
     adjacency :
-        Adjacency matrix of the graph as a CSR or a LinearOperator.
+        Adjacency matrix of the graph as a CSR or a LinearOperator, or transition operator of the graph.
     damping_factor : float
         Probability to continue the random walk.
     seeds :
-        Probability vector for seeds.
+        Probability vector for seeds, or matrix of probability vectors (one per column).
 
     Attributes
     ----------
-    a : sparse.csr_matrix
-        Scaled transposed transition matrix.
+    operator : :class:`TransitionOperator`
+        Transition operator of the graph.
+    restart : np.ndarray
+        Restart probability from each node (1 for nodes without out-neighbors).
+    seeds : np.ndarray
+        Restart distribution (or matrix, one column per seed vector).
     b : np.ndarray
-        Scaled restart probability vector.
+        Scaled restart probability vector (or matrix, one column per seed vector).
     """
 
-    def __init__(self, adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.ndarray, damping_factor):
+    def __init__(self, adjacency: Union[sparse.csr_matrix, LinearOperator, TransitionOperator], seeds: np.ndarray,
+                 damping_factor):
         super(RandomSurferOperator, self).__init__(shape=adjacency.shape, dtype=float)
 
+        if not isinstance(adjacency, TransitionOperator):
+            adjacency = TransitionOperator(adjacency)
+        self.operator = adjacency
+        self.damping_factor = damping_factor
+
         n = adjacency.shape[0]
-        out_degrees = adjacency.dot(np.ones(n)).astype(bool)
+        # the mass of nodes without out-neighbors goes back to the seeds
+        self.restart = np.ones(n) - damping_factor * adjacency.out_degrees.astype(bool)
+        self.seeds = seeds
+        self.b = (1 - damping_factor) * seeds
 
-        if hasattr(adjacency, 'left_sparse_dot'):
-            self.a = damping_factor * normalize(adjacency).T
-        else:
-            self.a = (damping_factor * normalize(adjacency)).T.tocsr()
-        self.b = (np.ones(n) - damping_factor * out_degrees) * seeds
+    @property
+    def a(self) -> Union[sparse.csr_matrix, LinearOperator]:
+        """Scaled transposed transition matrix."""
+        return self.damping_factor * self.operator.transition
 
     def _matvec(self, x: np.ndarray):
-        return self.a.dot(x) + self.b * x.sum()
+        return self.damping_factor * self.operator.transition.dot(x) + self.seeds * self.restart.dot(x)
 
 
-def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.ndarray, damping_factor: float,
-                 n_iter: int, tol: float = 1e-6, solver: str = 'piteration') -> np.ndarray:
+def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator, TransitionOperator], seeds: np.ndarray,
+                 damping_factor: float, n_iter: int, tol: float = 1e-6, solver: str = 'piteration',
+                 scores_init: Optional[np.ndarray] = None, n_jobs: Optional[int] = None) -> np.ndarray:
     """Solve the Pagerank problem. Formally,
 
     :math:`x = \\alpha Px + (1-\\alpha)y`,
 
     where :math:`P = (D^{-1}A)^T` is the transition matrix and :math:`y` is the personalization probability vector.
+    The random walk restarts from the seeds at nodes without out-neighbors.
 
     Parameters
     ----------
     adjacency : sparse.csr_matrix
-        Adjacency matrix of the graph.
+        Adjacency matrix of the graph, or transition operator of the graph (see :class:`TransitionOperator`),
+        to be reused over several calls.
     seeds : np.ndarray
-        Personalization array. Must be a valid probability vector.
+        Personalization array. Must be a valid probability vector,
+        or a matrix of shape (n, k) whose columns are valid probability vectors.
+        For a matrix, the solver ``'piteration'`` processes all columns at once (one sparse matrix product per
+        iteration), each column being stopped at convergence; other solvers process columns one at a time.
     damping_factor : float
         Probability to continue the random walk.
     n_iter : int
@@ -74,11 +144,18 @@ def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.
         Tolerance for the convergence of some solvers such as ``'bicgstab'`` or ``'lanczos'`` or ``'push'``.
     solver : :obj:`str`
         Which solver to use: ``'piteration'``, ``'diteration'``, ``'bicgstab'``, ``'lanczos'``, ``̀'RH'``, ``'push'``.
+    scores_init : np.ndarray
+        Initial scores (warm start), e.g., the scores of a previous run on a slightly different graph.
+        Same shape as the seeds. Used by the solvers ``'piteration'``, ``'diteration'``, ``'bicgstab'`` and
+        ``'lanczos'``; if ``None`` (default), these solvers start from the scaled restart distribution.
+    n_jobs : int
+        Number of threads used by the solver ``'diteration'`` (-1 means the maximum number).
+        If ``None`` (default), a single thread is used.
 
     Returns
     -------
     pagerank : np.ndarray
-        Probability vector.
+        Probability vector (or matrix of probability vectors, one per column of the seeds).
 
     Examples
     --------
@@ -88,7 +165,14 @@ def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.
     >>> scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=10)
     >>> np.round(scores, 2)
     array([0.29, 0.24, 0.12, 0.12, 0.24])
-
+    >>> seeds = np.array([[1, 0], [0, 0], [0, 0], [0, 0], [0, 1]])
+    >>> scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=10)
+    >>> np.round(scores, 2)
+    array([[0.29, 0.16],
+           [0.24, 0.21],
+           [0.12, 0.13],
+           [0.12, 0.15],
+           [0.24, 0.35]])
 
     References
     ----------
@@ -108,28 +192,39 @@ def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.
       <https://www.cs.utexas.edu/users/inderjit/public_papers/scalable_pagerank_europar15.pdf>
     """
     n = adjacency.shape[0]
+    if isinstance(adjacency, TransitionOperator):
+        operator = adjacency
+    else:
+        operator = TransitionOperator(adjacency)
+
+    if seeds.ndim == 2 and solver != 'piteration':
+        return np.column_stack([get_pagerank(operator, seeds[:, i], damping_factor, n_iter, tol, solver,
+                                             None if scores_init is None else scores_init[:, i], n_jobs)
+                                for i in range(seeds.shape[1])])
 
     if solver == 'diteration':
-        if not isinstance(adjacency, sparse.csr_matrix):
+        if not isinstance(operator.adjacency, sparse.csr_matrix):
             raise ValueError('D-iteration is not compatible with linear operators.')
-        adjacency = normalize(adjacency, p=1)
-        indptr = adjacency.indptr.astype(np.int32)
-        indices = adjacency.indices.astype(np.int32)
-        data = adjacency.data.astype(np.float32)
-        damping_factor = np.float32(damping_factor)
-        n_iter = np.int32(n_iter)
-        tol = np.float32(tol)
-
-        scores = np.zeros(n, dtype=np.float32)
-        fluid = (1 - damping_factor) * seeds.astype(np.float32)
-        diffusion(indptr, indices, data, scores, fluid, damping_factor, n_iter, tol)
+        # in-neighbors, no copy (unless the arrays are not of the right types)
+        transition = operator.transition
+        indices = transition.indices
+        indptr = transition.indptr.astype(indices.dtype, copy=False)
+        data = transition.data.astype(float, copy=False)
+        restart = (1 - damping_factor) * seeds.astype(float)
+        if scores_init is None:
+            scores = restart.copy()
+        else:
+            scores = np.array(scores_init, dtype=float)
+        diffusion(indptr, indices, data, scores, restart, float(damping_factor), int(n_iter), float(tol),
+                  check_n_threads(n_jobs))
 
     elif solver == 'push':
-        n = adjacency.shape[0]
+        adjacency = operator.adjacency
         damping_factor = np.float32(damping_factor)
         tol = np.float32(tol)
-        degrees = adjacency.dot(np.ones(n)).astype(np.int32)
-        rev_adjacency = adjacency.transpose().tocsr()
+        degrees = operator.out_degrees.astype(np.int32)
+        # same sparsity pattern as the transposed adjacency
+        rev_adjacency = operator.transition
 
         indptr = adjacency.indptr.astype(np.int32)
         indices = adjacency.indices.astype(np.int32)
@@ -143,18 +238,43 @@ def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.
 
     elif solver == 'RH':
         coeffs = np.ones(n_iter + 1)
-        polynome = Polynome(damping_factor * normalize(adjacency, p=1).T.tocsr(), coeffs)
+        polynome = Polynome(damping_factor * operator.transition, coeffs)
         scores = polynome.dot(seeds)
 
     else:
-        rso = RandomSurferOperator(adjacency, seeds, damping_factor)
-        v0 = rso.b
+        rso = RandomSurferOperator(operator, seeds, damping_factor)
+        if scores_init is None:
+            v0 = rso.b
+        else:
+            if scores_init.shape != seeds.shape:
+                raise ValueError('The initial scores must have the same shape as the seeds.')
+            v0 = scores_init / scores_init.sum(axis=0)
         if solver == 'bicgstab':
             scores, info = bicgstab(sparse.eye(n, format='csr') - rso.a, rso.b, atol=tol, x0=v0)
         elif solver == 'lanczos':
             # noinspection PyTypeChecker
             _, scores = sparse.linalg.eigs(rso, k=1, tol=tol, v0=v0)
             scores = abs(scores.flatten().real)
+        elif solver == 'piteration' and seeds.ndim == 2:
+            # block of vectors, converged columns are no longer updated
+            scores = v0.copy()
+            active = np.arange(scores.shape[1])
+            seeds_active = seeds
+            scores_active = v0
+            for i in range(n_iter):
+                scores_ = operator.transition.dot(scores_active)
+                scores_ *= damping_factor
+                scores_ += seeds_active * rso.restart.dot(scores_active)
+                scores_ /= scores_.sum(axis=0)
+                converged = np.abs(scores_active - scores_).sum(axis=0) < tol
+                if np.any(converged):
+                    scores[:, active[converged]] = scores_active[:, converged]
+                    active, seeds_active = active[~converged], seeds_active[:, ~converged]
+                    scores_ = scores_[:, ~converged]
+                scores_active = scores_
+                if not len(active):
+                    break
+            scores[:, active] = scores_active
         elif solver == 'piteration':
             scores = v0
             for i in range(n_iter):
@@ -167,4 +287,191 @@ def get_pagerank(adjacency: Union[sparse.csr_matrix, LinearOperator], seeds: np.
         else:
             raise ValueError('Unknown solver.')
 
-    return scores / scores.sum()
+    return scores / scores.sum(axis=0)
+
+
+def get_pagerank_local(adjacency: sparse.csr_matrix, seeds: Union[dict, list, np.ndarray],
+                       damping_factor: float = 0.85, tol: float = 1e-4, n_top: Optional[int] = None) \
+        -> Union[sparse.csr_matrix, Tuple[np.ndarray, np.ndarray]]:
+    """Solve the Personalized Pagerank problem locally, by forward push from the seeds.
+
+    Only the neighborhood of the seeds reached by the push operations is visited: the running time and the memory
+    depend on the tolerance, not on the size of the graph. The approximation error of the score of each node is
+    at most ``tol`` times its out-degree.
+
+    Parameters
+    ----------
+    adjacency : sparse.csr_matrix
+        Adjacency matrix of the graph.
+    seeds :
+        Seed nodes, as a list of nodes (uniform restart distribution) or a dict (node: weight).
+    damping_factor : float
+        Probability to continue the random walk.
+    tol : float
+        Tolerance (residual per unit of out-degree). Smaller values give more precise scores on more nodes.
+    n_top : int
+        If not ``None``, return only the nodes of highest scores with their scores, in decreasing order.
+
+    Returns
+    -------
+    pagerank : sparse.csr_matrix
+        Scores as a sparse vector of shape (1, n).
+        If ``n_top`` is not ``None``, return the top nodes and their scores instead.
+
+    Examples
+    --------
+    >>> from sknetwork.data import house
+    >>> adjacency = house()
+    >>> scores = get_pagerank_local(adjacency, [0], damping_factor=0.85, tol=1e-6)
+    >>> np.round(scores.toarray(), 2)
+    array([[0.29, 0.24, 0.12, 0.12, 0.24]])
+    >>> nodes, scores = get_pagerank_local(adjacency, [0], tol=1e-6, n_top=1)
+    >>> nodes
+    array([0], dtype=int32)
+
+    References
+    ----------
+    Andersen, R., Chung, F., & Lang, K. (2006). `Local graph partitioning using PageRank vectors.
+    <https://www.math.ucsd.edu/~fan/wp/localpartition.pdf>`_
+    In IEEE Symposium on Foundations of Computer Science (FOCS).
+    """
+    if tol <= 0:
+        raise ValueError('The tolerance must be positive.')
+    if isinstance(seeds, dict):
+        nodes, probs = np.array(list(seeds.keys())), np.array(list(seeds.values()), dtype=float)
+    else:
+        nodes = np.array(seeds)
+        probs = np.ones(len(nodes))
+    if not len(nodes) or np.any(probs < 0) or probs.sum() <= 0:
+        raise ValueError('At least one seed must have a positive value.')
+    n = adjacency.shape[0]
+    if np.any(nodes < 0) or np.any(nodes >= n):
+        raise ValueError('Seeds must be nodes of the graph.')
+    probs /= probs.sum()
+
+    # no copy of the graph (unless the arrays are not of the right types)
+    indices = adjacency.indices
+    indptr = adjacency.indptr.astype(indices.dtype, copy=False)
+    data = adjacency.data
+    if data.dtype == bool:
+        data = data.view(np.uint8)
+    elif data.dtype not in [np.uint8, np.int32, np.int64, np.float32, np.float64]:
+        data = data.astype(float)
+    nodes, scores = push_pagerank_local(indptr, indices, data, nodes.astype(indices.dtype), probs,
+                                        float(damping_factor), float(tol))
+
+    if n_top is not None:
+        index = np.argsort(-scores, kind='stable')[:n_top]
+        return nodes[index], scores[index]
+    index = np.argsort(nodes)
+    return sparse.csr_matrix((scores[index], nodes[index], [0, len(nodes)]), shape=(1, n))
+
+
+def update_pagerank(adjacency: sparse.csr_matrix, scores: np.ndarray, edges_added: Optional[np.ndarray] = None,
+                    edges_removed: Optional[np.ndarray] = None, seeds: Optional[np.ndarray] = None,
+                    damping_factor: float = 0.85, tol: float = 1e-6) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Update the Pagerank scores after a batch of edge insertions and deletions.
+
+    The previous scores are corrected by forward push of the residuals created by the new edges, starting from the
+    nodes whose out-edges have changed. Only the nodes reached by the push operations are visited: for a few edges,
+    this is much faster than a new computation of the scores.
+
+    As for the default solver of :func:`get_pagerank`, the mass of nodes without out-neighbors is sent back to the
+    seeds.
+
+    Parameters
+    ----------
+    adjacency : sparse.csr_matrix
+        Adjacency matrix of the graph, before the update.
+    scores : np.ndarray
+        Pagerank scores of the graph, before the update (probability vector).
+    edges_added : np.ndarray
+        Edges to add, as an array of shape (k, 2) (source, target). Each edge has weight 1.
+        For undirected graphs, both directions must be given.
+    edges_removed : np.ndarray
+        Edges to remove, as an array of shape (k, 2) (source, target).
+        For undirected graphs, both directions must be given.
+    seeds : np.ndarray
+        Personalization probability vector of the previous scores. If ``None``, the uniform distribution is used.
+    damping_factor : float
+        Probability to continue the random walk (same as for the previous scores).
+    tol : float
+        Tolerance (residual per unit of out-degree).
+
+    Returns
+    -------
+    adjacency : sparse.csr_matrix
+        Adjacency matrix of the graph, after the update.
+    scores : np.ndarray
+        Pagerank scores of the graph, after the update.
+
+    Example
+    -------
+    >>> from sknetwork.data import house
+    >>> adjacency = house()
+    >>> seeds = np.array([1, 0, 0, 0, 0])
+    >>> scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-9)
+    >>> adjacency, scores = update_pagerank(adjacency, scores, edges_removed=[(0, 1), (1, 0)], seeds=seeds,
+    ...                                     tol=1e-9)
+    >>> scores_ = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-9)
+    >>> np.allclose(scores, scores_, atol=1e-6)
+    True
+
+    References
+    ----------
+    Zhang, H., Lofgren, P., & Goel, A. (2016). `Approximate personalized pagerank on dynamic graphs.
+    <https://arxiv.org/pdf/1603.07796.pdf>`_
+    In ACM SIGKDD International Conference on Knowledge Discovery and Data Mining.
+    """
+    if tol <= 0:
+        raise ValueError('The tolerance must be positive.')
+    n = adjacency.shape[0]
+    if seeds is None:
+        seeds_nodes = np.arange(n)
+        seeds_probs = np.ones(n) / n
+    else:
+        seeds = np.array(seeds, dtype=float)
+        if seeds.shape != (n,) or np.any(seeds < 0) or seeds.sum() <= 0:
+            raise ValueError('The seeds must be a probability vector of the nodes.')
+        seeds_nodes = np.flatnonzero(seeds)
+        seeds_probs = seeds[seeds_nodes] / seeds.sum()
+
+    # changes of weights (only on the rows of the sources)
+    delta = sparse.csr_matrix(adjacency.shape)
+    sources = []
+    for edges, added in [(edges_added, True), (edges_removed, False)]:
+        if edges is None or not len(edges):
+            continue
+        edges = np.unique(np.array(edges).reshape(-1, 2), axis=0)
+        if np.any(edges < 0) or np.any(edges >= n):
+            raise ValueError('Edges must link nodes of the graph.')
+        if added:
+            weights = np.ones(len(edges))
+        else:
+            weights = -np.asarray(adjacency[edges[:, 0], edges[:, 1]] + delta[edges[:, 0], edges[:, 1]]).ravel()
+        delta = delta + sparse.csr_matrix((weights, (edges[:, 0], edges[:, 1])), shape=adjacency.shape)
+        sources.append(edges[:, 0])
+    adjacency_new = (adjacency + delta).tocsr()
+    adjacency_new.eliminate_zeros()
+    scores = np.array(scores, dtype=float)
+    if not sources:
+        return adjacency_new, scores
+    sources = np.unique(np.concatenate(sources))
+
+    # residuals due to the new transitions from the sources
+    # the transitions from nodes without out-neighbors are to the seeds
+    rows, rows_new = adjacency[sources], adjacency_new[sources]
+    transition_diff = normalize(rows_new) - normalize(rows)
+    residuals = sparse.csr_matrix(scores[sources]).dot(transition_diff)
+    dangling = np.asarray(rows.sum(axis=1)).ravel() == 0
+    dangling_new = np.asarray(rows_new.sum(axis=1)).ravel() == 0
+    mass_seeds = damping_factor * (scores[sources][dangling_new].sum() - scores[sources][dangling].sum())
+
+    indices = adjacency_new.indices
+    indptr = adjacency_new.indptr.astype(indices.dtype, copy=False)
+    data = adjacency_new.data.astype(float, copy=False)
+    push_pagerank_update(indptr, indices, data, scores,
+                         residuals.indices.astype(indices.dtype), damping_factor * residuals.data,
+                         seeds_nodes.astype(indices.dtype), seeds_probs, float(mass_seeds), float(damping_factor),
+                         float(tol))
+    return adjacency_new, scores / scores.sum()
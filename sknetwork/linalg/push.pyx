@@ -6,12 +6,26 @@
 Created on Mars 2021
 @author: Wenzhuo Zhao <wenzhuo.zhao@etu.sorbonne-universite.fr>
 """
+from libc.math cimport fabs
 from libcpp.queue cimport queue
+from libcpp.unordered_map cimport unordered_map
+from libcpp.vector cimport vector
 from cython.parallel cimport prange
 import numpy as np
 cimport numpy as cnp
 cimport cython
 
+ctypedef fused int_or_long:
+    int
+    long
+
+ctypedef fused value_type:
+    unsigned char
+    int
+    long
+    float
+    double
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -71,3 +85,184 @@ def push_pagerank(int n, cnp.ndarray[cnp.int32_t, ndim=1] degrees,
     norm = np.linalg.norm(scores, 1)
     scores /= norm
     return scores
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline double get_degree(int_or_long[:] indptr, value_type[:] data, int_or_long node,
+                              unordered_map[int_or_long, double]& degrees) noexcept nogil:
+    """Out-degree of a node (computed once)."""
+    cdef int_or_long j
+    cdef double degree = 0
+    if degrees.count(node):
+        return degrees[node]
+    for j in range(indptr[node], indptr[node + 1]):
+        degree += data[j]
+    degrees[node] = degree
+    return degree
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def push_pagerank_local(int_or_long[:] indptr, int_or_long[:] indices, value_type[:] data, int_or_long[:] seeds,
+                        double[:] seeds_probs, double damping_factor, double tol):
+    """Local push-based Personalized PageRank (forward push).
+
+    Only the nodes reached by the push operations are visited, so that the complexity does not depend on the size
+    of the graph. The residual of each node is pushed to its out-neighbors while it is at least ``tol`` times its
+    out-degree. The mass of nodes without out-neighbors is sent back to the seeds.
+
+    Parameters
+    ----------
+    indptr, indices, data :
+        CSR arrays of the adjacency matrix (used as such, without copy).
+    seeds, seeds_probs :
+        Seed nodes and their restart probabilities (summing to 1).
+    damping_factor :
+        Probability to continue the random walk.
+    tol :
+        Tolerance (residual per unit of out-degree).
+
+    Returns
+    -------
+    nodes : np.ndarray
+        Nodes with positive scores.
+    scores : np.ndarray
+        Scores of these nodes.
+    """
+    cdef int_or_long n_seeds = seeds.shape[0]
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long node
+    cdef int_or_long neighbor
+    cdef double mass
+    cdef double degree
+    cdef double residual
+    cdef unordered_map[int_or_long, double] scores
+    cdef unordered_map[int_or_long, double] residuals
+    cdef unordered_map[int_or_long, double] degrees
+    cdef queue[int_or_long] worklist
+    cdef vector[int_or_long] nodes
+    cdef vector[double] values
+
+    with nogil:
+        for i in range(n_seeds):
+            residuals[seeds[i]] += seeds_probs[i]
+        for i in range(n_seeds):
+            worklist.push(seeds[i])
+        while not worklist.empty():
+            node = worklist.front()
+            worklist.pop()
+            mass = residuals[node]
+            degree = get_degree(indptr, data, node, degrees)
+            if mass < tol * max(degree, 1.):
+                # already pushed
+                continue
+            residuals[node] = 0
+            scores[node] += (1 - damping_factor) * mass
+            if degree > 0:
+                mass *= damping_factor / degree
+                for j in range(indptr[node], indptr[node + 1]):
+                    neighbor = indices[j]
+                    residual = residuals[neighbor]
+                    residuals[neighbor] = residual + mass * data[j]
+                    degree = get_degree(indptr, data, neighbor, degrees)
+                    if residual < tol * max(degree, 1.) <= residuals[neighbor]:
+                        worklist.push(neighbor)
+            else:
+                # back to the seeds
+                mass *= damping_factor
+                for i in range(n_seeds):
+                    neighbor = seeds[i]
+                    residual = residuals[neighbor]
+                    residuals[neighbor] = residual + mass * seeds_probs[i]
+                    degree = get_degree(indptr, data, neighbor, degrees)
+                    if residual < tol * max(degree, 1.) <= residuals[neighbor]:
+                        worklist.push(neighbor)
+        for item in scores:
+            nodes.push_back(item.first)
+            values.push_back(item.second)
+
+    if int_or_long is int:
+        return np.array(nodes, dtype=np.int32), np.array(values)
+    return np.array(nodes, dtype=np.int64), np.array(values)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def push_pagerank_update(int_or_long[:] indptr, int_or_long[:] indices, double[:] data, double[:] scores,
+                         int_or_long[:] nodes, double[:] nodes_residuals, int_or_long[:] seeds, double[:] seeds_probs,
+                         double mass_seeds, double damping_factor, double tol):
+    """Correction of PageRank scores by forward push of (signed) residuals.
+
+    Scores are updated in place. Only the nodes whose residual is at least ``tol`` times their out-degree in
+    absolute value are processed, starting from the given nodes. The mass of nodes without out-neighbors is sent
+    back to the seeds, once no other node is left to process.
+
+    Parameters
+    ----------
+    indptr, indices, data :
+        CSR arrays of the adjacency matrix.
+    scores :
+        Scores of nodes.
+    nodes, nodes_residuals :
+        Nodes with non-zero residuals and their residuals.
+    seeds, seeds_probs :
+        Seed nodes and their restart probabilities (summing to 1).
+    mass_seeds :
+        Residual to be sent to the seeds.
+    damping_factor :
+        Probability to continue the random walk.
+    tol :
+        Tolerance (residual per unit of out-degree).
+    """
+    cdef int_or_long n_nodes = nodes.shape[0]
+    cdef int_or_long n_seeds = seeds.shape[0]
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long node
+    cdef int_or_long neighbor
+    cdef double mass
+    cdef double degree
+    cdef double residual
+    cdef unordered_map[int_or_long, double] residuals
+    cdef unordered_map[int_or_long, double] degrees
+    cdef queue[int_or_long] worklist
+
+    with nogil:
+        for i in range(n_nodes):
+            residuals[nodes[i]] += nodes_residuals[i]
+            worklist.push(nodes[i])
+        while True:
+            while not worklist.empty():
+                node = worklist.front()
+                worklist.pop()
+                mass = residuals[node]
+                degree = get_degree(indptr, data, node, degrees)
+                if fabs(mass) < tol * max(degree, 1.):
+                    # already pushed
+                    continue
+                residuals[node] = 0
+                scores[node] += mass
+                if degree > 0:
+                    mass *= damping_factor / degree
+                    for j in range(indptr[node], indptr[node + 1]):
+                        neighbor = indices[j]
+                        residual = residuals[neighbor]
+                        residuals[neighbor] = residual + mass * data[j]
+                        degree = get_degree(indptr, data, neighbor, degrees)
+                        if fabs(residual) < tol * max(degree, 1.) <= fabs(residuals[neighbor]):
+                            worklist.push(neighbor)
+                else:
+                    mass_seeds += damping_factor * mass
+            if fabs(mass_seeds) < tol:
+                break
+            # back to the seeds (at once)
+            for i in range(n_seeds):
+                neighbor = seeds[i]
+                residual = residuals[neighbor]
+                residuals[neighbor] = residual + mass_seeds * seeds_probs[i]
+                degree = get_degree(indptr, data, neighbor, degrees)
+                if fabs(residual) < tol * max(degree, 1.) <= fabs(residuals[neighbor]):
+                    worklist.push(neighbor)
+            mass_seeds = 0
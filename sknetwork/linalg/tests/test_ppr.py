@@ -5,11 +5,12 @@ import unittest
 
 import numpy as np
 
-from sknetwork.data import house, karate_club
+from sknetwork.data import erdos_renyi, house, karate_club
 from sknetwork.data.parse import from_edge_list
 from sknetwork.data.test_graphs import *
 from sknetwork.linalg.operators import Regularizer
-from sknetwork.linalg.ppr_solver import get_pagerank
+from sknetwork.linalg.ppr_solver import get_pagerank, get_pagerank_local, update_pagerank, TransitionOperator
+from sknetwork.ranking import PageRank
 from sknetwork.utils.check import is_proba_array
 
 
@@ -34,6 +35,20 @@ class TestPPR(unittest.TestCase):
         with self.assertRaises(ValueError):
             get_pagerank(adjacency, damping_factor=0.85, n_iter=100, tol=10, solver='diteration', seeds=seeds)
 
+    def test_diteration_parallel(self):
+        adjacency = test_digraph()
+        seeds = np.ones(adjacency.shape[0]) / adjacency.shape[0]
+        scores_ref = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-10, solver='RH')
+        for n_jobs in [None, 2, -1]:
+            scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-10, solver='diteration',
+                                  n_jobs=n_jobs)
+            self.assertAlmostEqual(np.linalg.norm(scores - scores_ref), 0.)
+        # int64 indices
+        adjacency.indptr = adjacency.indptr.astype(np.int64)
+        adjacency.indices = adjacency.indices.astype(np.int64)
+        scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-10, solver='diteration')
+        self.assertAlmostEqual(np.linalg.norm(scores - scores_ref), 0.)
+
     def test_push(self):
         # test convergence by tolerance
         adjacency = karate_club()
@@ -48,3 +63,125 @@ class TestPPR(unittest.TestCase):
         seeds = np.ones(adjacency.shape[0]) / adjacency.shape[0]
         pr = get_pagerank(adjacency, damping_factor=0.85, n_iter=100, tol=10, solver='piteration', seeds=seeds)
         self.assertTrue(is_proba_array(pr))
+
+    def test_dangling_nodes(self):
+        # all solvers send the mass of nodes without out-neighbors back to the seeds
+        adjacency = test_digraph()
+        seeds = np.ones(adjacency.shape[0]) / adjacency.shape[0]
+        scores_ref = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-10, solver='RH')
+        for solver in ['piteration', 'diteration', 'lanczos', 'bicgstab']:
+            scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=200, tol=1e-10, solver=solver)
+            self.assertAlmostEqual(np.linalg.norm(scores - scores_ref), 0., places=6)
+
+    def test_seeds_matrix(self):
+        adjacency = karate_club()
+        seeds = np.eye(adjacency.shape[0])[:, :5]
+        for tol in [0, 1e-3]:
+            scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=30, tol=tol)
+            for i in range(seeds.shape[1]):
+                scores_ = get_pagerank(adjacency, seeds[:, i], damping_factor=0.85, n_iter=30, tol=tol)
+                self.assertAlmostEqual(np.linalg.norm(scores[:, i] - scores_), 0.)
+
+    def test_local(self):
+        for adjacency in [karate_club(), test_digraph(), from_edge_list([(0, 1)])]:
+            n = adjacency.shape[0]
+            seeds = np.zeros(n)
+            seeds[[0, 1]] = [1, 3]
+            scores = get_pagerank(adjacency, seeds / 4, damping_factor=0.85, n_iter=0, tol=1e-10, solver='bicgstab')
+            scores_local = get_pagerank_local(adjacency, {0: 1, 1: 3}, damping_factor=0.85, tol=1e-8)
+            self.assertEqual(scores_local.shape, (1, n))
+            self.assertAlmostEqual(np.abs(scores - scores_local.toarray().ravel()).max(), 0, places=5)
+        adjacency = karate_club()
+        nodes, scores = get_pagerank_local(adjacency, [0, 33], tol=1e-3, n_top=3)
+        self.assertEqual(len(nodes), 3)
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+        with self.assertRaises(ValueError):
+            get_pagerank_local(adjacency, [0], tol=0)
+        with self.assertRaises(ValueError):
+            get_pagerank_local(adjacency, [])
+        with self.assertRaises(ValueError):
+            get_pagerank_local(adjacency, [100])
+
+    def test_local_types(self):
+        adjacency = test_digraph().astype(bool).astype(float)
+        scores = get_pagerank_local(adjacency, [0, 1], tol=1e-8).toarray()
+        for dtype in [bool, np.int32, np.int64, np.float32, np.int16]:
+            scores_ = get_pagerank_local(adjacency.astype(dtype), [0, 1], tol=1e-8).toarray()
+            self.assertAlmostEqual(np.abs(scores - scores_).max(), 0, places=6)
+        # 64-bit indices
+        adjacency.indptr = adjacency.indptr.astype(np.int64)
+        adjacency.indices = adjacency.indices.astype(np.int64)
+        nodes, scores_ = get_pagerank_local(adjacency, [0, 1], tol=1e-8, n_top=3)
+        self.assertEqual(nodes.dtype, np.int64)
+        self.assertAlmostEqual(np.abs(np.sort(scores.ravel())[::-1][:3] - scores_).max(), 0, places=6)
+        adjacency_, scores_ = update_pagerank(adjacency, scores.ravel(), [(0, 2)], tol=1e-8)
+        self.assertTrue(is_proba_array(scores_))
+
+    def test_operator(self):
+        adjacency = test_digraph()
+        operator = TransitionOperator(adjacency)
+        seeds = np.ones(adjacency.shape[0]) / adjacency.shape[0]
+        for solver in ['piteration', 'diteration', 'bicgstab', 'lanczos', 'RH', 'push']:
+            scores = get_pagerank(operator, seeds, damping_factor=0.85, n_iter=10, solver=solver)
+            scores_ = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=10, solver=solver)
+            self.assertAlmostEqual(np.linalg.norm(scores - scores_), 0.)
+
+    def test_warm_start(self):
+        adjacency = test_graph()
+        n = adjacency.shape[0]
+        seeds = np.ones(n) / n
+        for solver in ['piteration', 'diteration', 'bicgstab', 'lanczos']:
+            scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-9, solver=solver)
+            scores_ = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=1, tol=1e-9, solver=solver,
+                                   scores_init=scores)
+            self.assertAlmostEqual(np.linalg.norm(scores - scores_), 0.)
+        seeds = np.eye(n)[:, :2]
+        scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-9)
+        scores_ = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=1, scores_init=scores)
+        self.assertAlmostEqual(np.linalg.norm(scores - scores_), 0.)
+        with self.assertRaises(ValueError):
+            get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=1, scores_init=np.ones(n))
+
+    def test_update(self):
+        for adjacency in [house(), test_digraph()]:
+            n = adjacency.shape[0]
+            seeds = np.zeros(n)
+            seeds[:2] = 0.5
+            scores = get_pagerank(adjacency, seeds, damping_factor=0.85, n_iter=100, tol=1e-10)
+            edges_added = [(1, 4), (3, 2)]
+            edges_removed = list(zip(*adjacency[:2].nonzero()))[:2]
+            adjacency_, scores_ = update_pagerank(adjacency, scores, edges_added, edges_removed, seeds=seeds,
+                                                  damping_factor=0.85, tol=1e-10)
+            self.assertEqual(adjacency_[1, 4], adjacency[1, 4] + 1)
+            self.assertEqual(adjacency_[edges_removed[0]], 0)
+            scores_full = get_pagerank(adjacency_, seeds, damping_factor=0.85, n_iter=100, tol=1e-10)
+            self.assertAlmostEqual(np.linalg.norm(scores_ - scores_full), 0.)
+        # nodes without out-neighbors (before or after the update), default PageRank
+        adjacency = test_digraph()
+        node = np.flatnonzero(adjacency.dot(np.ones(adjacency.shape[1])) == 0)[0]
+        edges_removed = np.column_stack(adjacency[1].nonzero())
+        edges_removed[:, 0] = 1
+        pagerank = PageRank(n_iter=100, tol=1e-10)
+        scores = pagerank.fit_predict(adjacency)
+        adjacency_, scores_ = update_pagerank(adjacency, scores, [(node, 0)], edges_removed, tol=1e-10)
+        self.assertEqual(adjacency_[1].nnz, 0)
+        scores_full = pagerank.fit_predict(adjacency_)
+        self.assertAlmostEqual(np.linalg.norm(scores_ - scores_full), 0.)
+        # random graph, many nodes without out-neighbors
+        adjacency = erdos_renyi(500, 0.01, directed=True, seed=0).tolil()
+        adjacency[np.arange(0, 500, 3)] = 0
+        adjacency = adjacency.tocsr()
+        adjacency.eliminate_zeros()
+        pagerank = PageRank(n_iter=200, tol=1e-10)
+        scores = pagerank.fit_predict(adjacency)
+        edges_added = np.random.RandomState(0).randint(500, size=(10, 2))
+        adjacency_, scores_ = update_pagerank(adjacency, scores, edges_added, tol=1e-10)
+        scores_full = pagerank.fit_predict(adjacency_)
+        self.assertAlmostEqual(np.abs(scores_ - scores_full).sum(), 0., places=6)
+        self.assertTrue(np.abs(scores_ - scores_full).sum() < np.abs(scores - scores_full).sum() / 100)
+        with self.assertRaises(ValueError):
+            update_pagerank(adjacency, scores, [(0, 1000)])
+        with self.assertRaises(ValueError):
+            update_pagerank(adjacency, scores, [(0, 1)], seeds=np.ones(3))
+        with self.assertRaises(ValueError):
+            update_pagerank(adjacency, scores, tol=0)
@@ -6,23 +6,176 @@
 Created on September 17 2020
 @author: Tiphaine Viard <tiphaine.viard@telecom-paris.fr>
 """
-from typing import Union
+from math import log
+from typing import Optional, Union
+
 import numpy as np
 from scipy import sparse
 
 from sknetwork.ranking.base import BaseRanking
-from sknetwork.utils.check import check_format, check_square, check_connected
+from sknetwork.utils.check import check_format, check_square, check_connected, check_n_threads, \
+    check_random_state, is_symmetric
+
+from cython.parallel import prange, threadid
+from libcpp.pair cimport pair
+from libcpp.queue cimport priority_queue
+cimport cython
+
+ctypedef fused int_or_long:
+    int
+    long
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void accumulate_dependencies(int_or_long[:] indptr, int_or_long[:] indices, double[:] data,
+                                  int_or_long source, bint weighted, int t, double[:, :] sigma,
+                                  double[:, :] dists, double[:, :] delta, int_or_long[:, :] order,
+                                  double[:, :] scores) noexcept nogil:
+    """Add the dependencies of a source to the scores (Brandes), with the buffers of thread t.
+
+    Buffers are reset for the visited nodes only, so that no allocation is needed per source."""
+    cdef int_or_long n_visited = 0
+    cdef int_or_long head = 0
+    cdef int_or_long i
+    cdef int_or_long j
+    cdef int_or_long k
+    cdef int_or_long node
+    cdef int_or_long neighbor
+    cdef double length = 1
+    cdef double dist
+    cdef priority_queue[pair[double, int_or_long]] heap
+
+    sigma[t, source] = 1
+    dists[t, source] = 0
+    if weighted:
+        # Dijkstra (nodes in order of distance, each settled once)
+        heap.push(pair[double, int_or_long](0, source))
+        while not heap.empty():
+            dist = -heap.top().first
+            node = heap.top().second
+            heap.pop()
+            if dist > dists[t, node] or delta[t, node] < 0:
+                continue
+            # settled
+            delta[t, node] = -1
+            order[t, n_visited] = node
+            n_visited += 1
+            for j in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[j]
+                dist = dists[t, node] + data[j]
+                if dists[t, neighbor] < 0 or dist < dists[t, neighbor]:
+                    dists[t, neighbor] = dist
+                    sigma[t, neighbor] = sigma[t, node]
+                    heap.push(pair[double, int_or_long](-dist, neighbor))
+                elif dist == dists[t, neighbor]:
+                    sigma[t, neighbor] += sigma[t, node]
+        for k in range(n_visited):
+            delta[t, order[t, k]] = 0
+    else:
+        # breadth-first search (the order of visit is the queue)
+        order[t, 0] = source
+        n_visited = 1
+        while head < n_visited:
+            node = order[t, head]
+            head += 1
+            for j in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[j]
+                if dists[t, neighbor] < 0:
+                    dists[t, neighbor] = dists[t, node] + 1
+                    order[t, n_visited] = neighbor
+                    n_visited += 1
+                if dists[t, neighbor] == dists[t, node] + 1:
+                    sigma[t, neighbor] += sigma[t, node]
+
+    # dependencies, in reverse order of visit (successors on shortest paths first)
+    for k in range(n_visited - 1, -1, -1):
+        node = order[t, k]
+        for j in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[j]
+            if weighted:
+                length = data[j]
+            if dists[t, neighbor] == dists[t, node] + length:
+                delta[t, node] += sigma[t, node] / sigma[t, neighbor] * (1 + delta[t, neighbor])
+        if node != source:
+            scores[t, node] += delta[t, node]
+
+    for k in range(n_visited):
+        node = order[t, k]
+        sigma[t, node] = 0
+        dists[t, node] = -1
+        delta[t, node] = 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def get_betweenness(int_or_long[:] indptr, int_or_long[:] indices, double[:] data, int_or_long[:] sources,
+                    bint weighted, int n_threads):
+    """Sum of the dependencies of the sources on each node (Brandes), in parallel over the sources.
+
+    Parameters
+    ----------
+    indptr, indices, data :
+        CSR arrays of the adjacency matrix (data used as lengths of edges if weighted).
+    sources :
+        Sources of shortest paths.
+    weighted :
+        If ``True``, use Dijkstra's algorithm with the lengths of edges. Otherwise, use breadth-first search.
+    n_threads :
+        Number of threads (one buffer of each type per thread).
+
+    Returns
+    -------
+    scores : np.ndarray
+        Sum of the dependencies of each node.
+    """
+    cdef int_or_long n = indptr.shape[0] - 1
+    cdef int_or_long n_sources = sources.shape[0]
+    cdef int_or_long k
+    cdef int t
+    dtype = np.asarray(indices).dtype
+
+    # thread-local buffers
+    cdef double[:, :] sigma = np.zeros((n_threads, n))
+    cdef double[:, :] dists = -np.ones((n_threads, n))
+    cdef double[:, :] delta = np.zeros((n_threads, n))
+    cdef int_or_long[:, :] order = np.zeros((n_threads, n), dtype=dtype)
+    cdef double[:, :] scores = np.zeros((n_threads, n))
+
+    for k in prange(n_sources, nogil=True, num_threads=n_threads, schedule='dynamic'):
+        t = threadid()
+        accumulate_dependencies(indptr, indices, data, sources[k], weighted, t, sigma, dists, delta, order, scores)
+    return np.asarray(scores).sum(axis=0)
 
-from libcpp.vector cimport vector
-from libcpp.queue cimport queue
 
 class Betweenness(BaseRanking):
     """ Betweenness centrality, based on Brandes' algorithm.
 
+    Parameters
+    ----------
+    normalized :
+        If ``True``, divide the scores by the number of pairs of other nodes (so that they lie in [0, 1]).
+        Also available as ``normalized_`` (former name of this parameter).
+    method :
+        Denotes if the results should be exact or approximate.
+        If ``'approximate'``, shortest paths are only counted from a random sample of sources (scores are rescaled).
+    tol :
+        If ``method=='approximate'``, the allowed tolerance on each normalized score, with high probability.
+    weighted :
+        If ``True``, edge weights are considered as lengths (Dijkstra's algorithm). Weights must be positive.
+        Otherwise, each edge has length 1 (breadth-first search).
+    n_jobs :
+        Number of threads, each processing a subset of the sources (-1 means the maximum number).
+        If ``None`` (default), a single thread is used.
+    random_state :
+        Random number generator or random seed. If ``None``, numpy.random is used.
+
     Attributes
     ----------
     scores_ : np.ndarray
-        Betweenness centrality value of each node
+        Betweenness centrality value of each node.
+        For undirected graphs, each pair of nodes is counted once; for directed graphs, each ordered pair of nodes
+        is counted.
 
     Example
     -------
@@ -36,64 +189,71 @@ class Betweenness(BaseRanking):
 
     References
     ----------
-    Brandes, Ulrik (2001). A faster algorithm for betweenness centrality. Journal of Mathematical Sociology.
+    * Brandes, Ulrik (2001). A faster algorithm for betweenness centrality. Journal of Mathematical Sociology.
+    * Brandes, U., & Pich, C. (2007). Centrality estimation in large networks.
+      International Journal of Bifurcation and Chaos, 17(07), 2303-2318.
     """
 
-    def __init__(self, normalized: bool = False):
+    def __init__(self, normalized: bool = False, method: str = 'exact', tol: float = 1e-1, weighted: bool = False,
+                 n_jobs: Optional[int] = None, random_state: Optional[Union[np.random.RandomState, int]] = None):
         super(Betweenness, self).__init__()
-        self.normalized_ = normalized
+        self.normalized = normalized
+        self.method = method
+        self.tol = tol
+        self.weighted = weighted
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    @property
+    def normalized_(self) -> bool:
+        """Same as ``normalized`` (former name)."""
+        return self.normalized
+
+    @normalized_.setter
+    def normalized_(self, normalized: bool):
+        self.normalized = normalized
 
     def fit(self, adjacency: Union[sparse.csr_matrix, np.ndarray]) -> 'Betweenness':
+        """Betweenness centrality for connected graphs.
+
+        Parameters
+        ----------
+        adjacency :
+            Adjacency matrix of the graph.
+
+        Returns
+        -------
+        self: :class:`Betweenness`
+        """
         adjacency = check_format(adjacency)
         check_square(adjacency)
         check_connected(adjacency)
+        n = adjacency.shape[0]
+
+        if self.method == 'exact':
+            n_sources = n
+            sources = np.arange(n)
+        elif self.method == 'approximate':
+            n_sources = max(1, min(int(log(n) / self.tol ** 2), n))
+            random_state = check_random_state(self.random_state)
+            sources = random_state.choice(n, n_sources, replace=False)
+        else:
+            raise ValueError("Method should be either 'exact' or 'approximate'.")
+
+        data = adjacency.data.astype(float, copy=False)
+        if self.weighted and np.any(data <= 0):
+            raise ValueError('Weights must be positive.')
+        indices = adjacency.indices
+        indptr = adjacency.indptr.astype(indices.dtype, copy=False)
+        scores = get_betweenness(indptr, indices, data, sources.astype(indices.dtype), self.weighted,
+                                 check_n_threads(self.n_jobs))
+        scores *= n / n_sources
 
-        cdef int source
-        cdef vector[ vector[int] ] preds
-        cdef vector[int] sigma
-        cdef vector[int] dists
-        cdef int i
-        cdef int j
-        cdef vector[float] delta
-
-        cdef int n = adjacency.shape[0]
-        self.scores_ = np.zeros(n)
-        cdef vector[int] seen  # Using list as stack
-        cdef queue[int] bfs_queue
-
-        for source in range(n):
-            preds = [[] for _ in range(n)]
-            sigma = np.zeros(n)
-            sigma[source] = 1
-            dists = -np.ones(n, dtype=int)
-            dists[source] = 0
-            bfs_queue.push(source)
-
-            while bfs_queue.size() != 0:
-                i = bfs_queue.front()
-                bfs_queue.pop()
-
-                seen.push_back(i)
-                neighbors = adjacency.indices[adjacency.indptr[i]:adjacency.indptr[i + 1]]
-                for j in neighbors:
-                    if dists[j] < 0:  # j found for the first time?
-                        dists[j] = dists[i] + 1
-                        bfs_queue.push(j)
-                    if dists[j] == dists[i] + 1:  # shortest path to j via i?
-                        sigma[j] += sigma[i]
-                        preds[j].push_back(i)
-
-            # Now backtrack to compute betweenness scores
-            delta = np.zeros(n)
-            while len(seen) != 0:
-                j = seen.back()
-                seen.pop_back()
-                for i in preds[j]:
-                    delta[i] += sigma[i] / sigma[j] * (1 + delta[j])
-                if j != source:
-                    self.scores_[j] += delta[j]
-
-        # Undirected graph, divide all values by two
-        self.scores_ = 1 / 2 * self.scores_
+        if self.normalized and n > 2:
+            scores /= (n - 1) * (n - 2)
+        elif is_symmetric(adjacency):
+            # Undirected graph, each pair counted twice
+            scores /= 2
+        self.scores_ = scores
 
         return self
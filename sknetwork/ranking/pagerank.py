@@ -11,10 +11,11 @@ import numpy as np
 from scipy import sparse
 from scipy.sparse.linalg import LinearOperator
 
-from sknetwork.linalg.ppr_solver import get_pagerank
+from sknetwork.linalg.ppr_solver import get_pagerank, TransitionOperator
 from sknetwork.ranking.base import BaseRanking
 from sknetwork.utils.check import check_damping_factor
 from sknetwork.utils.format import get_adjacency_seeds
+from sknetwork.utils.seeds import get_seeds
 from sknetwork.utils.verbose import VerboseMixin
 
 
@@ -30,7 +31,7 @@ class PageRank(BaseRanking, VerboseMixin):
         Probability to continue the random walk.
     solver : str
         * ``'piteration'``, use power iteration for a given number of iterations.
-        * ``'diteration'``, use asynchronous parallel diffusion for a given number of iterations.
+        * ``'diteration'``, use asynchronous parallel diffusion (Gauss-Seidel) for a given number of iterations.
         * ``'lanczos'``, use eigensolver with a given tolerance.
         * ``'bicgstab'``, use Biconjugate Gradient Stabilized method for a given tolerance.
         * ``'RH'``, use a Ruffini-Horner polynomial evaluation.
@@ -39,11 +40,14 @@ class PageRank(BaseRanking, VerboseMixin):
         Number of iterations for some solvers.
     tol : float
         Tolerance for the convergence of some solvers.
+    n_jobs : int
+        Number of threads used by the solver ``'diteration'`` (-1 means the maximum number).
+        If ``None`` (default), a single thread is used.
 
     Attributes
     ----------
     scores_ : np.ndarray
-        PageRank score of each node.
+        PageRank score of each node (one column per restart distribution for a matrix of seeds).
     scores_row_: np.ndarray
         Scores of rows, for bipartite graphs.
     scores_col_: np.ndarray
@@ -65,43 +69,66 @@ class PageRank(BaseRanking, VerboseMixin):
     Page, L., Brin, S., Motwani, R., & Winograd, T. (1999). The PageRank citation ranking: Bringing order to the web.
     Stanford InfoLab.
     """
-    def __init__(self, damping_factor: float = 0.85, solver: str = 'piteration', n_iter: int = 10, tol: float = 1e-6):
+    def __init__(self, damping_factor: float = 0.85, solver: str = 'piteration', n_iter: int = 10, tol: float = 1e-6,
+                 n_jobs: Optional[int] = None):
         super(PageRank, self).__init__()
         check_damping_factor(damping_factor)
         self.damping_factor = damping_factor
         self.solver = solver
         self.n_iter = n_iter
         self.tol = tol
+        self.n_jobs = n_jobs
         self.bipartite = None
 
-    def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray, LinearOperator],
+    def fit(self, input_matrix: Union[sparse.csr_matrix, np.ndarray, LinearOperator, TransitionOperator],
             seeds: Optional[Union[dict, np.ndarray]] = None, seeds_row: Optional[Union[dict, np.ndarray]] = None,
-            seeds_col: Optional[Union[dict, np.ndarray]] = None, force_bipartite: bool = False) -> 'PageRank':
+            seeds_col: Optional[Union[dict, np.ndarray]] = None, force_bipartite: bool = False,
+            scores_init: Optional[np.ndarray] = None) -> 'PageRank':
         """Fit algorithm to data.
 
         Parameters
         ----------
         input_matrix :
             Adjacency matrix or biadjacency matrix of the graph.
+            Transition operator of the graph (see :class:`sknetwork.linalg.TransitionOperator`), to be reused over
+            several fits without preprocessing the graph again.
         seeds :
             Parameter to be used for Personalized PageRank.
             Restart distribution as a vector or a dict (node: weight).
             If ``None``, the uniform distribution is used (no personalization, default).
+            A matrix of shape (n, k) gives k restart distributions (one per column), processed in a single run;
+            the scores are then a matrix of the same shape.
         seeds_row, seeds_col :
             Parameter to be used for Personalized PageRank on bipartite graphs.
-            Restart distribution as vectors or dicts on rows, columns (node: weight).
+            Restart distribution as vectors or dicts on rows, columns (node: weight), or matrices (one per column).
             If both seeds_row and seeds_col are ``None`` (default), the uniform distribution on rows is used.
         force_bipartite :
             If ``True``, consider the input matrix as the biadjacency matrix of a bipartite graph.
+        scores_init :
+            Initial scores (warm start), e.g., the scores of a previous fit on a slightly different graph.
+            Used by the solvers ``'piteration'``, ``'diteration'``, ``'bicgstab'`` and ``'lanczos'``;
+            if ``None`` (default), these solvers start from the scaled restart distribution.
+            For bipartite graphs, scores of rows and columns, concatenated.
+
         Returns
         -------
         self: :class:`PageRank`
         """
-        adjacency, seeds, self.bipartite = get_adjacency_seeds(input_matrix, force_bipartite=force_bipartite,
-                                                               seeds=seeds, seeds_row=seeds_row,
-                                                               seeds_col=seeds_col, default_value=0, which='probs')
+        if isinstance(input_matrix, TransitionOperator):
+            adjacency, self.bipartite = input_matrix, False
+            seeds = get_seeds(adjacency.shape, seeds, default_value=0)
+            weights = seeds.sum(axis=0)
+            if np.any(weights <= 0):
+                raise ValueError('At least one seed must have a positive value (in each column for a matrix of seeds).')
+            seeds /= weights
+        else:
+            adjacency, seeds, self.bipartite = get_adjacency_seeds(input_matrix, force_bipartite=force_bipartite,
+                                                                   seeds=seeds, seeds_row=seeds_row,
+                                                                   seeds_col=seeds_col, default_value=0,
+                                                                   which='probs')
         self.scores_ = get_pagerank(adjacency, seeds, damping_factor=self.damping_factor, n_iter=self.n_iter,
-                                    solver=self.solver, tol=self.tol)
+                                    solver=self.solver, tol=self.tol, scores_init=scores_init,
+                                    n_jobs=self.n_jobs)
         if self.bipartite:
             self._split_vars(input_matrix.shape)
         return self
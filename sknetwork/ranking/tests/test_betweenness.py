@@ -4,10 +4,12 @@
 
 import unittest
 import numpy as np
+from scipy import sparse
 
 from sknetwork.ranking.betweenness import Betweenness
 from sknetwork.data.test_graphs import test_graph, test_graph_disconnect
-from sknetwork.data.toy_graphs import bow_tie, star_wars
+from sknetwork.data.models import cyclic_digraph, linear_graph
+from sknetwork.data.toy_graphs import bow_tie, star_wars, karate_club
 
 
 class TestBetweenness(unittest.TestCase):
@@ -36,3 +38,48 @@ class TestBetweenness(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             betweenness.fit_transform(adjacency)
+
+    def test_path(self):
+        adjacency = linear_graph(4)
+        scores = Betweenness().fit_predict(adjacency)
+        self.assertEqual(list(scores), [0, 2, 2, 0])
+        scores = Betweenness(normalized=True).fit_predict(adjacency)
+        self.assertAlmostEqual(np.linalg.norm(scores - np.array([0, 2, 2, 0]) / 3), 0)
+
+    def test_directed(self):
+        adjacency = cyclic_digraph(4)
+        scores = Betweenness().fit_predict(adjacency)
+        self.assertEqual(list(scores), [3, 3, 3, 3])
+
+    def test_weighted(self):
+        adjacency = sparse.csr_matrix(np.array([[0, 1, 3], [1, 0, 1], [3, 1, 0]]))
+        scores = Betweenness().fit_predict(adjacency)
+        self.assertEqual(list(scores), [0, 0, 0])
+        scores = Betweenness(weighted=True).fit_predict(adjacency)
+        self.assertEqual(list(scores), [0, 1, 0])
+        with self.assertRaises(ValueError):
+            Betweenness(weighted=True).fit(-adjacency)
+
+    def test_parallel(self):
+        adjacency = karate_club()
+        scores = Betweenness().fit_predict(adjacency)
+        for n_jobs in [2, -1]:
+            scores_ = Betweenness(n_jobs=n_jobs).fit_predict(adjacency)
+            self.assertAlmostEqual(np.linalg.norm(scores - scores_), 0)
+
+    def test_approximate(self):
+        adjacency = karate_club()
+        scores = Betweenness(normalized=True).fit_predict(adjacency)
+        scores_ = Betweenness(normalized=True, method='approximate', tol=0.5, random_state=0).fit_predict(adjacency)
+        self.assertTrue(np.max(np.abs(scores - scores_)) < 0.5)
+        # at least one source
+        scores = Betweenness(method='approximate', tol=1, random_state=0).fit_predict(linear_graph(2))
+        self.assertEqual(list(scores), [0, 0])
+        with self.assertRaises(ValueError):
+            Betweenness(method='toto').fit(adjacency)
+
+    def test_normalized_alias(self):
+        betweenness = Betweenness(normalized=True)
+        self.assertTrue(betweenness.normalized_)
+        betweenness.normalized_ = False
+        self.assertFalse(betweenness.normalized)
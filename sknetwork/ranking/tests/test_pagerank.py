@@ -8,6 +8,7 @@ import numpy as np
 
 from sknetwork.data.models import cyclic_digraph
 from sknetwork.data.test_graphs import test_bigraph
+from sknetwork.linalg import TransitionOperator
 from sknetwork.ranking.pagerank import PageRank
 from sknetwork.utils import co_neighbor_graph
 
@@ -67,3 +68,43 @@ class TestPageRank(unittest.TestCase):
         scores1 /= scores1.sum()
         scores2 = PageRank(damping_factor=0.85**2, solver='lanczos').fit_transform(adjacency, seeds)
         self.assertAlmostEqual(np.linalg.norm(scores1 - scores2), 0., places=6)
+
+    def test_seeds_matrix(self):
+        seeds = np.zeros((self.n, 3))
+        seeds[[0, 1, 2], [0, 1, 2]] = 1
+        for solver in ['piteration', 'bicgstab']:
+            pagerank = PageRank(solver=solver)
+            scores = pagerank.fit_transform(self.adjacency, seeds)
+            self.assertEqual(scores.shape, (self.n, 3))
+            for i in range(3):
+                scores_ = pagerank.fit_transform(self.adjacency, seeds[:, i])
+                self.assertAlmostEqual(np.linalg.norm(scores[:, i] - scores_), 0.)
+        biadjacency = test_bigraph()
+        seeds_row = np.eye(biadjacency.shape[0])[:, :2]
+        pagerank = PageRank()
+        pagerank.fit(biadjacency, seeds_row=seeds_row)
+        self.assertEqual(pagerank.scores_row_.shape, (biadjacency.shape[0], 2))
+        self.assertEqual(pagerank.scores_col_.shape, (biadjacency.shape[1], 2))
+        # empty column of seeds
+        seeds[:, 1] = 0
+        for input_matrix in [self.adjacency, TransitionOperator(self.adjacency)]:
+            for solver in ['piteration', 'bicgstab']:
+                with self.assertRaises(ValueError):
+                    PageRank(solver=solver).fit(input_matrix, seeds)
+            with self.assertRaises(ValueError):
+                PageRank().fit(input_matrix, np.zeros(self.n))
+
+    def test_operator(self):
+        operator = TransitionOperator(self.adjacency)
+        for damping_factor in [0.5, 0.85]:
+            pagerank = PageRank(damping_factor=damping_factor)
+            for seeds in [None, {0: 1}]:
+                scores = pagerank.fit_transform(operator, seeds)
+                scores_ = pagerank.fit_transform(self.adjacency, seeds)
+                self.assertAlmostEqual(np.linalg.norm(scores - scores_), 0.)
+
+    def test_warm_start(self):
+        pagerank = PageRank(solver='piteration', n_iter=100)
+        scores = pagerank.fit_predict(self.adjacency, {0: 1})
+        scores_ = PageRank(n_iter=1).fit_predict(self.adjacency, {0: 1}, scores_init=scores)
+        self.assertAlmostEqual(np.linalg.norm(scores - scores_), 0.)
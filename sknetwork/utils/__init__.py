@@ -2,9 +2,9 @@
 from sknetwork.utils.check import is_symmetric
 from sknetwork.utils.co_neighbor import co_neighbor_graph
 from sknetwork.utils.format import *
-from sknetwork.utils.kmeans import KMeansDense
+from sknetwork.utils.kmeans import KMeansDense, MiniBatchKMeansDense
 from sknetwork.utils.knn import KNNDense, CNNDense
-from sknetwork.utils.membership import get_membership
+from sknetwork.utils.membership import get_membership, get_blocks
 from sknetwork.utils.neighbors import get_neighbors, get_degrees
 from sknetwork.utils.simplex import projection_simplex, projection_simplex_array, projection_simplex_csr
 from sknetwork.utils.ward import WardDense
@@ -4,6 +4,7 @@
 Created in April 2019
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 """
+import os
 import warnings
 from typing import Union, Optional
 
@@ -240,6 +241,16 @@ def check_n_jobs(n_jobs: Optional[int] = None):
         return n_jobs
 
 
+def check_n_threads(n_jobs: Optional[int] = None) -> int:
+    """Parse the ``n_jobs`` parameter for multithreading (return the number of threads)."""
+    if n_jobs is None:
+        return 1
+    elif n_jobs < 0:
+        return os.cpu_count()
+    else:
+        return max(n_jobs, 1)
+
+
 def check_adjacency_vector(adjacency_vectors: Union[sparse.csr_matrix, np.ndarray],
                            n: Optional[int] = None) -> sparse.csr_matrix:
     """Check format of new samples for predict methods"""
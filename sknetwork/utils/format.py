@@ -195,7 +195,8 @@ def get_adjacency_seeds(input_matrix: Union[sparse.csr_matrix, np.ndarray], allo
         Value of non-seed nodes (default = -1).
     which :
         Which seed values.
-        If ``'probs'``, return a probability distribution.
+        If ``'probs'``, return a probability distribution (one per column for a matrix of seeds).
+        Raise an error if some seed vector has no positive weight.
         If ``'labels'``, return distinct integer values if all are equal.
     """
     input_matrix = check_format(input_matrix)
@@ -211,8 +212,10 @@ def get_adjacency_seeds(input_matrix: Union[sparse.csr_matrix, np.ndarray], allo
     else:
         seeds = get_seeds(input_matrix.shape, seeds, default_value=default_value)
     if which == 'probs':
-        if seeds.sum() > 0:
-            seeds /= seeds.sum()
+        weights = seeds.sum(axis=0)
+        if np.any(weights <= 0):
+            raise ValueError('At least one seed must have a positive value (in each column for a matrix of seeds).')
+        seeds /= weights
     elif which == 'labels':
         if len(set(seeds[seeds >= 0])) == 1:
             seeds = np.arange(len(seeds))
@@ -4,10 +4,15 @@
 Created on October 2019
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 """
+from multiprocessing.pool import ThreadPool
+from typing import Optional, Tuple, Union
+
 import numpy as np
+from scipy import sparse
 from scipy.cluster.vq import kmeans2
 
 from sknetwork.utils.base import Algorithm
+from sknetwork.utils.check import check_random_state, check_n_threads
 
 
 class KMeansDense(Algorithm):
@@ -87,3 +92,189 @@ class KMeansDense(Algorithm):
         """
         self.fit(x)
         return self.labels_
+
+
+def get_nearest_centers(x: np.ndarray, centers: np.ndarray, batch_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the nearest center of each sample (by blocks of samples).
+
+    Parameters
+    ----------
+    x :
+        Samples.
+    centers :
+        Centers.
+    batch_size :
+        Number of samples processed at once.
+
+    Returns
+    -------
+    labels : np.ndarray
+        Index of the nearest center of each sample.
+    distances : np.ndarray
+        Squared distance of each sample to its nearest center.
+    """
+    n = x.shape[0]
+    labels = np.empty(n, dtype=int)
+    distances = np.empty(n, dtype=x.dtype)
+    centers_norm = np.einsum('ij,ij->i', centers, centers)
+    for start in range(0, n, batch_size):
+        x_batch = x[start: start + batch_size]
+        # squared distance up to the squared norm of each sample
+        scores = centers_norm - 2 * x_batch.dot(centers.T)
+        labels_batch = np.argmin(scores, axis=1)
+        labels[start: start + batch_size] = labels_batch
+        distances[start: start + batch_size] = scores[np.arange(len(x_batch)), labels_batch] \
+            + np.einsum('ij,ij->i', x_batch, x_batch)
+    return labels, np.maximum(distances, 0)
+
+
+class MiniBatchKMeansDense(Algorithm):
+    """Mini-batch K-means clustering.
+
+    Centers are initialized by the k-means++ method on a random sample, then updated from small random batches.
+    Several runs are done in parallel threads and the best one (in terms of inertia on a random sample) is kept.
+    Computations are done in single precision.
+
+    Parameters
+    ----------
+    n_clusters :
+        Number of desired clusters.
+    batch_size :
+        Number of samples in each batch.
+    n_iter :
+        Maximum number of batches.
+    n_init :
+        Number of runs (with different initializations).
+    init_size :
+        Number of samples used for the initialization and the selection of the best run
+        (default = 3 times the batch size).
+    tol :
+        Stop when the relative change of the centers over a batch is below this value.
+    random_state :
+        Random number generator or random seed. If None, numpy.random is used.
+    n_jobs :
+        Number of threads running the runs in parallel (-1 means the maximum number).
+        If ``None`` (default), runs are sequential.
+
+    Attributes
+    ----------
+    labels_ :
+        Label of each sample.
+    cluster_centers_ :
+        A ‘k’ by ‘N’ array of centroids of the best run.
+
+    References
+    ----------
+    * Sculley, D. (2010). Web-scale k-means clustering.
+      In Proceedings of the 19th international conference on World wide web (pp. 1177-1178).
+
+    * Arthur, D., & Vassilvitskii, S. (2007, January). k-means++: The advantages of careful seeding.
+      In Proceedings of the eighteenth annual ACM-SIAM symposium on Discrete algorithms (pp. 1027-1035).
+      Society for Industrial and Applied Mathematics.
+    """
+    def __init__(self, n_clusters: int = 8, batch_size: int = 1024, n_iter: int = 100, n_init: int = 3,
+                 init_size: Optional[int] = None, tol: float = 1e-4,
+                 random_state: Optional[Union[np.random.RandomState, int]] = None, n_jobs: Optional[int] = None):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.n_iter = n_iter
+        self.n_init = n_init
+        self.init_size = init_size
+        self.tol = tol
+        self.random_state = check_random_state(random_state)
+        self.n_jobs = n_jobs
+
+        self.labels_ = None
+        self.cluster_centers_ = None
+
+    def _init_centers(self, x: np.ndarray, random_state: np.random.RandomState) -> np.ndarray:
+        """Initialize the centers by the k-means++ method."""
+        n = x.shape[0]
+        centers = np.empty((self.n_clusters, x.shape[1]), dtype=x.dtype)
+        centers[0] = x[random_state.randint(n)]
+        distances = np.einsum('ij,ij->i', x - centers[0], x - centers[0]).astype(float)
+        for i in range(1, self.n_clusters):
+            total = distances.sum()
+            if total > 0:
+                j = random_state.choice(n, p=distances / total)
+            else:
+                j = random_state.randint(n)
+            centers[i] = x[j]
+            distances = np.minimum(distances, np.einsum('ij,ij->i', x - centers[i], x - centers[i]))
+        return centers
+
+    def _fit_run(self, x: np.ndarray, x_init: np.ndarray, seed: int) -> np.ndarray:
+        """One run of the mini-batch K-means algorithm. Return the centers."""
+        random_state = np.random.RandomState(seed)
+        n = x.shape[0]
+        centers = self._init_centers(x_init, random_state)
+        counts = np.zeros(self.n_clusters)
+        for t in range(self.n_iter):
+            x_batch = x[random_state.randint(n, size=min(self.batch_size, n))]
+            labels, _ = get_nearest_centers(x_batch, centers)
+            counts_batch = np.bincount(labels, minlength=self.n_clusters)
+            sums = sparse.csr_matrix((np.ones(len(labels), dtype=x.dtype), (labels, np.arange(len(labels)))),
+                                     shape=(self.n_clusters, len(labels))).dot(x_batch)
+            counts += counts_batch
+            # running mean of the samples assigned to each center
+            mask = counts_batch > 0
+            update = (sums[mask] - counts_batch[mask, np.newaxis] * centers[mask]) / counts[mask, np.newaxis]
+            centers[mask] += update.astype(centers.dtype)
+            norm = np.sum(centers ** 2)
+            if norm > 0 and np.sum(update ** 2) <= self.tol * norm:
+                break
+        return centers
+
+    def fit(self, x: np.ndarray) -> 'MiniBatchKMeansDense':
+        """Fit algorithm to the data.
+
+        Parameters
+        ----------
+        x:
+            Data to cluster.
+
+        Returns
+        -------
+        self: :class:`MiniBatchKMeansDense`
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n = x.shape[0]
+        init_size = self.init_size
+        if init_size is None:
+            init_size = 3 * self.batch_size
+        init_size = max(min(init_size, n), self.n_clusters)
+        x_init = x[self.random_state.choice(n, size=init_size, replace=False)]
+        seeds = self.random_state.randint(np.iinfo(np.int32).max, size=self.n_init)
+
+        def fit_run(seed: int) -> np.ndarray:
+            return self._fit_run(x, x_init, seed)
+
+        n_threads = check_n_threads(self.n_jobs)
+        if n_threads > 1:
+            with ThreadPool(n_threads) as pool:
+                runs = pool.map(fit_run, seeds)
+        else:
+            runs = list(map(fit_run, seeds))
+
+        # best run by inertia on the sample
+        inertias = [get_nearest_centers(x_init, centers)[1].sum() for centers in runs]
+        centers = runs[int(np.argmin(inertias))]
+        self.labels_, _ = get_nearest_centers(x, centers)
+        self.cluster_centers_ = centers
+
+        return self
+
+    def fit_transform(self, x: np.ndarray) -> np.ndarray:
+        """Fit algorithm to the data and return the labels.
+
+        Parameters
+        ----------
+        x:
+            Data to cluster.
+
+        Returns
+        -------
+        labels: np.ndarray
+        """
+        self.fit(x)
+        return self.labels_
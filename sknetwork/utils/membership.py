@@ -5,7 +5,7 @@ Created in July 2019
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 @author: Thomas Bonald <bonald@enst.fr>
 """
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import numpy as np
 from scipy import sparse
@@ -43,3 +43,57 @@ def get_membership(labels: np.ndarray, dtype=bool, n_labels: Optional[int] = Non
     row = np.arange(n)[ix]
     col = labels[ix]
     return sparse.csr_matrix((data, (row, col)), shape=shape, dtype=dtype)
+
+
+def get_blocks(adjacency: sparse.csr_matrix, labels: np.ndarray) -> Tuple[List[np.ndarray], List[sparse.csr_matrix]]:
+    """Get the subgraphs induced by each label.
+
+    The graph is permuted once so that the nodes of each label are contiguous, and edges between different labels
+    are removed. The adjacency matrices of the subgraphs are then slices of the same arrays (no copy).
+    Negative labels are ignored.
+
+    Parameters
+    ----------
+    adjacency :
+        Adjacency matrix of the graph.
+    labels :
+        Label of each node (between 0 and k - 1, with k the number of labels).
+
+    Returns
+    -------
+    nodes : list
+        Nodes of each label (in increasing order).
+    blocks : list
+        Adjacency matrix of each subgraph, read-only (its arrays are shared with the other subgraphs).
+
+    Example
+    -------
+    >>> from sknetwork.data import house
+    >>> adjacency = house()
+    >>> nodes, blocks = get_blocks(adjacency, np.array([0, 0, 1, 1, 0]))
+    >>> nodes
+    [array([0, 1, 4]), array([2, 3])]
+    >>> blocks[0].toarray().astype(int)
+    array([[0, 1, 1],
+           [1, 0, 1],
+           [1, 1, 0]])
+    """
+    adjacency = sparse.csr_matrix(adjacency)
+    labels = np.asarray(labels)
+    nodes = np.flatnonzero(labels >= 0)
+    nodes = nodes[np.argsort(labels[nodes], kind='stable')]
+    labels = labels[nodes]
+    n = len(nodes)
+    starts = np.append(0, np.cumsum(np.bincount(labels)))
+    adjacency = adjacency[nodes][:, nodes]
+    rows = np.repeat(np.arange(n), np.diff(adjacency.indptr))
+    mask = labels[rows] == labels[adjacency.indices]
+    data = adjacency.data[mask]
+    indices = (adjacency.indices[mask] - starts[labels[rows[mask]]]).astype(adjacency.indices.dtype)
+    indptr = np.append(0, np.cumsum(np.bincount(rows[mask], minlength=n))).astype(adjacency.indptr.dtype)
+    blocks = []
+    for start, end in zip(starts[:-1], starts[1:]):
+        block = sparse.csr_matrix((data[indptr[start]:indptr[end]], indices[indptr[start]:indptr[end]],
+                                   indptr[start:end + 1] - indptr[start]), shape=(end - start, end - start))
+        blocks.append(block)
+    return [nodes[start:end] for start, end in zip(starts[:-1], starts[1:])], blocks
@@ -31,18 +31,19 @@ def get_seeds(shape: tuple, seeds: Union[np.ndarray, dict], default_value: float
 
 def stack_seeds(shape: tuple, seeds_row: Optional[Union[np.ndarray, dict]],
                 seeds_col: Optional[Union[np.ndarray, dict]] = None, default_value: float = -1) -> np.ndarray:
-    """Process seeds for rows and columns and stack the results into a single vector."""
+    """Process seeds for rows and columns and stack the results into a single vector
+    (or a single matrix for matrices of seeds, one seed vector per column)."""
     n_row, n_col = shape
     if seeds_row is None and seeds_col is None:
         seeds_row = np.ones(n_row)
         seeds_col = default_value * np.ones(n_col)
     elif seeds_row is None:
-        seeds_row = default_value * np.ones(n_row)
+        seeds_row = default_value * np.ones((n_row,) + np.shape(seeds_col)[1:])
     elif seeds_col is None:
-        seeds_col = default_value * np.ones(n_col)
+        seeds_col = default_value * np.ones((n_col,) + np.shape(seeds_row)[1:])
     seeds_row = get_seeds(shape, seeds_row, default_value)
     seeds_col = get_seeds((n_col,), seeds_col, default_value)
-    return np.hstack((seeds_row, seeds_col))
+    return np.concatenate((seeds_row, seeds_col))
 
 
 def seeds2probs(n: int, seeds: np.ndarray = None) -> np.ndarray:
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """tests for check.py"""
+import os
 import unittest
 
 from sknetwork.data import cyclic_digraph
@@ -109,6 +110,11 @@ class TestChecks(unittest.TestCase):
         self.assertEqual(check_n_jobs(-1), None)
         self.assertEqual(check_n_jobs(8), 8)
 
+    def test_check_n_threads(self):
+        self.assertEqual(check_n_threads(None), 1)
+        self.assertEqual(check_n_threads(-1), os.cpu_count())
+        self.assertEqual(check_n_threads(4), 4)
+
     def test_check_n_neighbors(self):
         with self.assertWarns(Warning):
             check_n_neighbors(10, 5)
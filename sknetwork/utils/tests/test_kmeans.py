@@ -8,7 +8,7 @@ import unittest
 
 import numpy as np
 
-from sknetwork.utils import KMeansDense
+from sknetwork.utils import KMeansDense, MiniBatchKMeansDense
 
 
 class TestKMeans(unittest.TestCase):
@@ -19,3 +19,14 @@ class TestKMeans(unittest.TestCase):
         labels = kmeans.fit_transform(x)
         self.assertEqual(labels.shape, (x.shape[0],))
         self.assertEqual(kmeans.cluster_centers_.shape, (kmeans.n_clusters, x.shape[1]))
+
+    def test_minibatch(self):
+        x = np.vstack((np.random.randn(100, 3), np.random.randn(100, 3) + 10))
+        kmeans = MiniBatchKMeansDense(n_clusters=2, batch_size=32, random_state=0)
+        labels = kmeans.fit_transform(x)
+        self.assertEqual(labels.shape, (x.shape[0],))
+        self.assertEqual(kmeans.cluster_centers_.shape, (kmeans.n_clusters, x.shape[1]))
+        self.assertEqual(len(set(labels[:100])), 1)
+        self.assertNotEqual(labels[0], labels[-1])
+        labels_parallel = MiniBatchKMeansDense(n_clusters=2, batch_size=32, random_state=0, n_jobs=2).fit_transform(x)
+        self.assertTrue((labels == labels_parallel).all())
@@ -7,6 +7,7 @@ Created on October 2019
 import unittest
 
 import numpy as np
+from scipy.cluster.hierarchy import ward
 
 from sknetwork.utils import WardDense
 
@@ -18,3 +19,21 @@ class TestKMeans(unittest.TestCase):
         ward = WardDense()
         dendrogram = ward.fit_transform(x)
         self.assertEqual(dendrogram.shape, (x.shape[0] - 1, 4))
+
+    def test_knn(self):
+        x = np.random.randn(20, 3)
+        # complete graph of neighbors: same as Ward
+        dendrogram = WardDense(n_neighbors=19).fit_transform(x)
+        self.assertTrue(np.allclose(dendrogram, ward(x)))
+        # disconnected graph of neighbors
+        x = np.vstack((np.random.randn(10, 2), 100 + np.random.randn(10, 2)))
+        dendrogram = WardDense(n_neighbors=2).fit_transform(x)
+        self.assertEqual(dendrogram.shape, (x.shape[0] - 1, 4))
+        self.assertEqual(dendrogram[-1, 3], 20)
+        # many components
+        x = np.repeat(100 * np.random.randn(200, 2), 5, axis=0) + np.random.randn(1000, 2) / 100
+        dendrogram = WardDense(n_neighbors=2).fit_transform(x)
+        self.assertEqual(dendrogram[-1, 3], 1000)
+        self.assertEqual(len(np.unique(dendrogram[:, :2])), 2 * 1000 - 2)
+        with self.assertRaises(ValueError):
+            WardDense(n_neighbors=2).fit(np.random.randn(1, 2))
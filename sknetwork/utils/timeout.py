@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import contextlib
 import signal
+import time
 import warnings
+from typing import Optional
 
 
 class TimeOut(contextlib.ContextDecorator):
@@ -36,3 +38,29 @@ class TimeOut(contextlib.ContextDecorator):
     def __exit__(self, exc_type, exc_val, exc_tb):
         if hasattr(signal, "SIGALRM"):
             signal.alarm(0)
+
+
+def get_deadline(max_time: Optional[float] = None) -> float:
+    """Get the deadline corresponding to some maximum running time from now.
+
+    Unlike :class:`TimeOut`, the deadline must be checked by the algorithm itself (e.g., between two passes),
+    which works in any thread and keeps the partial result.
+
+    Parameters
+    ----------
+    max_time :
+        Maximum running time (in seconds). If ``None``, no limit.
+
+    Returns
+    -------
+    deadline : float
+        Deadline, to be compared with ``time.perf_counter()`` (``inf`` if no limit).
+
+    Example
+    -------
+    >>> get_deadline()
+    inf
+    """
+    if max_time is None:
+        return float('inf')
+    return time.perf_counter() + max_time
@@ -4,15 +4,27 @@
 Created on October 2019
 @author: Nathan de Lara <nathan.delara@polytechnique.org>
 """
+from typing import Optional
+
 import numpy as np
 from scipy.cluster.hierarchy import ward
 
 from sknetwork.utils.base import Algorithm
+from sknetwork.utils.knn import KNNDense
+from sknetwork.utils.ward_core import get_ward_knn
 
 
 class WardDense(Algorithm):
     """Hierarchical clustering by the Ward method based on SciPy.
 
+    Parameters
+    ----------
+    n_neighbors :
+        If not ``None``, merges are restricted to clusters connected in the graph of the ``n_neighbors`` nearest
+        neighbors of each sample (KD-tree search). This takes linear memory instead of quadratic memory
+        (pairwise distances), and is suited to large datasets in low dimension.
+        Heights are then not necessarily monotonic.
+
     Attributes
     ----------
     dendrogram_ : np.ndarray (n - 1, 4)
@@ -25,8 +37,18 @@ class WardDense(Algorithm):
 
     * Murtagh, F., & Contreras, P. (2012). Algorithms for hierarchical clustering: an overview.
       Wiley Interdisciplinary Reviews: Data Mining and Knowledge Discovery, 2(1), 86-97.
+
+    Example
+    -------
+    >>> x = np.array([[0, 0], [0, 1], [3, 0], [3, 1.5]])
+    >>> ward = WardDense(n_neighbors=1)
+    >>> ward.fit_transform(x)[:, :2]
+    array([[0., 1.],
+           [2., 3.],
+           [4., 5.]])
     """
-    def __init__(self):
+    def __init__(self, n_neighbors: Optional[int] = None):
+        self.n_neighbors = n_neighbors
         self.dendrogram_ = None
 
     def fit(self, x: np.ndarray) -> 'WardDense':
@@ -41,7 +63,17 @@ class WardDense(Algorithm):
         -------
         self: :class:`WardDense`
         """
-        self.dendrogram_ = ward(x)
+        if self.n_neighbors is None:
+            self.dendrogram_ = ward(x)
+        else:
+            n = x.shape[0]
+            if n < 2:
+                raise ValueError('The data must have at least 2 samples.')
+            knn = KNNDense(n_neighbors=min(self.n_neighbors, n - 1), undirected=True)
+            adjacency = knn.fit_transform(x)
+            indices = adjacency.indices.astype(np.int32)
+            indptr = adjacency.indptr.astype(np.int32)
+            self.dendrogram_ = get_ward_knn(np.asarray(x, dtype=float), indices, indptr)
         return self
 
     def fit_transform(self, x: np.ndarray) -> np.ndarray:
@@ -0,0 +1,174 @@
+# distutils: language = c++
+# cython: language_level=3
+# cython: linetrace=True
+# distutils: define_macros=CYTHON_TRACE_NOGIL=1
+"""
+Created on October 2026
+@author: scikit-network developers
+"""
+from libc.math cimport sqrt
+from libcpp.pair cimport pair
+from libcpp.queue cimport priority_queue
+from libcpp.vector cimport vector
+
+import numpy as np
+from scipy.spatial import cKDTree
+cimport cython
+
+ctypedef pair[double, pair[int, int]] Edge
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline double get_distance(double[:, :] centroids, double[:] sizes, int i, int j) noexcept nogil:
+    """Ward distance between two clusters (squared)."""
+    cdef int k
+    cdef double diff
+    cdef double distance = 0
+    for k in range(centroids.shape[1]):
+        diff = centroids[i, k] - centroids[j, k]
+        distance += diff * diff
+    return 2 * sizes[i] * sizes[j] / (sizes[i] + sizes[j]) * distance
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline long remove_dead(vector[int]& neighbors, char[:] alive) noexcept nogil:
+    """Remove the clusters that are no longer alive from a list of neighbors. Return the number of removals."""
+    cdef int k
+    cdef int size = neighbors.size()
+    cdef int n_alive = 0
+    for k in range(size):
+        if alive[neighbors[k]]:
+            neighbors[n_alive] = neighbors[k]
+            n_alive += 1
+    neighbors.resize(n_alive)
+    return size - n_alive
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def get_ward_knn(double[:, :] x, int[:] indices, int[:] indptr):
+    """Ward dendrogram with merges restricted to the edges of a graph (greedy, with a priority queue).
+
+    The two closest clusters connected by an edge are merged first. The edges of a merged cluster are those of its
+    children. When no edges are left (disconnected graph), each remaining cluster is connected to the cluster of
+    nearest centroid (KD-tree search), so that the number of edges remains linear.
+
+    Memory is linear in the number of samples and edges: merged clusters are removed from the lists of neighbors
+    of their neighbors, and the priority queue is rebuilt from the edges between remaining clusters when most of
+    its entries are outdated.
+
+    Parameters
+    ----------
+    x :
+        Data (one sample per row).
+    indices, indptr :
+        CSR arrays of the (symmetric) graph between samples.
+
+    Returns
+    -------
+    dendrogram : np.ndarray
+        Dendrogram. Heights are not necessarily monotonic.
+    """
+    cdef int n = x.shape[0]
+    cdef int n_dim = x.shape[1]
+    cdef int i
+    cdef int j
+    cdef int k
+    cdef int t = 0
+    cdef long n_entries = 0
+    cdef int node
+    cdef int neighbor
+    cdef int child
+    cdef Edge edge
+    cdef priority_queue[Edge] queue
+    cdef priority_queue[Edge] queue_empty
+    cdef vector[vector[int]] neighbors
+    cdef vector[int] clusters
+    cdef int[:] nearest_view
+    cdef double[:, :] centroids = np.zeros((2 * n - 1, n_dim))
+    cdef double[:] sizes = np.zeros(2 * n - 1)
+    cdef char[:] alive = np.zeros(2 * n - 1, dtype=np.int8)
+    cdef int[:] marks = -np.ones(2 * n - 1, dtype=np.int32)
+    cdef double[:, :] dendrogram = np.zeros((n - 1, 4))
+
+    centroids[:n] = x
+    sizes[:n] = 1
+    alive[:n] = 1
+    neighbors.resize(2 * n - 1)
+
+    with nogil:
+        # the priority queue is a max-heap: distances are negated
+        for i in range(n):
+            for k in range(indptr[i], indptr[i + 1]):
+                j = indices[k]
+                if j != i:
+                    neighbors[i].push_back(j)
+                    n_entries += 1
+                    if i < j:
+                        queue.push(Edge(-get_distance(centroids, sizes, i, j), pair[int, int](i, j)))
+        while t < n - 1:
+            if queue.empty():
+                # disconnected graph: each remaining cluster connected to the cluster of nearest centroid
+                clusters.clear()
+                for i in range(n + t):
+                    if alive[i]:
+                        clusters.push_back(i)
+                with gil:
+                    remaining = np.array(clusters, dtype=np.int32)
+                    _, nearest = cKDTree(np.asarray(centroids)[remaining]).query(np.asarray(centroids)[remaining], k=2)
+                    # the nearest point might be the cluster itself in case of identical centroids
+                    nearest = np.where(nearest[:, 0] == np.arange(len(remaining)), nearest[:, 1], nearest[:, 0])
+                    nearest_view = remaining[nearest]
+                for k in range(<int> clusters.size()):
+                    i = min(clusters[k], nearest_view[k])
+                    j = max(clusters[k], nearest_view[k])
+                    neighbors[i].push_back(j)
+                    neighbors[j].push_back(i)
+                    n_entries += 2
+                    queue.push(Edge(-get_distance(centroids, sizes, i, j), pair[int, int](i, j)))
+            elif <long> queue.size() > n_entries + n:
+                # most entries are outdated: rebuild the queue from the edges between remaining clusters
+                queue.swap(queue_empty)
+                priority_queue[Edge]().swap(queue_empty)
+                for i in range(n + t):
+                    if alive[i]:
+                        for j in neighbors[i]:
+                            if i < j and alive[j]:
+                                queue.push(Edge(-get_distance(centroids, sizes, i, j), pair[int, int](i, j)))
+            edge = queue.top()
+            queue.pop()
+            i = edge.second.first
+            j = edge.second.second
+            if not alive[i] or not alive[j]:
+                continue
+            node = n + t
+            sizes[node] = sizes[i] + sizes[j]
+            for k in range(n_dim):
+                centroids[node, k] = (sizes[i] * centroids[i, k] + sizes[j] * centroids[j, k]) / sizes[node]
+            dendrogram[t, 0] = i
+            dendrogram[t, 1] = j
+            dendrogram[t, 2] = sqrt(-edge.first)
+            dendrogram[t, 3] = sizes[node]
+            alive[i] = 0
+            alive[j] = 0
+            alive[node] = 1
+            # neighbors of the new cluster
+            for k in range(2):
+                child = j if k else i
+                for neighbor in neighbors[child]:
+                    if alive[neighbor] and marks[neighbor] != node:
+                        marks[neighbor] = node
+                        # the children are no longer neighbors of this cluster
+                        n_entries -= remove_dead(neighbors[neighbor], alive)
+                        neighbors[node].push_back(neighbor)
+                        neighbors[neighbor].push_back(node)
+                        n_entries += 2
+                        queue.push(Edge(-get_distance(centroids, sizes, neighbor, node),
+                                        pair[int, int](neighbor, node)))
+                n_entries -= <long> neighbors[child].size()
+                vector[int]().swap(neighbors[child])
+            t += 1
+
+    return np.asarray(dendrogram)